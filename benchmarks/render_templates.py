@@ -0,0 +1,70 @@
+"""
+Benchmark del render de plantillas de correo.
+
+Compara el registro precompilado (bookly.mail_templates) con compilar la
+plantilla en cada correo y con el HTML armado con f-strings que usaban los
+servicios, y muestra el tamaño del payload de send_mail en cada caso.
+
+Uso (desde la raíz del repo, con las variables de entorno de la app):
+    PYTHONPATH=src python benchmarks/render_templates.py --renders 20000
+"""
+from typing import Callable
+import argparse
+import json
+import time
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from bookly.mail_templates import TEMPLATE_FOLDER, TemplateRegistry
+
+LINK = "http://localhost:8000/api/v1/auth/verify/" + "x" * 120
+
+
+def inline_fstring(link: str) -> str:
+    return f"""
+    <h1>Verify you email</h1>
+    <p>Please click this <a href="{link}">link</a> to verify your email.</p>
+    """
+
+
+def measure(name: str, render: Callable[[], str], renders: int) -> None:
+    render()  # calentamiento
+    start = time.perf_counter()
+    for _ in range(renders):
+        render()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<32} {renders / elapsed:>12,.0f} renders/s {elapsed / renders * 1e6:>9.1f} µs/render")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--renders", type=int, default=20000)
+    args = parser.parse_args()
+
+    registry = TemplateRegistry()
+    start = time.perf_counter()
+    loaded = registry.load_all()
+    print(f"load_all: {loaded} plantillas en {(time.perf_counter() - start) * 1000:.1f} ms\n")
+
+    context = {"link": LINK}
+
+    def compile_each_time() -> str:
+        environment = Environment(
+            loader=FileSystemLoader(TEMPLATE_FOLDER),
+            autoescape=select_autoescape(["html"]),
+        )
+        return environment.get_template("verify_email.html").render(context)
+
+    measure("registro precompilado", lambda: registry.render("verify_email.html", context), args.renders)
+    measure("f-string en el request", lambda: inline_fstring(LINK), args.renders)
+    measure("compilar en cada correo", compile_each_time, max(args.renders // 100, 1))
+
+    base = {"recipients": ["reader@example.com"], "subject": "Welcome - Verify your email"}
+    with_body = json.dumps({**base, "body": registry.render("verify_email.html", context)})
+    with_template = json.dumps({**base, "template": "verify_email.html", "context": context})
+    print(f"\npayload de send_mail con body:     {len(with_body)} bytes")
+    print(f"payload de send_mail con template: {len(with_template)} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark de envío de correos del worker de Celery en cada modo de ejecución.
+
+Levanta un servidor SMTP local (aiosmtpd, con una latencia artificial por
+mensaje para parecerse a un servidor remoto) y ejecuta send_mail desde un
+ThreadPoolExecutor, como lo haría un worker con --pool=threads:
+
+- loop por tarea: asyncio.run con una conexión nueva por correo, lo que hacía
+  send_mail con async_to_sync y FastMail
+- pool síncrono: el modo por defecto (smtplib con conexiones reutilizadas)
+- loop persistente: CELERY_ASYNC_WORKER (aiosmtplib en un único event loop)
+
+Además compara send_mail_batch con el pool síncrono y con el loop persistente.
+
+Uso (desde la raíz del repo, con las variables de entorno de la app y
+aiosmtpd instalado):
+    PYTHONPATH=src python benchmarks/worker_modes.py --messages 500 --concurrency 8
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+HOST = "127.0.0.1"
+PORT = 8025
+
+# Antes de importar bookly: el pool SMTP toma la configuración al crearse
+os.environ.update(
+    MAIL_SERVER=HOST,
+    MAIL_PORT=str(PORT),
+    MAIL_STARTTLS="False",
+    MAIL_SSL_TLS="False",
+    USE_CREDENTIALS="False",
+)
+
+import aiosmtplib
+from aiosmtpd.controller import Controller
+
+from bookly.config import settings
+from bookly.celery_task import send_mail, send_mail_batch, close_smtp_connections
+from bookly.smtp_pool import build_email
+
+
+class SlowHandler:
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.latency)
+        self.received += 1
+        return "250 OK"
+
+
+def message(i: int) -> dict:
+    return {
+        "recipients": [f"reader{i}@example.com"],
+        "subject": "Welcome - Verify your email",
+        "template": "verify_email.html",
+        "context": {"link": f"http://localhost/verify/{i}"},
+    }
+
+
+def send_with_new_loop(i: int) -> None:
+    """Lo que hacía send_mail antes: loop y conexión SMTP nuevos por correo."""
+
+    async def send() -> None:
+        await aiosmtplib.send(build_email(**message(i)), hostname=HOST, port=PORT, start_tls=False)
+
+    asyncio.run(send())
+
+
+def measure(name: str, run: Callable[[], None], messages: int, handler: SlowHandler) -> None:
+    received = handler.received
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    assert handler.received - received == messages, "no se entregaron todos los correos"
+    print(f"{name:<36} {messages / elapsed:>9,.1f} correos/s  ({elapsed:.2f} s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8, help="hilos del worker")
+    parser.add_argument("--latency-ms", type=float, default=20, help="latencia del servidor por mensaje")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    handler = SlowHandler(args.latency_ms / 1000)
+    controller = Controller(handler, hostname=HOST, port=PORT)
+    controller.start()
+
+    def tasks(send: Callable[[int], None]) -> Callable[[], None]:
+        def run() -> None:
+            with ThreadPoolExecutor(args.concurrency) as executor:
+                list(executor.map(send, range(args.messages)))
+
+        return run
+
+    def send_task(i: int) -> None:
+        send_mail.run(**message(i))
+
+    def batch() -> None:
+        send_mail_batch.run([message(i) for i in range(args.messages)])
+
+    print(
+        f"{args.messages} correos, {args.concurrency} hilos, "
+        f"SMTP_POOL_SIZE={settings.SMTP_POOL_SIZE}, latencia {args.latency_ms} ms\n"
+    )
+    try:
+        measure("send_mail, loop por tarea", tasks(send_with_new_loop), args.messages, handler)
+
+        settings.CELERY_ASYNC_WORKER = False
+        measure("send_mail, pool síncrono", tasks(send_task), args.messages, handler)
+        measure("send_mail_batch, pool síncrono", batch, args.messages, handler)
+
+        settings.CELERY_ASYNC_WORKER = True
+        measure("send_mail, loop persistente", tasks(send_task), args.messages, handler)
+        measure("send_mail_batch, loop persistente", batch, args.messages, handler)
+    finally:
+        close_smtp_connections()
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,7 @@ from bookly.auth.userModel import User
 from bookly.book.BookModel import Book
 from bookly.reviews.reviewModel import Review
 from bookly.tags.model import Tag
+from bookly.outbox.model import EmailOutbox
 
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,58 @@
+"""add books review aggregates
+
+Revision ID: 0637f8e90516
+Revises: d0af7c23e56a
+Create Date: 2026-10-17 12:14:08.305127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0637f8e90516'
+down_revision: Union[str, Sequence[str], None] = 'd0af7c23e56a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('books', sa.Column('review_count', sa.INTEGER(), server_default='0', nullable=False))
+    op.add_column('books', sa.Column('rating_sum', sa.INTEGER(), server_default='0', nullable=False))
+    op.add_column('books', sa.Column('rating_histogram', postgresql.ARRAY(sa.INTEGER()), server_default='{0,0,0,0,0}', nullable=False))
+
+    # Backfill a partir de las reviews existentes
+    op.execute(
+        """
+        UPDATE books
+        SET review_count = agg.review_count,
+            rating_sum = agg.rating_sum,
+            rating_histogram = ARRAY[agg.r1, agg.r2, agg.r3, agg.r4, agg.r5]
+        FROM (
+            SELECT book_uid,
+                   count(*) AS review_count,
+                   coalesce(sum(rating), 0) AS rating_sum,
+                   count(*) FILTER (WHERE rating = 1) AS r1,
+                   count(*) FILTER (WHERE rating = 2) AS r2,
+                   count(*) FILTER (WHERE rating = 3) AS r3,
+                   count(*) FILTER (WHERE rating = 4) AS r4,
+                   count(*) FILTER (WHERE rating = 5) AS r5
+            FROM reviews
+            WHERE book_uid IS NOT NULL
+            GROUP BY book_uid
+        ) AS agg
+        WHERE books.uid = agg.book_uid
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('books', 'rating_histogram')
+    op.drop_column('books', 'rating_sum')
+    op.drop_column('books', 'review_count')
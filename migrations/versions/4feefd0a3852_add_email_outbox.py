@@ -0,0 +1,41 @@
+"""add email outbox
+
+Revision ID: 4feefd0a3852
+Revises: 73ed2b55d6d5
+Create Date: 2026-10-17 15:21:37.918204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4feefd0a3852'
+down_revision: Union[str, Sequence[str], None] = '73ed2b55d6d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('email_outbox',
+    sa.Column('uid', sa.UUID(), nullable=False),
+    sa.Column('message', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('status', sa.VARCHAR(), server_default='pending', nullable=False),
+    sa.Column('attempts', sa.INTEGER(), server_default='0', nullable=False),
+    sa.Column('last_error', sa.TEXT(), nullable=True),
+    sa.Column('available_at', postgresql.TIMESTAMP(), nullable=False),
+    sa.Column('created_at', postgresql.TIMESTAMP(), nullable=True),
+    sa.PrimaryKeyConstraint('uid')
+    )
+    op.create_index('ix_email_outbox_pending', 'email_outbox', ['available_at'], unique=False, postgresql_where=sa.text("status = 'pending'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_email_outbox_pending', table_name='email_outbox', postgresql_where=sa.text("status = 'pending'"))
+    op.drop_table('email_outbox')
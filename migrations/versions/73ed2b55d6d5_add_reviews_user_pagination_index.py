@@ -0,0 +1,53 @@
+"""add reviews user pagination index
+
+Revision ID: 73ed2b55d6d5
+Revises: 977fbd79a759
+Create Date: 2026-10-17 14:06:51.402733
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '73ed2b55d6d5'
+down_revision: Union[str, Sequence[str], None] = '977fbd79a759'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # El índice compuesto cubre también las búsquedas por user_uid, así que
+    # reemplaza a ix_reviews_user_uid. Ver 977fbd79a759 sobre CONCURRENTLY.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_reviews_user_uid_created_at_uid',
+            'reviews',
+            ['user_uid', 'created_at', 'uid'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_reviews_user_uid', table_name='reviews', postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_reviews_user_uid',
+            'reviews',
+            ['user_uid'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_reviews_user_uid_created_at_uid',
+            table_name='reviews',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,75 @@
+"""add lookup indexes
+
+Revision ID: 977fbd79a759
+Revises: 0637f8e90516
+Create Date: 2026-10-17 12:41:27.918364
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '977fbd79a759'
+down_revision: Union[str, Sequence[str], None] = '0637f8e90516'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (nombre, tabla, columnas, unique). books.user_uid/created_at ya están
+# cubiertos por los índices de 0ec4f29d1f52.
+INDEXES = [
+    ('ix_users_email', 'users', ['email'], True),
+    ('ix_reviews_book_uid', 'reviews', ['book_uid'], False),
+    ('ix_reviews_user_uid', 'reviews', ['user_uid'], False),
+    ('ix_tags_name', 'tags', ['name'], True),
+    ('ix_booktag_tag_id', 'booktag', ['tag_id'], False),
+]
+
+
+def _is_invalid(name: str) -> bool:
+    """Indica si quedó un índice INVALID de un CREATE INDEX CONCURRENTLY fallido."""
+    return bool(
+        op.get_bind().scalar(
+            sa.text(
+                "SELECT NOT i.indisvalid FROM pg_index i "
+                "JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :name AND pg_table_is_visible(c.oid)"
+            ),
+            {"name": name},
+        )
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción,
+    # así que se sale de la transacción de Alembic para no bloquear escrituras.
+    # Cada índice se confirma por separado: si uno único falla por emails o
+    # nombres de tag duplicados, los anteriores ya quedan creados y el fallido
+    # queda INVALID. Tras limpiar los duplicados se puede volver a correr la
+    # migración: se saltan los índices válidos y se recrean los INVALID.
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in INDEXES:
+            if _is_invalid(name):
+                op.drop_index(
+                    name, table_name=table, postgresql_concurrently=True
+                )
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=unique,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
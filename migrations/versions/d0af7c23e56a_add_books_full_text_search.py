@@ -0,0 +1,64 @@
+"""add books full text search
+
+Revision ID: d0af7c23e56a
+Revises: 0ec4f29d1f52
+Create Date: 2026-10-17 11:03:52.771490
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd0af7c23e56a'
+down_revision: Union[str, Sequence[str], None] = '0ec4f29d1f52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Copia congelada de bookly.book.BookSearch al momento de esta revisión
+SEARCH_LANGUAGES = {
+    "english": "english", "en": "english",
+    "spanish": "spanish", "español": "spanish", "espanol": "spanish", "es": "spanish",
+    "french": "french", "français": "french", "francais": "french", "fr": "french",
+    "german": "german", "deutsch": "german", "de": "german",
+    "portuguese": "portuguese", "português": "portuguese", "portugues": "portuguese", "pt": "portuguese",
+    "italian": "italian", "italiano": "italian", "it": "italian",
+}
+CONFIG_SQL = "CASE lower(language) {} ELSE 'simple'::regconfig END".format(
+    " ".join(
+        f"WHEN '{language}' THEN '{config}'::regconfig"
+        for language, config in SEARCH_LANGUAGES.items()
+    )
+)
+SEARCH_VECTOR_SQL = (
+    f"setweight(to_tsvector({CONFIG_SQL}, coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector({CONFIG_SQL}, coalesce(author, '')), 'B') || "
+    f"setweight(to_tsvector({CONFIG_SQL}, coalesce(publisher, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Al ser una columna generada STORED, Postgres la calcula para todas las
+    # filas existentes al agregarla (reescribe la tabla), lo que hace el backfill.
+    op.add_column(
+        'books',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR_SQL, persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index('ix_books_search_vector', 'books', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_books_search_vector', table_name='books', postgresql_using='gin')
+    op.drop_column('books', 'search_vector')
@@ -15,10 +15,18 @@ from bookly.book.BookControllers import book_router
 from bookly.auth.userController import auth_router
 from bookly.reviews.reviewController import review_router
 from bookly.tags.controller import tags_router
+from bookly.metrics.controller import metrics_router
 from .errors import register_all_errors
 from .middleware import register_middleware
 from bookly.db.main import init_db, close_db
-from bookly.db.redis import init_redis, close_redis
+from bookly.db.redis import (
+    init_redis,
+    close_redis,
+    start_revocation_mirror,
+    stop_revocation_mirror,
+)
+from bookly.auth.passwordHasher import password_hasher
+from bookly.auth.principal import principal_cache
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -49,6 +57,15 @@ async def lifespan(app: FastAPI):
     await init_redis()
     logger.info("RedisConnection - Conexión a Redis exitosa")
 
+    # Copia local de la blocklist de tokens
+    await start_revocation_mirror()
+
+    # Invalidaciones de la caché de principals entre workers
+    await principal_cache.start()
+
+    # Costo de bcrypt (fijo o calibrado)
+    await password_hasher.configure_rounds()
+
     # Aplicación lista
     logger.info("Aplicación lista para recibir requests")
     logger.info("=" * 50)
@@ -63,8 +80,13 @@ async def lifespan(app: FastAPI):
     await close_db()
 
     logger.info("Cerrando conexión a Redis...")
+    await stop_revocation_mirror()
+    await principal_cache.stop()
     await close_redis()
 
+    logger.info("Cerrando pool de hashing de contraseñas...")
+    password_hasher.shutdown()
+
     logger.info("Recursos liberados correctamente")
 
     logger.info("=" * 50)
@@ -99,6 +121,7 @@ app.include_router(book_router, prefix=f"{version_prefix}/books", tags=["books"]
 app.include_router(auth_router, prefix=f"{version_prefix}/auth", tags=["auth"])
 app.include_router(review_router, prefix=f"{version_prefix}/reviews", tags=["reviews"])
 app.include_router(tags_router, prefix=f"{version_prefix}/tags", tags=["tags"])
+app.include_router(metrics_router, prefix=f"{version_prefix}/metrics", tags=["metrics"])
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
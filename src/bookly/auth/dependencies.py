@@ -3,17 +3,105 @@ from fastapi.security import HTTPBearer
 from fastapi.security.http import HTTPAuthorizationCredentials
 from fastapi.exceptions import HTTPException
 from sqlmodel.ext.asyncio.session import AsyncSession
-from typing import Any, List
+from collections import OrderedDict
+from typing import Any, List, Optional
+import hashlib
+import time
 
 from .utils import decode_token
-from bookly.db.redis import token_in_blocklist
+from bookly.config import settings
+from bookly.db.redis import token_in_blocklist, user_tokens_revoked
+from bookly.metrics.registry import metrics_registry
 from bookly.db.main import get_session
 from .userRepository import UserRepository
-from .userModel import User
+from .principal import Principal, principal_cache
 from bookly.errors import (InvalidToken, RefreshTokenRequired, AccessTokenRequired, InsufficientPermission, AccountNotVerified)
 
 user_repository = UserRepository()
 
+
+class VerifiedTokenCache:
+    """
+    Caché LRU en memoria de tokens JWT cuya firma ya fue verificada.
+
+    La clave es el SHA-256 del token (no se guarda el token en claro) y cada
+    entrada vence en el `exp` del propio token, así que nunca se acepta un token
+    expirado. La revocación no depende de esta caché: el blocklist se sigue
+    consultando en cada request.
+    """
+
+    def __init__(self, max_size: int = settings.TOKEN_CACHE_MAX_SIZE) -> None:
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[dict]:
+        """
+        Obtiene los datos de un token verificado previamente.
+
+        Args:
+            token: Token JWT tal como llega en el header Authorization
+
+        Returns:
+            Payload del token o None si no está en caché o ya expiró
+        """
+        key = self._key(token)
+        token_data = self._entries.get(key)
+
+        if token_data is None:
+            self.misses += 1
+            return None
+
+        if token_data["exp"] <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return token_data
+
+    def set(self, token: str, token_data: dict) -> None:
+        """
+        Guarda el payload de un token verificado, desalojando el menos usado.
+
+        Args:
+            token: Token JWT tal como llega en el header Authorization
+            token_data: Payload devuelto por decode_token
+        """
+        if "exp" not in token_data:
+            return
+
+        key = self._key(token)
+        self._entries[key] = token_data
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        """Contadores de la caché para el endpoint de métricas."""
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+verified_token_cache = VerifiedTokenCache()
+metrics_registry.register("token_cache", verified_token_cache.stats)
+metrics_registry.register("principal_cache", principal_cache.stats)
+
+
 class TokenBearer(HTTPBearer):
     def __init__(self, auto_error=True):
         super().__init__(auto_error=auto_error)
@@ -33,8 +121,12 @@ class TokenBearer(HTTPBearer):
         """
         creds = await super().__call__(request)
 
-        # Decodificar el token
-        token_data = decode_token(creds.credentials)
+        # Decodificar el token (solo se verifica la firma la primera vez)
+        token_data = verified_token_cache.get(creds.credentials)
+        if token_data is None:
+            token_data = decode_token(creds.credentials)
+            if token_data is not None:
+                verified_token_cache.set(creds.credentials, token_data)
 
         # Verificar que el token es válido
         if token_data is None:
@@ -50,6 +142,10 @@ class TokenBearer(HTTPBearer):
         if await token_in_blocklist(token_data["jti"]):
             raise InvalidToken()
 
+        # Logout global del usuario (por ejemplo tras restablecer la contraseña)
+        if await user_tokens_revoked(token_data["user"]["user_uid"], token_data["iat"]):
+            raise InvalidToken()
+
         self.verify_token_data(token_data)
 
         return token_data
@@ -69,19 +165,45 @@ class RefreshTokenBearer(TokenBearer):
         if token_data and not token_data["refresh"]:
             raise RefreshTokenRequired()
 
-async def get_current_user(
+async def get_current_principal(
     token_details: dict = Depends(AccessTokenBearer()),
     session: AsyncSession = Depends(get_session),
-):
-    user_email = token_details["user"]["email"]
-    user = await user_repository.get_user_by_email(user_email, session)
-    return user
+) -> Principal:
+    """
+    Obtiene el usuario autenticado sin cargar el modelo User.
+
+    Usa los claims del token para buscar el principal en la caché (memoria y
+    Redis); solo en un miss se consulta la base de datos.
+
+    Args:
+        token_details: Claims del access token
+        session: Sesión de base de datos (solo se usa en un miss)
+
+    Returns:
+        Principal del usuario autenticado
+
+    Raises:
+        InvalidToken: Si el usuario del token ya no existe
+    """
+    claims = token_details["user"]
+
+    principal, cache_version = await principal_cache.get(claims["user_uid"])
+    if principal is not None:
+        return principal
+
+    user = await user_repository.get_user_by_email(claims["email"], session)
+    if user is None:
+        raise InvalidToken()
+
+    principal = Principal.from_user(user)
+    await principal_cache.set(principal, cache_version)
+    return principal
 
 class RoleChecker:
     def __init__(self, allowed_roles: List[str]) -> None:
         self.allowed_roles = allowed_roles
 
-    def __call__(self, current_user: User = Depends(get_current_user)) -> Any:
+    def __call__(self, current_user: Principal = Depends(get_current_principal)) -> Any:
         if not current_user.is_verified:
             raise AccountNotVerified()
         
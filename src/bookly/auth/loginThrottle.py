@@ -0,0 +1,158 @@
+"""
+Límite de intentos de login con ventana deslizante en Redis.
+
+Cada intento fallido de login cuesta un bcrypt completo, así que un ataque de
+credential stuffing satura la CPU de la API. LoginThrottle cuenta los intentos
+por email y por IP en sorted sets (un miembro por intento, con el timestamp
+como score) y rechaza con 429 antes de consultar la base de datos o ejecutar
+bcrypt. La verificación y el registro del intento son un único script Lua, así
+que es atómica entre workers. Si Redis falla el login no se bloquea (fail-open).
+"""
+from typing import Optional
+import logging
+import time
+import uuid
+
+from bookly.config import settings
+from bookly.db.redis import get_redis
+from bookly.errors import TooManyLoginAttempts
+from bookly.metrics.registry import metrics_registry
+
+logger = logging.getLogger(__name__)
+
+LOGIN_THROTTLE_PREFIX = "login_throttle"
+
+# KEYS: una clave por dimensión (email, IP)
+# ARGV: now_ms, window_ms, member, límite de cada clave en el mismo orden
+# Devuelve {0, 0} si se permite el intento (y lo registra en todas las claves)
+# o {posición de la clave excedida (1..n), ms hasta que se libera un lugar}
+SLIDING_WINDOW_LUA = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local member = ARGV[3]
+
+for i, key in ipairs(KEYS) do
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    if redis.call('ZCARD', key) >= tonumber(ARGV[3 + i]) then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        return {i, tonumber(oldest[2]) + window - now}
+    end
+end
+
+for _, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, member)
+    redis.call('PEXPIRE', key, window)
+end
+
+return {0, 0}
+"""
+
+
+class LoginThrottle:
+    """
+    Limitador de intentos de login por email y por IP del cliente.
+    """
+
+    DIMENSIONS = ("email", "ip")
+
+    def __init__(
+        self,
+        window: int = settings.LOGIN_THROTTLE_WINDOW,
+        max_per_email: int = settings.LOGIN_THROTTLE_MAX_PER_EMAIL,
+        max_per_ip: int = settings.LOGIN_THROTTLE_MAX_PER_IP,
+    ) -> None:
+        self.window = window
+        self.max_per_email = max_per_email
+        self.max_per_ip = max_per_ip
+        self._script = None
+        self._script_client = None
+        self.allowed = 0
+        self.rejected = {dimension: 0 for dimension in self.DIMENSIONS}
+        self.errors = 0
+
+    @staticmethod
+    def _key(dimension: str, value: str) -> str:
+        return f"{LOGIN_THROTTLE_PREFIX}:{dimension}:{value}"
+
+    @staticmethod
+    def _normalize_email(email: str) -> str:
+        return email.strip().lower()
+
+    async def check(self, email: str, client_ip: Optional[str]) -> None:
+        """
+        Registra un intento de login o lo rechaza si supera algún límite.
+
+        Args:
+            email: Email con el que se intenta iniciar sesión
+            client_ip: IP del cliente (None si no se conoce)
+
+        Raises:
+            TooManyLoginAttempts: Si el email o la IP superaron su límite en la ventana
+        """
+        keys = [self._key("email", self._normalize_email(email))]
+        limits = [self.max_per_email]
+        if client_ip:
+            keys.append(self._key("ip", client_ip))
+            limits.append(self.max_per_ip)
+
+        try:
+            script = await self._get_script()
+            exceeded, retry_after_ms = await script(
+                keys=keys,
+                args=[
+                    int(time.time() * 1000),
+                    self.window * 1000,
+                    uuid.uuid4().hex,
+                    *limits,
+                ],
+            )
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Error al verificar el límite de login: {e}")
+            return
+
+        if int(exceeded) == 0:
+            self.allowed += 1
+            return
+
+        dimension = self.DIMENSIONS[int(exceeded) - 1]
+        self.rejected[dimension] += 1
+        logger.warning(f"Login rechazado por exceso de intentos ({dimension})")
+        raise TooManyLoginAttempts(retry_after=max(int(retry_after_ms) // 1000, 1))
+
+    async def reset(self, email: str) -> None:
+        """
+        Limpia los intentos de un email tras un login exitoso.
+
+        Args:
+            email: Email del usuario que inició sesión
+        """
+        try:
+            redis = await get_redis()
+            await redis.delete(self._key("email", self._normalize_email(email)))
+        except Exception as e:
+            logger.error(f"Error al limpiar el límite de login: {e}")
+
+    def stats(self) -> dict:
+        """Contadores del limitador para el endpoint de métricas."""
+        return {
+            "window": self.window,
+            "max_per_email": self.max_per_email,
+            "max_per_ip": self.max_per_ip,
+            "allowed": self.allowed,
+            "rejected_email": self.rejected["email"],
+            "rejected_ip": self.rejected["ip"],
+            "errors": self.errors,
+        }
+
+    async def _get_script(self):
+        # El script se registra sobre el cliente actual (se recrea si cambió)
+        redis = await get_redis()
+        if self._script is None or self._script_client is not redis:
+            self._script = redis.register_script(SLIDING_WINDOW_LUA)
+            self._script_client = redis
+        return self._script
+
+
+login_throttle = LoginThrottle()
+metrics_registry.register("login_throttle", login_throttle.stats)
@@ -0,0 +1,223 @@
+"""
+Hashing y verificación de contraseñas fuera del event loop.
+
+bcrypt es deliberadamente lento (~200 ms por operación con el costo por
+defecto); ejecutarlo directamente en un handler async bloquea todo el worker de
+uvicorn. PasswordHasher delega generate_passwd_hash / verify_password en un pool
+de hilos (bcrypt libera el GIL) o de procesos, con un límite de operaciones
+pendientes: si se supera se responde 503 de inmediato en lugar de encolar sin
+límite durante una ráfaga de logins.
+
+El costo de bcrypt es configurable (BCRYPT_ROUNDS) o se calibra al arrancar
+(BCRYPT_CALIBRATE); los hashes con otro costo se regeneran en el siguiente
+login exitoso (needs_rehash), sin migración de datos.
+"""
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, List, Optional, TypeVar
+import asyncio
+import logging
+
+from bookly.config import settings
+from bookly.db.redis import get_redis
+from bookly.errors import ServiceBusy
+from bookly.metrics.registry import metrics_registry
+from .utils import (
+    calibrate_bcrypt_rounds,
+    generate_passwd_hash,
+    get_bcrypt_rounds,
+    hash_rounds,
+    set_bcrypt_rounds,
+    verify_password,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Costo calibrado compartido entre workers, para que todos hasheen igual y un
+# login no regenere el hash cada vez que cae en otro worker
+BCRYPT_ROUNDS_KEY = "bcrypt_rounds"
+BCRYPT_ROUNDS_KEY_TTL = 24 * 3600
+
+EXECUTOR_KINDS = ("thread", "process")
+
+
+class PasswordHasher:
+    """
+    Servicio asíncrono de hashing de contraseñas con concurrencia acotada.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = settings.PASSWORD_HASH_WORKERS,
+        max_pending: int = settings.PASSWORD_HASH_MAX_PENDING,
+        executor_kind: str = settings.PASSWORD_HASH_EXECUTOR,
+    ) -> None:
+        if executor_kind not in EXECUTOR_KINDS:
+            raise ValueError(
+                f"PASSWORD_HASH_EXECUTOR must be one of: {', '.join(EXECUTOR_KINDS)}"
+            )
+
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.executor_kind = executor_kind
+        # Se crea en el primer uso para no levantar procesos al importar
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def hash(self, password: str) -> str:
+        """
+        Genera el hash bcrypt de una contraseña.
+
+        Args:
+            password: Contraseña en texto plano
+
+        Returns:
+            Hash bcrypt de la contraseña
+
+        Raises:
+            ServiceBusy: Si ya hay PASSWORD_HASH_MAX_PENDING operaciones pendientes
+        """
+        # El costo se pasa explícito porque un pool de procesos no comparte
+        # el valor calibrado en este proceso
+        return await self._run(generate_passwd_hash, password, get_bcrypt_rounds())
+
+    async def hash_many(self, passwords: List[str]) -> List[str]:
+        """
+        Genera los hashes de muchas contraseñas en paralelo.
+
+        Ocupa como máximo `max_workers` lugares del pool a la vez, de modo que
+        un lote grande no agota el cupo de PASSWORD_HASH_MAX_PENDING que usan
+        los logins.
+
+        Args:
+            passwords: Contraseñas en texto plano
+
+        Returns:
+            Hashes en el mismo orden que las contraseñas
+
+        Raises:
+            ServiceBusy: Si el pool está saturado por otras operaciones
+        """
+        slots = asyncio.Semaphore(self.max_workers)
+
+        async def hash_one(password: str) -> str:
+            async with slots:
+                return await self.hash(password)
+
+        return await asyncio.gather(*(hash_one(password) for password in passwords))
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        """
+        Verifica una contraseña contra su hash.
+
+        Args:
+            password: Contraseña en texto plano
+            password_hash: Hash almacenado
+
+        Returns:
+            True si la contraseña coincide
+
+        Raises:
+            ServiceBusy: Si ya hay PASSWORD_HASH_MAX_PENDING operaciones pendientes
+        """
+        return await self._run(verify_password, password, password_hash)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """
+        Indica si un hash se generó con un costo distinto al vigente.
+
+        Args:
+            password_hash: Hash almacenado
+
+        Returns:
+            True si conviene regenerarlo (en el próximo login exitoso)
+        """
+        return hash_rounds(password_hash) != get_bcrypt_rounds()
+
+    async def configure_rounds(self) -> int:
+        """
+        Fija el costo de bcrypt al arrancar la aplicación.
+
+        Con BCRYPT_CALIBRATE calibra en un hilo aparte y comparte el resultado
+        por Redis: el primer worker en calibrar lo publica y el resto lo adopta.
+        Sin calibración se usa BCRYPT_ROUNDS.
+
+        Returns:
+            Costo vigente
+        """
+        if not settings.BCRYPT_CALIBRATE:
+            set_bcrypt_rounds(settings.BCRYPT_ROUNDS)
+            return get_bcrypt_rounds()
+
+        rounds = await asyncio.to_thread(
+            calibrate_bcrypt_rounds,
+            settings.BCRYPT_TARGET_MS,
+            settings.BCRYPT_MIN_ROUNDS,
+            settings.BCRYPT_MAX_ROUNDS,
+        )
+
+        try:
+            redis = await get_redis()
+            await redis.set(BCRYPT_ROUNDS_KEY, rounds, nx=True, ex=BCRYPT_ROUNDS_KEY_TTL)
+            shared = await redis.get(BCRYPT_ROUNDS_KEY)
+            if shared is not None:
+                rounds = int(shared)
+        except Exception as e:
+            logger.error(f"Error al compartir el costo de bcrypt calibrado: {e}")
+
+        set_bcrypt_rounds(rounds)
+        logger.info(f"Costo de bcrypt: {rounds}")
+        return rounds
+
+    def stats(self) -> dict:
+        """Estado del pool para el endpoint de métricas."""
+        return {
+            "bcrypt_rounds": get_bcrypt_rounds(),
+            "executor": self.executor_kind,
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": min(self._pending, self.max_workers),
+            "queue_depth": max(self._pending - self.max_workers, 0),
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        """Libera el pool (se llama en el shutdown de la aplicación)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, func: Callable[..., T], *args) -> T:
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            logger.warning(
+                f"PasswordHasher saturado ({self._pending} operaciones pendientes)"
+            )
+            raise ServiceBusy()
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._get_executor(), func, *args)
+            self.completed += 1
+            return result
+        finally:
+            self._pending -= 1
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="password-hasher"
+                )
+        return self._executor
+
+
+password_hasher = PasswordHasher()
+metrics_registry.register("password_hasher", password_hasher.stats)
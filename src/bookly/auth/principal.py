@@ -0,0 +1,268 @@
+"""
+Principal autenticado: los datos mínimos del usuario que necesita la
+autorización (uid, email, rol y verificación), sin cargar el modelo User.
+
+Se resuelve a partir de los claims del JWT y de una caché de dos niveles:
+un diccionario en memoria con TTL corto (por proceso) y Redis con un TTL más
+largo (compartido entre workers). Solo en un miss de ambos se consulta la base
+de datos.
+
+UserRepository.update_user invalida la entrada al modificar un usuario. Igual
+que en BookCache, la invalidación incrementa una versión en Redis y un miss
+sólo guarda el principal leído de la BD si la versión no cambió mientras
+tanto. Además se publica en un canal para que cada worker descarte su copia
+en memoria; el nivel en memoria solo se usa mientras el worker está suscrito,
+así que un principal degradado o sin verificar no sobrevive en otro worker
+más que lo que tarda en llegar el mensaje.
+"""
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Optional, Tuple
+import asyncio
+import json
+import logging
+import time
+import uuid
+
+from bookly.config import settings
+from bookly.db.redis import SET_IF_VERSION_LUA, get_redis
+
+logger = logging.getLogger(__name__)
+
+PRINCIPAL_CACHE_PREFIX = "principal"
+# Canal por el que se avisa a los workers que descarten su copia en memoria
+PRINCIPAL_INVALIDATIONS_CHANNEL = "principal_invalidations"
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Usuario autenticado tal como lo ve la capa de autorización.
+
+    Attributes:
+        uid: Identificador único del usuario
+        email: Correo electrónico del usuario
+        role: Rol del usuario
+        is_verified: Indica si el usuario verificó su email
+    """
+
+    uid: uuid.UUID
+    email: str
+    role: str
+    is_verified: bool
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        """Construye el principal a partir de un modelo User."""
+        return cls(
+            uid=user.uid,
+            email=user.email,
+            role=user.role,
+            is_verified=user.is_verified,
+        )
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        data["uid"] = str(self.uid)
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, payload: str) -> "Principal":
+        data = json.loads(payload)
+        data["uid"] = uuid.UUID(data["uid"])
+        return cls(**data)
+
+
+class PrincipalCache:
+    """
+    Caché de principals indexada por el UID del usuario.
+    """
+
+    def __init__(
+        self,
+        ttl: int = settings.PRINCIPAL_CACHE_TTL,
+        local_ttl: int = settings.PRINCIPAL_LOCAL_CACHE_TTL,
+        local_max_size: int = settings.PRINCIPAL_LOCAL_CACHE_MAX_SIZE,
+    ) -> None:
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self.local_max_size = local_max_size
+        self._local: "OrderedDict[str, Tuple[Principal, float]]" = OrderedDict()
+        # True solo mientras la suscripción al canal de invalidaciones está activa
+        self.listening = False
+        self._task: Optional[asyncio.Task] = None
+        self._script = None
+        self._script_client = None
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(user_uid) -> str:
+        return f"{PRINCIPAL_CACHE_PREFIX}:{user_uid}"
+
+    @staticmethod
+    def _version_key(key: str) -> str:
+        return f"{key}:version"
+
+    async def get(self, user_uid) -> Tuple[Optional[Principal], Optional[str]]:
+        """
+        Obtiene el principal de un usuario, primero en memoria y luego en Redis.
+
+        Args:
+            user_uid: Identificador único del usuario
+
+        Returns:
+            Tupla (principal en caché o None si no está en ninguno de los
+            niveles, versión a pasar a set en un miss; None si no se pudo leer
+            de Redis)
+        """
+        key = self._key(user_uid)
+
+        entry = self._local.get(key) if self.listening else None
+        if entry is not None:
+            principal, expires_at = entry
+            if expires_at > time.monotonic():
+                self._local.move_to_end(key)
+                self.local_hits += 1
+                return principal, None
+            del self._local[key]
+
+        try:
+            redis = await get_redis()
+            payload, version = await redis.mget(key, self._version_key(key))
+        except Exception as e:
+            logger.error(f"Error al leer principal {user_uid} de la caché: {e}")
+            self.misses += 1
+            return None, None
+
+        if payload is None:
+            self.misses += 1
+            return None, version or "0"
+
+        principal = Principal.from_json(payload)
+        self._set_local(key, principal)
+        self.redis_hits += 1
+        return principal, None
+
+    async def set(self, principal: Principal, version: Optional[str]) -> None:
+        """
+        Guarda un principal en Redis y en memoria.
+
+        No se guarda si el usuario se invalidó después de leer `version`.
+
+        Args:
+            principal: Principal leído de la base de datos
+            version: Versión devuelta por get antes de consultar la base de datos
+        """
+        if version is None:
+            return
+
+        key = self._key(principal.uid)
+        try:
+            script = await self._get_script()
+            stored = await script(
+                keys=[key, self._version_key(key)],
+                args=[version, principal.to_json(), self.ttl],
+            )
+        except Exception as e:
+            logger.error(f"Error al guardar principal {principal.uid} en la caché: {e}")
+            return
+
+        if stored:
+            self._set_local(key, principal)
+
+    async def invalidate(self, user_uid) -> None:
+        """
+        Elimina el principal de un usuario de Redis y de la memoria de todos
+        los workers.
+
+        Args:
+            user_uid: Identificador único del usuario
+        """
+        key = self._key(user_uid)
+        self._local.pop(key, None)
+
+        # La versión vive lo mismo que una entrada, más que cualquier lectura
+        # en curso que todavía pueda intentar el set
+        try:
+            redis = await get_redis()
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.incr(self._version_key(key))
+                pipe.expire(self._version_key(key), self.ttl)
+                pipe.delete(key)
+                pipe.publish(PRINCIPAL_INVALIDATIONS_CHANNEL, str(user_uid))
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Error al invalidar principal {user_uid} en la caché: {e}")
+
+    async def start(self) -> None:
+        """Arranca la suscripción al canal de invalidaciones."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """Detiene la suscripción y deja de usar el nivel en memoria."""
+        self.listening = False
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> dict:
+        """Contadores de la caché para el endpoint de métricas."""
+        return {
+            "listening": self.listening,
+            "local_size": len(self._local),
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+        }
+
+    def _set_local(self, key: str, principal: Principal) -> None:
+        if not self.listening:
+            return
+        self._local[key] = (principal, time.monotonic() + self.local_ttl)
+        self._local.move_to_end(key)
+        while len(self._local) > self.local_max_size:
+            self._local.popitem(last=False)
+
+
+    async def _get_script(self):
+        # El script se registra sobre el cliente actual (se recrea si cambió)
+        redis = await get_redis()
+        if self._script is None or self._script_client is not redis:
+            self._script = redis.register_script(SET_IF_VERSION_LUA)
+            self._script_client = redis
+        return self._script
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = None
+            try:
+                redis = await get_redis()
+                pubsub = redis.pubsub()
+                await pubsub.subscribe(PRINCIPAL_INVALIDATIONS_CHANNEL)
+                self.listening = True
+
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._local.pop(self._key(message["data"]), None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error en la suscripción de invalidaciones de principals: {e}")
+            finally:
+                # Sin suscripción se pudieron perder invalidaciones
+                self.listening = False
+                self._local.clear()
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+
+            await asyncio.sleep(1)
+
+
+principal_cache = PrincipalCache()
@@ -0,0 +1,87 @@
+from typing import List
+from sqlmodel.ext.asyncio.session import AsyncSession
+import logging
+
+from bookly.auth.userDto import UserCreateDTO
+from bookly.auth.userRepository import UserRepository
+from bookly.auth.passwordHasher import password_hasher
+from bookly.auth.service.createUser import build_verification_email
+from bookly.outbox.repository import OutboxRepository
+
+logger = logging.getLogger(__name__)
+
+
+class BulkCreateUsersService:
+    """
+    Servicio para dar de alta muchos usuarios a la vez (onboarding de una institución).
+
+    A diferencia de CreateUserService (una consulta, un hash, un commit y una
+    tarea de Celery por usuario) comprueba los emails existentes en una sola
+    consulta, hashea las contraseñas en paralelo en el pool de PasswordHasher,
+    inserta por lotes y guarda los correos de verificación en la outbox dentro
+    de la misma transacción.
+    """
+
+    def __init__(self, user_repository: UserRepository):
+        self.userRepository = user_repository
+        self.outboxRepository = OutboxRepository()
+
+    async def execute(self, users: List[UserCreateDTO], session: AsyncSession) -> dict:
+        """
+        Ejecuta el alta masiva.
+
+        Args:
+            users: Usuarios a crear (se crean con rol "user", igual que en signup)
+            session: Sesión de base de datos asíncrona
+
+        Returns:
+            Diccionario con el reporte (UserBulkCreateReportDTO)
+
+        Raises:
+            ServiceBusy: Si el pool de hashing está saturado
+        """
+        # Duplicados dentro de la misma petición: se crea el primero
+        unique_users = {}
+        duplicated = []
+        for user in users:
+            if user.email in unique_users:
+                duplicated.append(user.email)
+            else:
+                unique_users[user.email] = user
+
+        existing = await self.userRepository.get_existing_emails(
+            list(unique_users), session
+        )
+        pending = [user for email, user in unique_users.items() if email not in existing]
+
+        password_hashes = await password_hasher.hash_many(
+            [user.password for user in pending]
+        )
+
+        rows = []
+        for user, password_hash in zip(pending, password_hashes):
+            row = user.model_dump(exclude={"password"})
+            row["role"] = "user"
+            row["password_hash"] = password_hash
+            rows.append(row)
+
+        created = await self.userRepository.bulk_create_users(rows, session)
+
+        # Emails insertados por otro proceso entre la consulta y el INSERT
+        created_emails = {email for _, email in created}
+        existing.update(user.email for user in pending if user.email not in created_emails)
+
+        self.outboxRepository.add_many(
+            [build_verification_email(email) for _, email in created], session
+        )
+        await session.commit()
+
+        logger.info(
+            f"Alta masiva: {len(created)} creados, {len(existing)} existentes, "
+            f"{len(duplicated)} duplicados"
+        )
+        return {
+            "created": [{"uid": uid, "email": email} for uid, email in created],
+            "existing": sorted(existing),
+            "duplicated": duplicated,
+        }
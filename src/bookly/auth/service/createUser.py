@@ -7,12 +7,34 @@ from bookly.auth.userRepository import UserRepository
 from bookly.errors import UserAlreadyExists
 from bookly.config import settings
 from bookly.auth.utils import create_url_safe_token
-from bookly.celery_task import send_mail
+from bookly.outbox.repository import OutboxRepository
+
+
+def build_verification_email(email: str) -> dict:
+    """
+    Arma el correo de verificación de cuenta.
+
+    Args:
+        email: Email del usuario a verificar
+
+    Returns:
+        Diccionario con recipients, subject, template y context (argumentos
+        de send_mail); el HTML lo renderiza el worker
+    """
+    token = create_url_safe_token({"email": email})
+    link = f"http://{settings.DOMAIN}/api/v1/auth/verify/{token}"
+    return {
+        "recipients": [email],
+        "subject": "Welcome - Verify your email",
+        "template": "verify_email.html",
+        "context": {"link": link},
+    }
 
 
 class CreateUserService:
     def __init__(self, user_repository: UserRepository):
         self.userRepository = user_repository
+        self.outboxRepository = OutboxRepository()
 
     async def execute(self, user_data: UserCreateDTO, session: AsyncSession):
         email = user_data.email
@@ -22,24 +44,13 @@ class CreateUserService:
             raise UserAlreadyExists()
 
         user_data.role = "user"
-        new_user = await self.userRepository.create_user(user_data, session)
 
-        # * Prepar y enviar correo de confirmación
-        token = create_url_safe_token({"email": email})
-        link = f"http://{settings.DOMAIN}/api/v1/auth/verify/{token}"
-        subject = "Welcome - Verify your email"
-        html_message = f"""
-        <h1>Verify you email</h1>
-        <p>Please click this <a href="{link}">link</a> to verify your email.</p>
-        """
-
-        """
-        Se pudo haber importado y dejado la ejecución termine por su lado.
-        from fastapi import BackgroundTasks 
-        bg_task.add_task(mail.send_message, message)
-        """
-
-        send_mail.delay([email], subject, html_message)
+        # * Preparar el correo de confirmación. Se agrega a la outbox antes de
+        # create_user para que se guarde en el mismo commit que el usuario;
+        # lo envía después el worker que drena la outbox.
+        self.outboxRepository.add(build_verification_email(email), session)
+
+        new_user = await self.userRepository.create_user(user_data, session)
 
         return {
             "message": "Account Created! Check email to verify you account.",
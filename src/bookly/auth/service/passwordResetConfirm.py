@@ -2,7 +2,9 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 
 from bookly.auth.userDto import PasswordResetConfirmModel
 from bookly.auth.userRepository import UserRepository
-from bookly.auth.utils import decode_url_safe_token, generate_passwd_hash
+from bookly.auth.utils import decode_url_safe_token
+from bookly.auth.passwordHasher import password_hasher
+from bookly.db.redis import revoke_user_tokens
 from bookly.errors import InvalidToken, UserNotFound, ValidationError
 
 
@@ -55,11 +57,14 @@ class PasswordResetConfirmService:
             raise UserNotFound()
 
         # Generar hash de la nueva contraseña y actualizar
-        pass_hash = generate_passwd_hash(passwords.new_password)
+        pass_hash = await password_hasher.hash(passwords.new_password)
         await self.userRepository.update_user(
             user, {"password_hash": pass_hash}, session
         )
 
+        # Cerrar todas las sesiones abiertas con la contraseña anterior
+        await revoke_user_tokens(user.uid)
+
         return {
             "message": "Password reset successfully"
         }
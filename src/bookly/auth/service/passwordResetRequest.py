@@ -5,7 +5,7 @@ from bookly.auth.userRepository import UserRepository
 from bookly.errors import UserNotFound
 from bookly.config import settings
 from bookly.auth.utils import create_url_safe_token
-from bookly.mail import mail, create_message
+from bookly.outbox.repository import OutboxRepository
 
 
 class PasswordResetRequestService:
@@ -18,6 +18,7 @@ class PasswordResetRequestService:
     
     def __init__(self, user_repository: UserRepository):
         self.userRepository = user_repository
+        self.outboxRepository = OutboxRepository()
 
     async def execute(self, email_data: PasswordResetRequestDTO, session: AsyncSession) -> dict:
         """
@@ -43,17 +44,18 @@ class PasswordResetRequestService:
         # Preparar y enviar correo de confirmación
         token = create_url_safe_token({"email": email})
         link = f"http://{settings.DOMAIN}/api/v1/auth/password-reset-confirm/{token}"
-        html_message = f"""
-        <h1>Reset your password.</h1>
-        <p>Please click this <a href="{link}">link</a> to reset your password.</p>
-        """
-        message = create_message(
-            recipients=[email],
-            subject="Reset your password - FastAPI",
-            body=html_message,
+        # El correo se guarda en la outbox y lo envía un worker: la petición
+        # no espera al servidor SMTP
+        self.outboxRepository.add(
+            {
+                "recipients": [email],
+                "subject": "Reset your password - FastAPI",
+                "template": "password_reset.html",
+                "context": {"link": link},
+            },
+            session,
         )
-
-        await mail.send_message(message)
+        await session.commit()
 
         return {
             "message": "Please check your email for instructions to reset your password."
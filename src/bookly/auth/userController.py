@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Depends, status, BackgroundTasks
+from fastapi import APIRouter, Depends, status, BackgroundTasks, Request, Response, Query
 from sqlmodel.ext.asyncio.session import AsyncSession
 from datetime import timedelta, datetime
+from typing import Optional
+import logging
 
 from bookly.auth.service.passwordResetConfirm import PasswordResetConfirmService
 from bookly.auth.service.passwordResetRequest import PasswordResetRequestService
@@ -10,31 +12,50 @@ from bookly.auth.userDto import (
     UserCreateDTO,
     UserDTO,
     UserLoginDTO,
-    UserBooksReviewsDTO,
+    UserMeDTO,
+    UserBulkCreateDTO,
+    UserBulkCreateReportDTO,
     EmailDTO,
     UserCreateResponseDTO,
     UserVerifyResponseDTO,
 )
 from bookly.db.main import get_session
 from bookly.auth.userRepository import UserRepository
+from bookly.book.BookRepository import BooksRepository
+from bookly.reviews.reviewRepository import ReviewRepository
 from bookly.auth.userModel import User
 from bookly.auth.service.createUser import CreateUserService
+from bookly.auth.service.bulkCreateUsers import BulkCreateUsersService
 from bookly.auth.service.validateUser import ValidateUserService
 from fastapi.responses import JSONResponse
-from .utils import create_access_token, verify_password
+from .utils import create_access_token
+from .passwordHasher import password_hasher
+from .loginThrottle import login_throttle
+from .principal import Principal
 from .dependencies import (
     RefreshTokenBearer,
     AccessTokenBearer,
-    get_current_user,
+    get_current_principal,
     RoleChecker,
 )
 from bookly.db.redis import add_jti_to_blocklist
-from bookly.errors import InvalidCredentials, InvalidToken, UserNotFound
+from bookly.errors import InvalidCredentials, InvalidToken, UserNotFound, ValidationError
+from bookly.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from bookly.http_cache import make_etag, etag_matches, set_cache_headers, not_modified
 from bookly.db.main import get_session
 from bookly.celery_task import send_mail
+from bookly.config import QUEUE_BULK
+
+logger = logging.getLogger(__name__)
 
 auth_router = APIRouter()
 role_checker = RoleChecker(["admin", "user"])
+admin_role_checker = RoleChecker(["admin"])
+book_repository = BooksRepository()
+review_repository = ReviewRepository()
+
+# Colecciones que se pueden pedir en GET /me?include=
+ME_INCLUDES = {"books", "reviews"}
 
 REFRESH_TOKEN_EXPIRY = 2  # days
 
@@ -42,10 +63,12 @@ REFRESH_TOKEN_EXPIRY = 2  # days
 @auth_router.post("/send-email")
 async def send_email(emails: EmailDTO):
     # emails = emails.addresses
-    html = "<h1>Wel to the App!</h1>"
     subject = f"Email testing Celery. Current time: {datetime.now()}"
 
-    send_mail.delay(emails.addresses, subject, html)
+    # Envío masivo: va a la cola bulk y no demora a los correos transaccionales
+    send_mail.delay(
+        emails.addresses, subject, template="welcome.html", priority=QUEUE_BULK
+    )
 
     # Deprecated version:
     # message = create_message(recipients=emails.addresses, subject="Welcome", body=html)
@@ -65,6 +88,27 @@ async def create_user_account(
     return await createUserService.execute(user_data, session)
 
 
+@auth_router.post(
+    "/users/bulk",
+    response_model=UserBulkCreateReportDTO,
+    dependencies=[Depends(admin_role_checker)],
+)
+async def bulk_create_users(
+    bulk_data: UserBulkCreateDTO,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Da de alta muchos usuarios en una sola petición (solo administradores).
+
+    Los emails ya registrados o repetidos se informan en el reporte en lugar de
+    fallar la petición; los usuarios creados reciben el correo de verificación.
+    """
+    userRepository = UserRepository()
+    bulkCreateUsersService = BulkCreateUsersService(userRepository)
+
+    return await bulkCreateUsersService.execute(bulk_data.users, session)
+
+
 @auth_router.get("/verify/{token}", response_model=UserVerifyResponseDTO)
 async def verify_user_account(token: str, session: AsyncSession = Depends(get_session)):
     """
@@ -78,32 +122,58 @@ async def verify_user_account(token: str, session: AsyncSession = Depends(get_se
 
 @auth_router.post("/login")
 async def login_users(
-    login_data: UserLoginDTO, session: AsyncSession = Depends(get_session)
+    login_data: UserLoginDTO,
+    request: Request,
+    session: AsyncSession = Depends(get_session),
 ):
 
     # Esta lógica debería de estar en un Service
     email = login_data.email
     password = login_data.password
 
+    # Rechazar ráfagas antes de tocar la BD o ejecutar bcrypt
+    client_ip = request.client.host if request.client else None
+    await login_throttle.check(email, client_ip)
+
     userRepository = UserRepository()
 
     user = await userRepository.get_user_by_email(email, session)
 
     if user is not None and user.password_hash:
-        pass_valid = verify_password(password, user.password_hash)
+        pass_valid = await password_hasher.verify(password, user.password_hash)
 
         if pass_valid:
+            await login_throttle.reset(email)
+
+            # Los datos del token se leen antes del rehash: si el UPDATE falla,
+            # el rollback expira el objeto y no se puede volver a cargar aquí
+            user_email = user.email
+            user_uid = str(user.uid)
+            user_role = user.role
+
+            # Regenerar el hash si se guardó con otro costo de bcrypt; un fallo
+            # aquí no debe impedir el login
+            if password_hasher.needs_rehash(user.password_hash):
+                try:
+                    new_hash = await password_hasher.hash(password)
+                    await userRepository.update_user(
+                        user, {"password_hash": new_hash}, session
+                    )
+                except Exception as e:
+                    logger.error(f"Error al regenerar el hash de {email}: {e}")
+                    await session.rollback()
+
             access_token = create_access_token(
                 user_data={
-                    "email": user.email,
-                    "user_uid": str(user.uid),
-                    "role": user.role,
+                    "email": user_email,
+                    "user_uid": user_uid,
+                    "role": user_role,
                 },
                 expiry=timedelta(hours=1),  # Access token expira en 1 hora
             )
 
             refresh_token = create_access_token(
-                user_data={"email": user.email, "user_uid": str(user.uid)},
+                user_data={"email": user_email, "user_uid": user_uid},
                 refresh=True,
                 expiry=timedelta(days=REFRESH_TOKEN_EXPIRY),
             )
@@ -113,7 +183,7 @@ async def login_users(
                     "message": "Login sucessful",
                     "access_token": access_token,
                     "refresh_token": refresh_token,
-                    "user": {"email": user.email, "uid": str(user.uid)},
+                    "user": {"email": user_email, "uid": user_uid},
                 }
             )
 
@@ -132,22 +202,85 @@ async def get_new_access_token(token_details: dict = Depends(RefreshTokenBearer(
     raise InvalidToken
 
 
-@auth_router.get("/me", response_model=UserBooksReviewsDTO)
+@auth_router.get("/me", response_model=UserMeDTO, response_model_exclude_unset=True)
 async def get_me(
-    user: User = Depends(get_current_user), _: bool = Depends(role_checker)
-) -> UserBooksReviewsDTO:
+    request: Request,
+    response: Response,
+    include: Optional[str] = Query(
+        None, description="Colecciones a incluir separadas por coma: books,reviews"
+    ),
+    books_limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    books_cursor: Optional[str] = None,
+    reviews_limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    reviews_cursor: Optional[str] = None,
+    user: Principal = Depends(get_current_principal),
+    _: bool = Depends(role_checker),
+    session: AsyncSession = Depends(get_session),
+) -> UserMeDTO:
     """
     Obtiene la información del usuario actual.
     Requiere autenticación y rol de admin.
+
+    Por defecto devuelve solo los datos del usuario. Con `include=books,reviews`
+    agrega una página de cada colección, con su propio límite y cursor.
+
+    Soporta GET condicional con If-None-Match / ETag: si los datos del usuario,
+    sus libros y sus reviews no cambiaron se responde 304 sin cargarlos.
+
+    Raises:
+        ValidationError: Si `include` tiene valores desconocidos o un cursor es inválido
     """
-    return user
+    includes = set()
+    if include:
+        includes = {part.strip() for part in include.split(",") if part.strip()}
+    unknown = includes - ME_INCLUDES
+    if unknown:
+        raise ValidationError(
+            f"Invalid include: {', '.join(sorted(unknown))}. "
+            f"Use any of: {', '.join(sorted(ME_INCLUDES))}."
+        )
+
+    user_repository = UserRepository()
+    validator = await user_repository.get_user_validator(user.uid, session)
+    if validator is None:
+        raise UserNotFound()
+
+    # La misma versión del usuario se ve distinta según la página pedida
+    etag = make_etag(
+        *validator,
+        ",".join(sorted(includes)),
+        books_limit,
+        books_cursor,
+        reviews_limit,
+        reviews_cursor,
+    )
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+
+    current_user = await user_repository.get_user_by_email(user.email, session)
+    me = UserDTO.model_validate(current_user).model_dump()
+
+    if "books" in includes:
+        books, next_cursor = await book_repository.get_books_by_user(
+            user.uid, session, books_limit, books_cursor
+        )
+        me["books"] = {"items": books, "next_cursor": next_cursor}
+
+    if "reviews" in includes:
+        reviews, next_cursor = await review_repository.get_reviews_by_user(
+            user.uid, session, reviews_limit, reviews_cursor
+        )
+        me["reviews"] = {"items": reviews, "next_cursor": next_cursor}
+
+    set_cache_headers(response, etag)
+    return me
 
 
 @auth_router.get("/logout")
 async def revoke_token(token_detail: dict = Depends(AccessTokenBearer())):
     jti = token_detail["jti"]
 
-    await add_jti_to_blocklist(jti)
+    await add_jti_to_blocklist(jti, token_detail["exp"])
 
     return JSONResponse(
         content={"message": "Loggued out successfully."}, status_code=status.HTTP_200_OK
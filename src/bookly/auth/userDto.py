@@ -1,10 +1,10 @@
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel, Field, ConfigDict, field_validator
 from datetime import datetime
 import uuid
 
-from bookly.book.BooksDto import BookDTO
-from bookly.reviews.reviewDto import ReviewDTO
+from bookly.book.BooksDto import BookDTO, BookPageDTO
+from bookly.reviews.reviewDto import ReviewDTO, ReviewPageDTO
 
 
 class UserCreateDTO(BaseModel):
@@ -16,6 +16,35 @@ class UserCreateDTO(BaseModel):
     last_name: str = Field(..., min_length=1, max_length=20)
 
 
+class UserBulkCreateDTO(BaseModel):
+    """
+    Alta masiva de usuarios (solo administradores).
+
+    Attributes:
+        users: Usuarios a crear (máximo 5000 por petición)
+    """
+    users: List[UserCreateDTO] = Field(..., min_length=1, max_length=5000)
+
+
+class UserBulkCreatedDTO(BaseModel):
+    uid: uuid.UUID
+    email: str
+
+
+class UserBulkCreateReportDTO(BaseModel):
+    """
+    Resultado del alta masiva de usuarios.
+
+    Attributes:
+        created: Usuarios creados (se les envió el correo de verificación)
+        existing: Emails que ya estaban registrados
+        duplicated: Emails repetidos dentro de la misma petición (se crea el primero)
+    """
+    created: List[UserBulkCreatedDTO]
+    existing: List[str]
+    duplicated: List[str]
+
+
 class UserDTO(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -43,6 +72,18 @@ class UserBooksReviewsDTO(UserDTO):
     reviews: List[ReviewDTO]
 
 
+class UserMeDTO(UserDTO):
+    """
+    Usuario actual con las colecciones pedidas en `include`.
+
+    Attributes:
+        books: Página de libros del usuario (solo si se pidió include=books)
+        reviews: Página de reviews del usuario (solo si se pidió include=reviews)
+    """
+    books: Optional[BookPageDTO] = None
+    reviews: Optional[ReviewPageDTO] = None
+
+
 class UserLoginDTO(BaseModel):
     email: str = Field(..., format="email", max_length=40)
     password: str = Field(..., min_length=8)
@@ -1,18 +1,97 @@
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlmodel import select
+from sqlmodel import select, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from datetime import datetime
+from typing import List, Set, Tuple
+import uuid
 from .userModel import User
+from bookly.book.BookModel import Book
+from bookly.reviews.reviewModel import Review
 from .userDto import UserCreateDTO
-from .utils import generate_passwd_hash
+from .passwordHasher import password_hasher
+from .principal import principal_cache
+from bookly.db.loading import LoadProfile, loader_options
+
+# Filas por INSERT en bulk_create_users (asyncpg admite hasta 32767 parámetros)
+BULK_INSERT_BATCH_SIZE = 1000
+
+# Relaciones que carga cada perfil sobre un select(User)
+USER_LOAD_PROFILES = {
+    LoadProfile.BARE: (),
+    LoadProfile.WITH_REVIEWS: ("reviews",),
+    LoadProfile.FULL: ("books", "reviews"),
+}
 
 
 class UserRepository:
-    async def get_user_by_email(self, email: str, session: AsyncSession) -> User:
-        stm = select(User).where(User.email == email)
+    async def get_user_by_email(
+        self,
+        email: str,
+        session: AsyncSession,
+        profile: LoadProfile = LoadProfile.BARE,
+    ) -> User:
+        """
+        Busca un usuario por su email.
+
+        Args:
+            email: Email del usuario
+            session: Sesión de base de datos asíncrona
+            profile: Relaciones a cargar junto con el usuario
+
+        Returns:
+            Usuario encontrado o None si no existe
+        """
+        stm = (
+            select(User)
+            .where(User.email == email)
+            .options(*loader_options(User, USER_LOAD_PROFILES, profile))
+        )
         result = await session.exec(stm)
         user = result.first()
         return user
 
+    async def get_user_validator(self, user_uid, session: AsyncSession) -> tuple:
+        """
+        Obtiene los valores que identifican la versión actual de un usuario y
+        de los libros y reviews que se devuelven con él, sin cargar relaciones.
+
+        Args:
+            user_uid: Identificador único del usuario
+            session: Sesión de base de datos asíncrona
+
+        Returns:
+            Tupla (uid, updated_at, última modificación de libros, cantidad de
+            libros, última modificación de reviews, cantidad de reviews) o None
+        """
+
+        def latest(model):
+            return (
+                select(func.max(model.updated_at))
+                .where(model.user_uid == User.uid)
+                .scalar_subquery()
+            )
+
+        def count(model):
+            return (
+                select(func.count())
+                .select_from(model)
+                .where(model.user_uid == User.uid)
+                .scalar_subquery()
+            )
+
+        stm = select(
+            User.uid,
+            User.updated_at,
+            latest(Book),
+            count(Book),
+            latest(Review),
+            count(Review),
+        ).where(User.uid == user_uid)
+
+        result = await session.exec(stm)
+        row = result.first()
+        return tuple(row) if row is not None else None
+
     async def user_exists(self, email, session: AsyncSession) -> bool:
         user = await self.get_user_by_email(email, session)
         return True if user is not None else False
@@ -25,7 +104,7 @@ class UserRepository:
         password = user_dict.pop("password")
 
         new_user = User(**user_dict)
-        new_user.password_hash = generate_passwd_hash(password)
+        new_user.password_hash = await password_hasher.hash(password)
 
         session.add(new_user)
         await session.commit()
@@ -35,6 +114,70 @@ class UserRepository:
 
         return new_user
 
+    async def get_existing_emails(
+        self, emails: List[str], session: AsyncSession
+    ) -> Set[str]:
+        """
+        Obtiene, en una sola consulta, cuáles de los emails ya están registrados.
+
+        Args:
+            emails: Emails a comprobar
+            session: Sesión de base de datos asíncrona
+
+        Returns:
+            Conjunto con los emails que ya existen
+        """
+        if not emails:
+            return set()
+
+        stm = select(User.email).where(User.email.in_(emails))
+        result = await session.exec(stm)
+        return set(result.all())
+
+    async def bulk_create_users(
+        self, users_data: List[dict], session: AsyncSession
+    ) -> List[Tuple[uuid.UUID, str]]:
+        """
+        Inserta muchos usuarios con INSERT ... ON CONFLICT DO NOTHING RETURNING.
+
+        Los emails que ya existen (o que otro proceso insertó entre la
+        comprobación y el INSERT) se omiten sin error gracias al índice único
+        de users.email. No hace commit: quien la llama confirma la transacción
+        (por ejemplo junto con los correos de verificación de la outbox).
+
+        Args:
+            users_data: Filas con las columnas de User (password_hash ya calculado)
+            session: Sesión de base de datos asíncrona
+
+        Returns:
+            Lista de (uid, email) de los usuarios efectivamente insertados
+        """
+        users = User.__table__
+        now = datetime.now()
+        created = []
+
+        for start in range(0, len(users_data), BULK_INSERT_BATCH_SIZE):
+            rows = [
+                {
+                    "uid": uuid.uuid4(),
+                    "is_verified": False,
+                    "created_at": now,
+                    "updated_at": now,
+                    **row,
+                }
+                for row in users_data[start : start + BULK_INSERT_BATCH_SIZE]
+            ]
+            stm = (
+                pg_insert(users)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=[users.c.email])
+                .returning(users.c.uid, users.c.email)
+            )
+            result = await session.execute(stm)
+            created.extend((row.uid, row.email) for row in result)
+
+        return created
+
     async def update_user(self, user: User, user_data: dict, session: AsyncSession) -> User:
         """
         Actualiza los datos de un usuario.
@@ -58,5 +201,8 @@ class UserRepository:
         session.add(user)
         await session.commit()
         await session.refresh(user)
+
+        # El rol o la verificación pudieron cambiar
+        await principal_cache.invalidate(user.uid)
         
         return user
@@ -1,7 +1,9 @@
 from datetime import timedelta, datetime
 from itsdangerous import URLSafeTimedSerializer
+from typing import Optional
 import bcrypt
 import jwt
+import time
 import uuid
 import logging
 
@@ -12,12 +14,89 @@ ACCESS_TOKE_EXPIRY = 3600
 
 # 
 # * Password management
-def generate_passwd_hash(password: str) -> str:
+# Costo de bcrypt vigente en este proceso (settings.BCRYPT_ROUNDS o calibrado)
+_bcrypt_rounds = settings.BCRYPT_ROUNDS
+
+
+def get_bcrypt_rounds() -> int:
+    """Devuelve el costo de bcrypt con el que se generan los hashes nuevos."""
+    return _bcrypt_rounds
+
+
+def set_bcrypt_rounds(rounds: int) -> None:
+    """
+    Cambia el costo de bcrypt para los hashes nuevos.
+
+    Args:
+        rounds: Costo (entre 4 y 31, límites de bcrypt)
+    """
+    global _bcrypt_rounds
+    if not 4 <= rounds <= 31:
+        raise ValueError("bcrypt rounds must be between 4 and 31")
+    _bcrypt_rounds = rounds
+
+
+def hash_rounds(password_hash: str) -> Optional[int]:
+    """
+    Obtiene el costo con el que se generó un hash bcrypt ($2b$<costo>$...).
+
+    Args:
+        password_hash: Hash almacenado
+
+    Returns:
+        Costo del hash o None si no tiene el formato de bcrypt
+    """
+    try:
+        return int(password_hash.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def calibrate_bcrypt_rounds(target_ms: int, min_rounds: int, max_rounds: int) -> int:
+    """
+    Busca el mayor costo de bcrypt cuyo hash tarda como máximo `target_ms`.
+
+    Cada punto de costo duplica el tiempo, así que se mide con `min_rounds`, se
+    extrapola y se confirma midiendo el costo elegido. Es CPU intensivo (unos
+    pocos hashes): llamar fuera del event loop.
+
+    Args:
+        target_ms: Tiempo objetivo por hash en milisegundos
+        min_rounds: Costo mínimo aceptable (se usa aunque supere el objetivo)
+        max_rounds: Costo máximo a considerar
+
+    Returns:
+        Costo elegido
+    """
+
+    def measure(rounds: int) -> float:
+        start = time.perf_counter()
+        bcrypt.hashpw(b"calibration-password", bcrypt.gensalt(rounds=rounds))
+        return (time.perf_counter() - start) * 1000
+
+    base_ms = measure(min_rounds)
+    rounds = min_rounds
+    while rounds < max_rounds and base_ms * 2 ** (rounds + 1 - min_rounds) <= target_ms:
+        rounds += 1
+
+    # La extrapolación puede pasarse por ruido en la medición base
+    while rounds > min_rounds and measure(rounds) > target_ms:
+        rounds -= 1
+
+    logging.info(
+        f"calibrate_bcrypt_rounds: {rounds} rounds "
+        f"(costo {min_rounds} = {base_ms:.0f} ms, objetivo {target_ms} ms)"
+    )
+    return rounds
+
+
+def generate_passwd_hash(password: str, rounds: Optional[int] = None) -> str:
     """
     Genera un hash bcrypt de una contraseña.
 
     Args:
         password: Contraseña en texto plano a hashear
+        rounds: Costo de bcrypt (por defecto el vigente, ver get_bcrypt_rounds)
 
     Returns:
         Hash bcrypt de la contraseña
@@ -37,7 +116,7 @@ def generate_passwd_hash(password: str) -> str:
         password = password_bytes[:72].decode("utf-8", errors="ignore")
 
     # Generar salt y hash usando bcrypt directamente
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=rounds if rounds is not None else _bcrypt_rounds)
     hash_bytes = bcrypt.hashpw(password.encode("utf-8"), salt)
     return hash_bytes.decode("utf-8")
 
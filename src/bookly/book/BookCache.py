@@ -0,0 +1,132 @@
+"""
+Caché read-through en Redis para el detalle de un libro (BookReviewsDTO).
+
+Las entradas se guardan serializadas como JSON con un TTL y se invalidan desde
+todas las operaciones que modifican el libro, sus reviews o sus tags. Si Redis
+falla, la caché se comporta como un miss y se lee de la base de datos.
+
+Cada libro tiene además un contador de versión que invalidate incrementa. En
+un miss se lee la versión antes de consultar la base de datos y set sólo
+guarda el DTO si la versión no cambió mientras tanto; así una lectura lenta
+no vuelve a cachear un libro que una escritura acaba de invalidar.
+"""
+from typing import Optional, Tuple
+import logging
+import uuid
+
+from bookly.config import settings
+from bookly.db.redis import SET_IF_VERSION_LUA, get_redis
+from .BooksDto import BookReviewsDTO
+
+logger = logging.getLogger(__name__)
+
+BOOK_CACHE_PREFIX = "book"
+
+
+class BookCache:
+    """
+    Caché de libros serializados, indexada por el UID del libro.
+    """
+
+    def __init__(self, ttl: int = settings.BOOK_CACHE_TTL):
+        self.ttl = ttl
+        self._script = None
+        self._script_client = None
+
+    @staticmethod
+    def _key(book_uid) -> Optional[str]:
+        """Clave canónica del libro (None si el UID no es un UUID válido)."""
+        try:
+            return f"{BOOK_CACHE_PREFIX}:{uuid.UUID(str(book_uid))}"
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _version_key(key: str) -> str:
+        return f"{key}:version"
+
+    async def get(
+        self, book_uid
+    ) -> Tuple[Optional[BookReviewsDTO], Optional[str]]:
+        """
+        Obtiene un libro de la caché junto con su versión actual.
+
+        Args:
+            book_uid: Identificador único del libro
+
+        Returns:
+            Tupla (DTO del libro o None si no está en caché, versión a pasar a
+            set en un miss; None si no se pudo leer de Redis)
+        """
+        key = self._key(book_uid)
+        if key is None:
+            return None, None
+
+        try:
+            redis = await get_redis()
+            payload, version = await redis.mget(key, self._version_key(key))
+        except Exception as e:
+            logger.error(f"Error al leer libro {book_uid} de la caché: {e}")
+            return None, None
+
+        if payload is None:
+            return None, version or "0"
+
+        return BookReviewsDTO.model_validate_json(payload), None
+
+    async def set(self, book: BookReviewsDTO, version: Optional[str]) -> None:
+        """
+        Guarda un libro en la caché con el TTL configurado.
+
+        No se guarda si el libro se invalidó después de leer `version`.
+
+        Args:
+            book: DTO del libro a guardar
+            version: Versión devuelta por get antes de consultar la base de datos
+        """
+        if version is None:
+            return
+
+        key = self._key(book.uid)
+        try:
+            script = await self._get_script()
+            await script(
+                keys=[key, self._version_key(key)],
+                args=[version, book.model_dump_json(), self.ttl],
+            )
+        except Exception as e:
+            logger.error(f"Error al guardar libro {book.uid} en la caché: {e}")
+
+    async def invalidate(self, book_uid) -> None:
+        """
+        Elimina un libro de la caché.
+
+        Args:
+            book_uid: Identificador único del libro
+        """
+        key = self._key(book_uid)
+        if key is None:
+            return
+
+        # La versión vive lo mismo que una entrada, más que cualquier lectura
+        # en curso que todavía pueda intentar el set
+        try:
+            redis = await get_redis()
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.incr(self._version_key(key))
+                pipe.expire(self._version_key(key), self.ttl)
+                pipe.delete(key)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Error al invalidar libro {book_uid} en la caché: {e}")
+
+    async def _get_script(self):
+        # El script se registra sobre el cliente actual (se recrea si cambió)
+        redis = await get_redis()
+        if self._script is None or self._script_client is not redis:
+            self._script = redis.register_script(SET_IF_VERSION_LUA)
+            self._script_client = redis
+        return self._script
+
+
+book_cache = BookCache()
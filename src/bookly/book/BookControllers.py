@@ -1,12 +1,27 @@
-from fastapi import APIRouter, status, Depends
-from typing import List
+from fastapi import APIRouter, status, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Optional
+from datetime import datetime
 from sqlmodel.ext.asyncio.session import AsyncSession
 import logging
 
-from .BooksDto import BookDTO, BookUpdateDTO, BookCreateDTO, BookReviewsDTO
-from bookly.errors import BookNotFound, BooklyException
+from .BooksDto import (
+    BookDTO,
+    BookUpdateDTO,
+    BookCreateDTO,
+    BookReviewsDTO,
+    BookPageDTO,
+    BookImportReportDTO,
+    BookBatchRequestDTO,
+    BookBatchDTO,
+)
+from .service.importBooks import ImportBooksService
+from bookly.errors import BookNotFound, BooklyException, ValidationError
+from bookly.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from bookly.http_cache import make_etag, etag_matches, set_cache_headers, not_modified
 from bookly.book.BookRepository import BooksRepository
 from bookly.db.main import get_session
+from bookly.db.loading import LoadProfile
 from bookly.auth.dependencies import AccessTokenBearer, RoleChecker
 
 logger = logging.getLogger(__name__)
@@ -15,54 +30,164 @@ book_router = APIRouter()
 book_service = BooksRepository()
 access_token_bearer = AccessTokenBearer()
 role_checker = Depends(RoleChecker(["admin", "user"]))
+admin_role_checker = Depends(RoleChecker(["admin"]))
 
 
-@book_router.get("/", response_model=List[BookDTO], dependencies=[role_checker])
+@book_router.get("/", response_model=BookPageDTO, dependencies=[role_checker])
 async def get_all_books(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     session: AsyncSession = Depends(get_session),
     token_details: dict =Depends(access_token_bearer),
-) -> List[BookDTO]:
+) -> BookPageDTO:
     """
-    Obtiene todos los libros del sistema.
+    Obtiene una página de libros del sistema.
 
     Args:
+        limit: Cantidad máxima de libros por página
+        cursor: Cursor `next_cursor` devuelto por la página anterior
         session: Sesión de base de datos
 
     Returns:
-        List[Book]: Lista de todos los libros
+        BookPageDTO: Libros de la página y cursor de la siguiente
 
     Raises:
+        ValidationError: Si el cursor es inválido
         BooklyException: Si ocurre un error al obtener los libros
     """
     print(token_details)
     try:
-        logger.info("Obteniendo todos los libros")
-        books = await book_service.get_all_books(session)
+        logger.info("Obteniendo página de libros")
+        books, next_cursor = await book_service.get_all_books(session, limit, cursor)
         logger.info(f"Se encontraron {len(books)} libros")
-        return books
+        return {"items": books, "next_cursor": next_cursor}
+    except ValidationError:
+        raise
     except Exception as e:
         logger.error(f"Error al obtener libros: {str(e)}")
         raise BooklyException(f"Error al obtener libros: {str(e)}")
 
 
-@book_router.get("/user/{user_uid}", response_model=List[BookDTO], dependencies=[role_checker])
+@book_router.get("/user/{user_uid}", response_model=BookPageDTO, dependencies=[role_checker])
 async def get_books_by_user(
     user_uid: str, 
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     session: AsyncSession = Depends(get_session),
     token_details: dict =Depends(access_token_bearer),
-) -> List[BookDTO]:
-    """ PENDIENTE REDACTAR """
+) -> BookPageDTO:
+    """
+    Obtiene una página de los libros creados por un usuario.
+
+    Args:
+        user_uid: Identificador único del usuario
+        limit: Cantidad máxima de libros por página
+        cursor: Cursor `next_cursor` devuelto por la página anterior
+        session: Sesión de base de datos
+
+    Returns:
+        BookPageDTO: Libros de la página y cursor de la siguiente
+
+    Raises:
+        ValidationError: Si el cursor es inválido
+        BooklyException: Si ocurre un error al obtener los libros
+    """
     print(token_details)
     try:
-        logger.info("Obteniendo todos los libros")
-        books = await book_service.get_books_by_user(user_uid, session)
+        logger.info(f"Obteniendo página de libros del usuario {user_uid}")
+        books, next_cursor = await book_service.get_books_by_user(
+            user_uid, session, limit, cursor
+        )
         logger.info(f"Se encontraron {len(books)} libros")
-        return books
+        return {"items": books, "next_cursor": next_cursor}
+    except ValidationError:
+        raise
     except Exception as e:
         logger.error(f"Error al obtener libros: {str(e)}")
         raise BooklyException(f"Error al obtener libros: {str(e)}")
 
 
+@book_router.get("/search", response_model=BookPageDTO, dependencies=[role_checker])
+async def search_books(
+    q: str = Query(..., min_length=1, max_length=200),
+    language: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(access_token_bearer),
+) -> BookPageDTO:
+    """
+    Busca libros por título, autor o editorial, ordenados por relevancia.
+
+    Args:
+        q: Texto a buscar (admite "frases", OR y -exclusiones)
+        language: Idioma para el stemming de la consulta (por defecto todos)
+        limit: Cantidad máxima de libros por página
+        cursor: Cursor `next_cursor` devuelto por la página anterior
+        session: Sesión de base de datos
+
+    Returns:
+        BookPageDTO: Libros encontrados y cursor de la siguiente página
+
+    Raises:
+        ValidationError: Si el cursor es inválido
+        BooklyException: Si ocurre un error al buscar los libros
+    """
+    try:
+        logger.info(f"Buscando libros: {q}")
+        books, next_cursor = await book_service.search_books(
+            q, session, language=language, limit=limit, cursor=cursor
+        )
+        logger.info(f"Se encontraron {len(books)} libros")
+        return {"items": books, "next_cursor": next_cursor}
+    except ValidationError:
+        raise
+    except Exception as e:
+        logger.error(f"Error al buscar libros: {str(e)}")
+        raise BooklyException(f"Error al buscar libros: {str(e)}")
+
+
+@book_router.post("/batch", response_model=BookBatchDTO, dependencies=[role_checker])
+async def get_books_batch(
+    batch_data: BookBatchRequestDTO,
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(access_token_bearer),
+) -> BookBatchDTO:
+    """
+    Obtiene varios libros (con sus reviews) en una sola petición.
+
+    Pensado para pantallas que muestran muchos libros a la vez: la
+    autenticación y las consultas se pagan una vez por lote en lugar de una
+    vez por libro. Los resultados respetan el orden de `uids` y los libros
+    inexistentes se marcan con `found: false`.
+
+    Args:
+        batch_data: UIDs de los libros a obtener (máximo 200)
+        session: Sesión de base de datos
+
+    Returns:
+        BookBatchDTO: Un resultado por cada UID pedido
+
+    Raises:
+        BooklyException: Si ocurre un error al obtener los libros
+    """
+    try:
+        logger.info(f"Obteniendo lote de {len(batch_data.uids)} libros")
+        books = await book_service.get_books_by_uids(
+            batch_data.uids, session, profile=LoadProfile.WITH_REVIEWS
+        )
+        logger.info(f"Se encontraron {len(books)} libros")
+        return {
+            "items": [
+                {"uid": uid, "found": uid in books, "book": books.get(uid)}
+                for uid in batch_data.uids
+            ]
+        }
+    except Exception as e:
+        logger.error(f"Error al obtener lote de libros: {str(e)}")
+        raise BooklyException(f"Error al obtener lote de libros: {str(e)}")
+
+
 @book_router.post(
     "/",
     status_code=status.HTTP_201_CREATED,
@@ -103,21 +228,108 @@ async def create_a_book(
         raise BooklyException(f"Error interno del servidor: {str(e)}")
 
 
+@book_router.get("/export", dependencies=[role_checker])
+async def export_books(
+    updated_since: Optional[datetime] = None,
+    user_uid: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(access_token_bearer),
+) -> StreamingResponse:
+    """
+    Exporta el catálogo como NDJSON (un BookDTO por línea) en streaming.
+
+    Los libros se leen con un cursor del servidor y se envían a medida que
+    llegan, por lo que el primer byte sale de inmediato y la memoria es
+    constante. La sesión sigue abierta mientras dura el stream porque las
+    dependencias con yield se cierran al terminar la respuesta.
+
+    Args:
+        updated_since: Solo libros modificados desde esta fecha (ISO 8601)
+        user_uid: Solo libros creados por este usuario
+        session: Sesión de base de datos
+
+    Returns:
+        StreamingResponse con media type application/x-ndjson
+    """
+    logger.info(
+        f"Exportando libros (updated_since={updated_since}, user_uid={user_uid})"
+    )
+
+    async def ndjson_lines() -> AsyncIterator[str]:
+        async for book in book_service.stream_books(
+            session, updated_since=updated_since, user_uid=user_uid
+        ):
+            book_dto = BookDTO.model_validate(book, from_attributes=True)
+            yield book_dto.model_dump_json() + "\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+
+@book_router.post(
+    "/import", response_model=BookImportReportDTO, dependencies=[admin_role_checker]
+)
+async def import_books(
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(access_token_bearer),
+) -> BookImportReportDTO:
+    """
+    Importa libros masivamente desde el cuerpo de la petición.
+
+    El cuerpo se procesa en streaming: `Content-Type: application/x-ndjson`
+    (un objeto BookCreateDTO por línea) o `text/csv` (con fila de cabecera).
+
+    Args:
+        request: Request de FastAPI (se lee su cuerpo como stream)
+        session: Sesión de base de datos
+
+    Returns:
+        BookImportReportDTO: Cantidad importada y errores por fila
+
+    Raises:
+        ValidationError: Si el Content-Type no está soportado
+    """
+    content_type = request.headers.get("content-type", "")
+    import_format = "csv" if "csv" in content_type else "ndjson"
+    if not any(kind in content_type for kind in ("csv", "ndjson", "jsonl", "json")):
+        raise ValidationError(
+            "Unsupported content type. Use application/x-ndjson or text/csv."
+        )
+
+    user_uid = token_details.get('user')['user_uid']
+    logger.info(f"Importando libros ({import_format}) para el usuario {user_uid}")
+
+    import_service = ImportBooksService(book_service)
+    return await import_service.execute(
+        request.stream(), import_format, user_uid, session
+    )
+
+
 @book_router.get("/{book_uid}", response_model=BookReviewsDTO, dependencies=[role_checker])
 async def get_book(
     book_uid: str,
+    request: Request,
+    response: Response,
     session: AsyncSession = Depends(get_session),
     token_details: dict =Depends(access_token_bearer),
 ) -> BookDTO:
     """
     Obtiene un libro por su identificador único.
 
+    Soporta GET condicional: si el header If-None-Match coincide con el ETag
+    se responde 304 sin serializar el libro. El ETag se calcula del mismo DTO
+    que se sirve (de la caché o de la base de datos), así que nunca describe
+    un cuerpo distinto; sólo en un miss de la caché se consulta antes el
+    validador para evitar cargar las reviews.
+
     Args:
         book_uid: Identificador único del libro
+        request: Request de FastAPI (para leer If-None-Match)
+        response: Respuesta en la que se agregan ETag y Cache-Control
         session: Sesión de base de datos
 
     Returns:
-        Book: Libro encontrado
+        Book: Libro encontrado (o 304 Not Modified)
 
     Raises:
         BookNotFound: Si el libro no existe
@@ -125,14 +337,31 @@ async def get_book(
     """
     logger.info(f"Buscando libro con UID: {book_uid}")
     try:
-        book = await book_service.get_book(book_uid, session)
-
-        if book:
-            logger.info(f"Libro encontrado: {book.title}")
-            return book
-        else:
-            logger.warning(f"Libro no encontrado con UID: {book_uid}")
-            raise BookNotFound(f"No existe un libro con el UID: {book_uid}")
+        if_none_match = request.headers.get("if-none-match")
+        book, cache_version = await book_service.get_cached_book_details(book_uid)
+
+        if book is None:
+            validator = await book_service.get_book_validator(book_uid, session)
+            if validator is None:
+                logger.warning(f"Libro no encontrado con UID: {book_uid}")
+                raise BookNotFound(f"No existe un libro con el UID: {book_uid}")
+
+            etag = make_etag(*validator)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+
+            book = await book_service.load_book_details(book_uid, session, cache_version)
+            if book is None:
+                logger.warning(f"Libro no encontrado con UID: {book_uid}")
+                raise BookNotFound(f"No existe un libro con el UID: {book_uid}")
+
+        etag = make_etag(*book_service.book_validator(book))
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+        logger.info(f"Libro encontrado: {book.title}")
+        set_cache_headers(response, etag)
+        return book
     except BookNotFound:
         raise
     except Exception as e:
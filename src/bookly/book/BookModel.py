@@ -1,11 +1,14 @@
 from typing import Optional, TYPE_CHECKING, List
 from sqlmodel import Relationship, SQLModel, Field, Column
+from sqlalchemy import Index, Computed
 import sqlalchemy.dialects.postgresql as pg
 from datetime import datetime
 import uuid
 
 # Import BookTag for link_model (needed at runtime)
 from bookly.tags.model import BookTag
+from bookly.book.BookSearch import BOOK_SEARCH_VECTOR_SQL
+from bookly.reviews.reviewModel import RATING_STARS
 
 if TYPE_CHECKING:
     from bookly.auth.userModel import User
@@ -15,6 +18,15 @@ if TYPE_CHECKING:
 
 class Book(SQLModel, table=True):
     __tablename__ = "books"
+    __table_args__ = (
+        # Soportan la paginación keyset de los listados (ORDER BY created_at, uid)
+        Index("ix_books_created_at_uid", "created_at", "uid"),
+        Index("ix_books_user_uid_created_at_uid", "user_uid", "created_at", "uid"),
+        Index("ix_books_search_vector", "search_vector", postgresql_using="gin"),
+    )
+    # search_vector existe en la tabla pero no se mapea: no se lee en cada
+    # select(Book), solo se usa desde las consultas de búsqueda.
+    __mapper_args__ = {"exclude_properties": ["search_vector"]}
 
     uid: uuid.UUID = Field(
         sa_column=Column(pg.UUID, nullable=False, primary_key=True, default=uuid.uuid4)
@@ -28,16 +40,32 @@ class Book(SQLModel, table=True):
     created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
     updated_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
     user_uid: Optional[uuid.UUID] = Field(default=None, foreign_key="users.uid")
-    # Associated entities
-    user: Optional["User"] = Relationship(back_populates="books")
-    reviews: List["Review"] = Relationship(
-        back_populates="book", sa_relationship_kwargs={"lazy": "selectin"}
+    # Agregados de reviews, mantenidos por ReviewRepository en la misma transacción
+    review_count: int = Field(
+        default=0, sa_column=Column(pg.INTEGER, nullable=False, server_default="0")
+    )
+    rating_sum: int = Field(
+        default=0, sa_column=Column(pg.INTEGER, nullable=False, server_default="0")
     )
-    tags: List["Tag"] = Relationship(
-        link_model=BookTag,
-        back_populates="books",
-        sa_relationship_kwargs={"lazy": "selectin"}
+    # rating_histogram[i] = cantidad de reviews con i + 1 estrellas
+    rating_histogram: List[int] = Field(
+        default_factory=lambda: [0] * RATING_STARS,
+        sa_column=Column(
+            pg.ARRAY(pg.INTEGER), nullable=False, server_default="{0,0,0,0,0}"
+        ),
     )
+    # Generada por Postgres a partir de title/author/publisher y language
+    search_vector: Optional[str] = Field(
+        default=None,
+        exclude=True,
+        sa_column=Column(
+            pg.TSVECTOR, Computed(BOOK_SEARCH_VECTOR_SQL, persisted=True)
+        ),
+    )
+    # Associated entities
+    user: Optional["User"] = Relationship(back_populates="books")
+    reviews: List["Review"] = Relationship(back_populates="book")
+    tags: List["Tag"] = Relationship(link_model=BookTag, back_populates="books")
 
     def __repr__(self):
         return f"<Book {self.title}>"
@@ -1,59 +1,222 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from bookly.book.BookModel import Book
-from .BooksDto import BookCreateDTO, BookUpdateDTO
+from bookly.reviews.reviewModel import Review
+from .BooksDto import BookCreateDTO, BookUpdateDTO, BookReviewsDTO
+from .BookCache import book_cache
+from bookly.pagination import (
+    DEFAULT_PAGE_SIZE,
+    encode_cursor,
+    decode_cursor,
+    paginate_by_created_at,
+)
+from bookly.book.BookSearch import SEARCH_CONFIGS, search_config_for
+from bookly.errors import ValidationError
+from bookly.db.loading import LoadProfile, loader_options
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import select, desc
+from sqlalchemy import tuple_, func, cast, literal, REAL, any_, bindparam
+from sqlalchemy.dialects.postgresql import REGCONFIG, ARRAY, UUID
 import logging
+import uuid
 
 logger = logging.getLogger(__name__)
 
+# Filas que trae cada FETCH del cursor de stream_books
+EXPORT_BATCH_SIZE = 1000
+
+# Columnas que escribe bulk_insert_books, en el orden de cada registro
+BULK_INSERT_COLUMNS = [
+    "uid",
+    "title",
+    "author",
+    "publisher",
+    "published_date",
+    "page_count",
+    "language",
+    "created_at",
+    "updated_at",
+    "user_uid",
+]
+
+# Relaciones que carga cada perfil sobre un select(Book)
+BOOK_LOAD_PROFILES = {
+    LoadProfile.BARE: (),
+    LoadProfile.WITH_REVIEWS: ("reviews",),
+    LoadProfile.FULL: ("reviews", "tags"),
+}
+
 
 class BooksRepository:
     """
     Servicio para gestionar operaciones CRUD de libros.
     """
 
-    async def get_all_books(self, session: AsyncSession) -> List[Book]:
+    async def get_all_books(
+        self,
+        session: AsyncSession,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        profile: LoadProfile = LoadProfile.BARE,
+    ) -> Tuple[List[Book], Optional[str]]:
         """
-        Obtiene todos los libros de la base de datos.
+        Obtiene una página de libros de la base de datos.
 
         Args:
             session: Sesión asíncrona de base de datos
+            limit: Cantidad máxima de libros a devolver
+            cursor: Cursor opaco devuelto por la página anterior (None para la primera)
+            profile: Relaciones a cargar junto con cada libro
 
         Returns:
-            Lista de libros ordenados por fecha de creación descendente
+            Tupla con la lista de libros ordenados por fecha de creación descendente
+            y el cursor de la siguiente página (None si no hay más resultados)
         """
-        statement = select(Book).order_by(desc(Book.created_at))
-        result = await session.exec(statement)
-        return result.all()
+        statement = select(Book).options(
+            *loader_options(Book, BOOK_LOAD_PROFILES, profile)
+        )
+        return await paginate_by_created_at(statement, Book, session, limit, cursor)
 
     async def get_books_by_user(
-        self, user_uid: str, session: AsyncSession
-    ) -> List[Book]:
+        self,
+        user_uid: str,
+        session: AsyncSession,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        profile: LoadProfile = LoadProfile.BARE,
+    ) -> Tuple[List[Book], Optional[str]]:
         """
-        PENDIENTE REDACTAR
+        Obtiene una página de los libros creados por un usuario.
+
+        Args:
+            user_uid: Identificador único del usuario
+            session: Sesión asíncrona de base de datos
+            limit: Cantidad máxima de libros a devolver
+            cursor: Cursor opaco devuelto por la página anterior (None para la primera)
+            profile: Relaciones a cargar junto con cada libro
+
+        Returns:
+            Tupla con la lista de libros ordenados por fecha de creación descendente
+            y el cursor de la siguiente página (None si no hay más resultados)
         """
         statement = (
             select(Book)
             .where(Book.user_uid == user_uid)
-            .order_by(desc(Book.created_at))
+            .options(*loader_options(Book, BOOK_LOAD_PROFILES, profile))
+        )
+        return await paginate_by_created_at(statement, Book, session, limit, cursor)
+
+    async def stream_books(
+        self,
+        session: AsyncSession,
+        updated_since: Optional[datetime] = None,
+        user_uid: Optional[str] = None,
+    ) -> AsyncIterator[Book]:
+        """
+        Recorre los libros con un cursor del lado del servidor.
+
+        Las filas se traen en bloques de EXPORT_BATCH_SIZE, así que la memoria
+        usada no depende del tamaño del catálogo.
+
+        Args:
+            session: Sesión asíncrona de base de datos
+            updated_since: Si se indica, solo libros modificados desde esa fecha
+            user_uid: Si se indica, solo libros creados por ese usuario
+
+        Yields:
+            Libros sin relaciones cargadas
+        """
+        statement = select(Book)
+        if updated_since is not None:
+            if updated_since.tzinfo is not None:
+                # Las fechas se guardan como TIMESTAMP sin zona, en hora local
+                updated_since = updated_since.astimezone().replace(tzinfo=None)
+            statement = statement.where(Book.updated_at >= updated_since)
+        if user_uid is not None:
+            statement = statement.where(Book.user_uid == user_uid)
+
+        result = await session.stream_scalars(
+            statement.execution_options(yield_per=EXPORT_BATCH_SIZE)
         )
+        async for book in result:
+            yield book
+
+    async def search_books(
+        self,
+        query_text: str,
+        session: AsyncSession,
+        language: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Book], Optional[str]]:
+        """
+        Busca libros por título, autor o editorial usando full-text search.
+
+        Los resultados se ordenan por relevancia (`ts_rank`) y se paginan por
+        cursor sobre (rank, uid).
+
+        Args:
+            query_text: Texto de búsqueda (sintaxis de websearch_to_tsquery)
+            session: Sesión asíncrona de base de datos
+            language: Idioma de la consulta; si se omite se combinan todos los
+                diccionarios soportados para encontrar libros en cualquier idioma
+            limit: Cantidad máxima de libros a devolver
+            cursor: Cursor opaco devuelto por la página anterior (None para la primera)
+
+        Returns:
+            Tupla con los libros encontrados y el cursor de la siguiente página
+        """
+        configs = [search_config_for(language)] if language else SEARCH_CONFIGS
+        ts_query = None
+        for config in configs:
+            config_query = func.websearch_to_tsquery(
+                cast(literal(config), REGCONFIG), query_text
+            )
+            ts_query = config_query if ts_query is None else ts_query.op("||")(config_query)
+
+        search_vector = Book.__table__.c.search_vector
+        rank = func.ts_rank(search_vector, ts_query, type_=REAL).label("rank")
+
+        statement = select(Book, rank).where(search_vector.op("@@")(ts_query))
+
+        after = self._decode_search_cursor(cursor)
+        if after is not None:
+            statement = statement.where(tuple_(rank, Book.uid) < after)
+
+        statement = statement.order_by(desc(rank), desc(Book.uid)).limit(limit + 1)
         result = await session.exec(statement)
-        return result.all()
+        rows = result.all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_book, last_rank = rows[-1]
+            next_cursor = encode_cursor({"rank": last_rank, "uid": str(last_book.uid)})
+
+        return [book for book, _ in rows], next_cursor
 
-    async def get_book(self, book_uid: str, session: AsyncSession) -> Optional[Book]:
+    async def get_book(
+        self,
+        book_uid: str,
+        session: AsyncSession,
+        profile: LoadProfile = LoadProfile.BARE,
+    ) -> Optional[Book]:
         """
         Obtiene un libro por su identificador único.
 
         Args:
             book_uid: Identificador único del libro
             session: Sesión asíncrona de base de datos
+            profile: Relaciones a cargar junto con el libro
 
         Returns:
             Libro encontrado o None si no existe
         """
-        statement = select(Book).where(Book.uid == book_uid)
+        statement = (
+            select(Book)
+            .where(Book.uid == book_uid)
+            .options(*loader_options(Book, BOOK_LOAD_PROFILES, profile))
+        )
         result = await session.exec(statement)
 
         if not result:
@@ -62,6 +225,135 @@ class BooksRepository:
 
         return result.first()
 
+    async def get_books_by_uids(
+        self,
+        book_uids: List[uuid.UUID],
+        session: AsyncSession,
+        profile: LoadProfile = LoadProfile.BARE,
+    ) -> Dict[uuid.UUID, Book]:
+        """
+        Obtiene varios libros en una sola consulta (WHERE uid = ANY(:uids)).
+
+        Las relaciones del perfil se cargan con selectinload, es decir una
+        consulta adicional por relación para todo el lote y no una por libro.
+
+        Args:
+            book_uids: Identificadores de los libros
+            session: Sesión asíncrona de base de datos
+            profile: Relaciones a cargar junto con cada libro
+
+        Returns:
+            Diccionario UID -> libro con los libros encontrados
+        """
+        if not book_uids:
+            return {}
+
+        statement = (
+            select(Book)
+            .where(
+                Book.uid == any_(bindparam("book_uids", type_=ARRAY(UUID(as_uuid=True))))
+            )
+            .options(*loader_options(Book, BOOK_LOAD_PROFILES, profile))
+        )
+        result = await session.exec(
+            statement, params={"book_uids": list(dict.fromkeys(book_uids))}
+        )
+        return {book.uid: book for book in result.all()}
+
+    async def get_cached_book_details(
+        self, book_uid: str
+    ) -> Tuple[Optional[BookReviewsDTO], Optional[str]]:
+        """
+        Busca un libro con sus reviews sólo en la caché de Redis.
+
+        Args:
+            book_uid: Identificador único del libro
+
+        Returns:
+            Tupla (DTO del libro o None en un miss, versión de la caché a pasar
+            a load_book_details)
+        """
+        return await book_cache.get(book_uid)
+
+    async def load_book_details(
+        self, book_uid: str, session: AsyncSession, cache_version: Optional[str]
+    ) -> Optional[BookReviewsDTO]:
+        """
+        Carga un libro con sus reviews de la base de datos y lo guarda en caché.
+
+        No se guarda si una escritura invalidó el libro después de leer
+        cache_version.
+
+        Args:
+            book_uid: Identificador único del libro
+            session: Sesión asíncrona de base de datos
+            cache_version: Versión devuelta por get_cached_book_details
+
+        Returns:
+            DTO del libro con sus reviews o None si no existe
+        """
+        book = await self.get_book(book_uid, session, profile=LoadProfile.WITH_REVIEWS)
+        if book is None:
+            return None
+
+        book_details = BookReviewsDTO.model_validate(book, from_attributes=True)
+        await book_cache.set(book_details, cache_version)
+        return book_details
+
+    async def get_book_validator(
+        self, book_uid: str, session: AsyncSession
+    ) -> Optional[tuple]:
+        """
+        Obtiene los valores que identifican la versión actual de un libro.
+
+        Es una sola consulta sobre columnas y agregados (sin cargar reviews)
+        pensada para calcular ETags. Los valores coinciden con los que
+        devuelve book_validator para el DTO del mismo libro.
+
+        Args:
+            book_uid: Identificador único del libro
+            session: Sesión asíncrona de base de datos
+
+        Returns:
+            Tupla (uid, updated_at, última modificación de reviews, cantidad de
+            reviews) o None si el libro no existe
+        """
+        reviews_updated_at = (
+            select(func.max(Review.updated_at))
+            .where(Review.book_uid == Book.uid)
+            .scalar_subquery()
+        )
+        reviews_count = (
+            select(func.count())
+            .select_from(Review)
+            .where(Review.book_uid == Book.uid)
+            .scalar_subquery()
+        )
+        statement = select(
+            Book.uid, Book.updated_at, reviews_updated_at, reviews_count
+        ).where(Book.uid == book_uid)
+
+        result = await session.exec(statement)
+        row = result.first()
+        return tuple(row) if row is not None else None
+
+    @staticmethod
+    def book_validator(book: BookReviewsDTO) -> tuple:
+        """
+        Calcula el validador de get_book_validator a partir del DTO servido.
+
+        Args:
+            book: DTO del libro con sus reviews
+
+        Returns:
+            Tupla (uid, updated_at, última modificación de reviews, cantidad de
+            reviews)
+        """
+        reviews_updated_at = max(
+            (review.updated_at for review in book.reviews), default=None
+        )
+        return book.uid, book.updated_at, reviews_updated_at, len(book.reviews)
+
     async def create_book(
         self, book_data: BookCreateDTO, user_uid: str, session: AsyncSession
     ) -> Book:
@@ -86,6 +378,53 @@ class BooksRepository:
         logger.info(f"Libro creado en BD: {new_book.uid}")
         return new_book
 
+    async def bulk_insert_books(
+        self, books_data: List[BookCreateDTO], user_uid: str, session: AsyncSession
+    ) -> int:
+        """
+        Inserta muchos libros con un único COPY de asyncpg.
+
+        A diferencia de create_book no hay un commit y un refresh por libro: todo
+        el lote viaja en un solo COPY y se confirma con un único commit.
+
+        Args:
+            books_data: Libros ya validados a insertar
+            user_uid: Identificador del usuario que realiza la importación
+            session: Sesión asíncrona de base de datos
+
+        Returns:
+            Cantidad de libros insertados
+        """
+        now = datetime.now()
+        owner_uid = uuid.UUID(str(user_uid))
+        records = [
+            (
+                uuid.uuid4(),
+                book.title,
+                book.author,
+                book.publisher,
+                book.published_date,
+                book.page_count,
+                book.language,
+                now,
+                now,
+                owner_uid,
+            )
+            for book in books_data
+        ]
+
+        # El COPY se ejecuta sobre la conexión asyncpg de la sesión, dentro de su
+        # transacción si ya hay una abierta; el commit la confirma en ambos casos.
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            Book.__tablename__, records=records, columns=BULK_INSERT_COLUMNS
+        )
+        await session.commit()
+
+        logger.info(f"{len(records)} libros importados en BD")
+        return len(records)
+
     async def update_book(
         self, book_uid: str, update_data: BookUpdateDTO, session: AsyncSession
     ) -> Optional[Book]:
@@ -114,6 +453,7 @@ class BooksRepository:
 
             await session.commit()
             await session.refresh(book_to_update)
+            await book_cache.invalidate(book_uid)
 
             logger.info(f"Libro actualizado en BD: {book_uid}")
             return book_to_update
@@ -135,10 +475,22 @@ class BooksRepository:
         book_to_delete = await self.get_book(book_uid, session)
 
         if book_to_delete:
-            session.delete(book_to_delete)
+            await session.delete(book_to_delete)
             await session.commit()
+            await book_cache.invalidate(book_uid)
             logger.info(f"Libro eliminado de BD: {book_uid}")
             return {}
 
         logger.warning(f"Intento de eliminar libro inexistente: {book_uid}")
         return None
+
+    @staticmethod
+    def _decode_search_cursor(cursor: Optional[str]) -> Optional[Tuple[float, uuid.UUID]]:
+        values = decode_cursor(cursor)
+        if values is None:
+            return None
+
+        try:
+            return float(values["rank"]), uuid.UUID(values["uid"])
+        except (KeyError, TypeError, ValueError):
+            raise ValidationError("Invalid cursor.")
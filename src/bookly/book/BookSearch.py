@@ -0,0 +1,72 @@
+"""
+Configuración de la búsqueda full-text de libros.
+
+La columna generada `books.search_vector` indexa título, autor y editorial con
+el diccionario de Postgres que corresponde al idioma del libro (`Book.language`),
+de modo que "running" encuentra "run" en libros en inglés y "corriendo" encuentra
+"correr" en libros en español. Los idiomas desconocidos usan `simple` (sin stemming).
+"""
+from typing import Dict, Optional
+
+# Valores de Book.language (en minúsculas) -> configuración de text search de Postgres
+SEARCH_LANGUAGES: Dict[str, str] = {
+    "english": "english",
+    "en": "english",
+    "spanish": "spanish",
+    "español": "spanish",
+    "espanol": "spanish",
+    "es": "spanish",
+    "french": "french",
+    "français": "french",
+    "francais": "french",
+    "fr": "french",
+    "german": "german",
+    "deutsch": "german",
+    "de": "german",
+    "portuguese": "portuguese",
+    "português": "portuguese",
+    "portugues": "portuguese",
+    "pt": "portuguese",
+    "italian": "italian",
+    "italiano": "italian",
+    "it": "italian",
+}
+
+DEFAULT_SEARCH_CONFIG = "simple"
+
+# Configuraciones distintas, en orden estable, para construir la consulta multi-idioma
+SEARCH_CONFIGS = sorted(set(SEARCH_LANGUAGES.values())) + [DEFAULT_SEARCH_CONFIG]
+
+
+def search_config_for(language: Optional[str]) -> str:
+    """
+    Devuelve la configuración de text search para un idioma.
+
+    Args:
+        language: Idioma tal como se guarda en Book.language
+
+    Returns:
+        Nombre de la configuración de Postgres (por ejemplo "english")
+    """
+    if not language:
+        return DEFAULT_SEARCH_CONFIG
+    return SEARCH_LANGUAGES.get(language.strip().lower(), DEFAULT_SEARCH_CONFIG)
+
+
+def _search_config_sql(column: str) -> str:
+    cases = " ".join(
+        f"WHEN '{language}' THEN '{config}'::regconfig"
+        for language, config in SEARCH_LANGUAGES.items()
+    )
+    return f"CASE lower({column}) {cases} ELSE '{DEFAULT_SEARCH_CONFIG}'::regconfig END"
+
+
+_CONFIG_SQL = _search_config_sql("language")
+
+# Expresión de la columna generada. Debe ser inmutable para poder usarse en
+# GENERATED ALWAYS AS (...) STORED; el título pesa más que autor y editorial.
+BOOK_SEARCH_VECTOR_SQL = (
+    f"setweight(to_tsvector({_CONFIG_SQL}, coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector({_CONFIG_SQL}, coalesce(author, '')), 'B') || "
+    f"setweight(to_tsvector({_CONFIG_SQL}, coalesce(publisher, '')), 'C')"
+)
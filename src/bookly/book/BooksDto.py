@@ -1,5 +1,5 @@
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, computed_field
 from datetime import datetime
 from uuid import UUID
 from typing import List
@@ -18,6 +18,10 @@ class BookDTO(BaseModel):
         published_date: Fecha de publicación (formato: YYYY-MM-DD)
         page_count: Número de páginas
         language: Idioma del libro
+        review_count: Cantidad de reviews
+        rating_sum: Suma de las estrellas de todas las reviews
+        rating_histogram: Cantidad de reviews por estrellas (índice 0 = 1 estrella)
+        average_rating: Promedio de estrellas (None si no hay reviews)
     """
     uid: UUID = Field(..., description="Identificador único del libro")
     title: str = Field(..., min_length=1, description="Título del libro")
@@ -28,10 +32,62 @@ class BookDTO(BaseModel):
     language: str = Field(..., min_length=1, description="Idioma del libro")
     created_at: datetime
     updated_at: datetime
+    review_count: int = 0
+    rating_sum: int = 0
+    rating_histogram: List[int] = Field(default_factory=lambda: [0] * 5)
+
+    @computed_field
+    @property
+    def average_rating(self) -> Optional[float]:
+        if not self.review_count:
+            return None
+        return round(self.rating_sum / self.review_count, 2)
 
 class BookReviewsDTO(BookDTO):
     reviews: List[ReviewDTO]
 
+class BookPageDTO(BaseModel):
+    """
+    Página de libros obtenida con paginación por cursor.
+
+    Attributes:
+        items: Libros de la página actual
+        next_cursor: Cursor para pedir la siguiente página (None si es la última)
+    """
+    items: List[BookDTO]
+    next_cursor: Optional[str] = None
+
+class BookBatchRequestDTO(BaseModel):
+    """
+    Petición para obtener varios libros en una sola llamada.
+
+    Attributes:
+        uids: Identificadores de los libros (se responden en el mismo orden)
+    """
+    uids: List[UUID] = Field(..., min_length=1, max_length=200)
+
+class BookBatchItemDTO(BaseModel):
+    """
+    Resultado de un UID pedido en la consulta por lote.
+
+    Attributes:
+        uid: Identificador pedido
+        found: False si el libro no existe
+        book: Libro con sus reviews (None si no existe)
+    """
+    uid: UUID
+    found: bool
+    book: Optional[BookReviewsDTO] = None
+
+class BookBatchDTO(BaseModel):
+    """
+    Respuesta de la consulta por lote, en el orden de la petición.
+
+    Attributes:
+        items: Un resultado por cada UID pedido
+    """
+    items: List[BookBatchItemDTO]
+
 class BookCreateDTO(BaseModel):
     title: str
     author: str
@@ -41,6 +97,32 @@ class BookCreateDTO(BaseModel):
     language: str
     # user_uid: Optional[str]
 
+class BookImportErrorDTO(BaseModel):
+    """
+    Error de una fila de la importación masiva.
+
+    Attributes:
+        line: Número de línea del cuerpo de la petición (empezando en 1)
+        errors: Mensajes de validación o de base de datos de la fila
+    """
+    line: int
+    errors: List[str]
+
+class BookImportReportDTO(BaseModel):
+    """
+    Resultado de una importación masiva de libros.
+
+    Attributes:
+        imported: Cantidad de libros insertados
+        failed: Cantidad de filas rechazadas
+        errors: Detalle por fila de los rechazos (limitado a BOOK_IMPORT_MAX_ERRORS)
+        errors_truncated: True si hubo más rechazos de los que se detallan
+    """
+    imported: int
+    failed: int
+    errors: List[BookImportErrorDTO]
+    errors_truncated: bool = False
+
 class BookUpdateDTO(BaseModel):
     """
     Modelo para actualizar información de un libro existente (PATCH).
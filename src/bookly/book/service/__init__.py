@@ -0,0 +1,5 @@
+"""
+Book service module.
+
+Contains business logic services for books.
+"""
@@ -0,0 +1,221 @@
+from collections import deque
+from typing import AsyncIterator, List, Tuple
+from sqlmodel.ext.asyncio.session import AsyncSession
+from pydantic import ValidationError as PydanticValidationError
+import csv
+import json
+import logging
+
+from bookly.book.BookRepository import BooksRepository
+from bookly.book.BooksDto import BookCreateDTO
+from bookly.config import settings
+from bookly.errors import ValidationError
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("ndjson", "csv")
+
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+    """
+    Divide un stream de bytes en líneas sin cargar el cuerpo completo en memoria.
+
+    Args:
+        stream: Iterador asíncrono de fragmentos (por ejemplo request.stream())
+
+    Yields:
+        Tuplas (número de línea empezando en 1, contenido de la línea sin el salto)
+    """
+    buffer = b""
+    line_number = 0
+    async for chunk in stream:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            yield line_number, line.rstrip(b"\r")
+
+    if buffer:
+        yield line_number + 1, buffer.rstrip(b"\r")
+
+
+async def iter_csv_records(
+    stream: AsyncIterator[bytes],
+) -> AsyncIterator[Tuple[int, bytes]]:
+    """
+    Agrupa las líneas de un CSV en registros, respetando los campos multilínea.
+
+    Un campo entre comillas puede contener saltos de línea (RFC 4180): mientras
+    la cantidad de comillas acumuladas sea impar, el registro sigue en la línea
+    siguiente. Las comillas escapadas ("") no cambian la paridad.
+
+    Args:
+        stream: Iterador asíncrono de fragmentos (por ejemplo request.stream())
+
+    Yields:
+        Tuplas (número de la primera línea del registro, contenido del registro
+        con sus saltos de línea internos)
+    """
+    record: List[bytes] = []
+    first_line = 0
+    quotes = 0
+    async for line_number, line in iter_lines(stream):
+        if not record:
+            first_line = line_number
+        record.append(line)
+        quotes += line.count(b'"')
+        if quotes % 2 == 0:
+            yield first_line, b"\n".join(record)
+            record = []
+            quotes = 0
+
+    if record:
+        yield first_line, b"\n".join(record)
+
+
+class _RecordFeed:
+    """
+    Entrada de un único csv.reader que se alimenta registro a registro.
+
+    A diferencia de un generador, puede devolver StopIteration cuando se vacía y
+    seguir entregando registros después, así el lector se conserva durante toda
+    la importación.
+    """
+
+    def __init__(self):
+        self.pending = deque()
+
+    def push(self, record: str) -> None:
+        self.pending.append(record)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.pending:
+            raise StopIteration
+        return self.pending.popleft()
+
+
+class ImportBooksService:
+    """
+    Servicio para importar libros masivamente desde NDJSON o CSV.
+
+    Las filas se validan contra BookCreateDTO a medida que llegan y se insertan
+    por lotes de BOOK_IMPORT_CHUNK_SIZE con un único COPY por lote, de modo que
+    la memoria usada depende del tamaño del lote y no del archivo.
+    """
+
+    def __init__(
+        self,
+        book_repository: BooksRepository,
+        chunk_size: int = settings.BOOK_IMPORT_CHUNK_SIZE,
+        max_errors: int = settings.BOOK_IMPORT_MAX_ERRORS,
+    ):
+        self.book_repository = book_repository
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+
+    async def execute(
+        self,
+        stream: AsyncIterator[bytes],
+        import_format: str,
+        user_uid: str,
+        session: AsyncSession,
+    ) -> dict:
+        """
+        Ejecuta la importación.
+
+        Args:
+            stream: Cuerpo de la petición como iterador asíncrono de bytes
+            import_format: "ndjson" (un objeto JSON por línea) o "csv" (con cabecera)
+            user_uid: Identificador del usuario que importa los libros
+            session: Sesión de base de datos asíncrona
+
+        Returns:
+            Diccionario con el reporte de la importación (BookImportReportDTO)
+
+        Raises:
+            ValidationError: Si el formato no está soportado
+        """
+        if import_format not in IMPORT_FORMATS:
+            raise ValidationError(
+                f"Unsupported import format. Use one of: {', '.join(IMPORT_FORMATS)}."
+            )
+
+        report = {"imported": 0, "failed": 0, "errors": [], "errors_truncated": False}
+        chunk: List[Tuple[int, BookCreateDTO]] = []
+        csv_header = None
+        csv_feed = _RecordFeed()
+        csv_reader = csv.reader(csv_feed)
+        records = (
+            iter_csv_records(stream) if import_format == "csv" else iter_lines(stream)
+        )
+
+        async for line_number, raw_line in records:
+            if not raw_line.strip():
+                continue
+
+            try:
+                line = raw_line.decode("utf-8")
+                if import_format == "csv":
+                    csv_feed.push(line)
+                    values = next(csv_reader)
+                    if csv_header is None:
+                        csv_header = [column.strip() for column in values]
+                        continue
+                    row = dict(zip(csv_header, values))
+                else:
+                    row = json.loads(line)
+
+                chunk.append((line_number, BookCreateDTO.model_validate(row)))
+            except PydanticValidationError as e:
+                self._add_error(report, line_number, self._format_errors(e))
+            except (UnicodeDecodeError, ValueError, csv.Error) as e:
+                self._add_error(report, line_number, [str(e)])
+
+            if len(chunk) >= self.chunk_size:
+                await self._flush(chunk, user_uid, session, report)
+                chunk = []
+
+        if chunk:
+            await self._flush(chunk, user_uid, session, report)
+
+        logger.info(
+            f"Importación finalizada: {report['imported']} libros importados, "
+            f"{report['failed']} filas rechazadas"
+        )
+        return report
+
+    async def _flush(
+        self,
+        chunk: List[Tuple[int, BookCreateDTO]],
+        user_uid: str,
+        session: AsyncSession,
+        report: dict,
+    ) -> None:
+        """Inserta un lote; si falla, se rechazan todas sus filas y se continúa."""
+        try:
+            report["imported"] += await self.book_repository.bulk_insert_books(
+                [book for _, book in chunk], user_uid, session
+            )
+        except Exception as e:
+            logger.error(f"Error al importar lote de {len(chunk)} libros: {e}")
+            await session.rollback()
+            for line_number, _ in chunk:
+                self._add_error(report, line_number, [f"Database error: {e}"])
+
+    def _add_error(self, report: dict, line_number: int, errors: List[str]) -> None:
+        report["failed"] += 1
+        if len(report["errors"]) < self.max_errors:
+            report["errors"].append({"line": line_number, "errors": errors})
+        else:
+            report["errors_truncated"] = True
+
+    @staticmethod
+    def _format_errors(error: PydanticValidationError) -> List[str]:
+        messages = []
+        for item in error.errors():
+            field = ".".join(str(loc) for loc in item["loc"])
+            messages.append(f"{field}: {item['msg']}" if field else item["msg"])
+        return messages
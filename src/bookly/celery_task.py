@@ -1,15 +1,176 @@
 from celery import Celery
-from bookly.mail import mail, create_message
-from typing import List
-from asgiref.sync import async_to_sync
+from celery.signals import (
+    before_task_publish,
+    celeryd_after_setup,
+    task_postrun,
+    task_prerun,
+    worker_process_init,
+    worker_process_shutdown,
+    worker_shutdown,
+)
+from bookly.config import settings, QUEUE_TRANSACTIONAL
+from bookly.smtp_pool import (
+    build_email,
+    get_smtp_pool,
+    close_smtp_pool,
+    get_async_smtp_pool,
+    close_async_smtp_pool,
+    TRANSIENT_ERRORS,
+)
+from bookly.mail_templates import template_registry
+from bookly.worker_loop import worker_loop
+from bookly.metrics.tasks import task_metrics, ENQUEUED_AT_HEADER
+from bookly.db.main import task_session, close_db
+from bookly.outbox.repository import OutboxRepository
+from bookly.outbox.service import DrainOutboxService
+from typing import List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
 
 c_app = Celery()
 c_app.config_from_object("bookly.config")
 
 
+@celeryd_after_setup.connect
+def select_worker_queue(sender, instance, **kwargs):
+    """
+    Con CELERY_WORKER_QUEUE el worker consume solo esa cola (si no se pasó -Q).
+    """
+    queues = instance.app.amqp.queues
+    if settings.CELERY_WORKER_QUEUE is not None and len(queues.consume_from) == len(queues):
+        queues.select(settings.CELERY_WORKER_QUEUE)
+        logger.info(f"Worker {sender} atendiendo la cola {settings.CELERY_WORKER_QUEUE}")
+
+
+@before_task_publish.connect
+def mark_task_enqueued(headers=None, **kwargs):
+    """Agrega al mensaje el instante de publicación (para la espera en cola)."""
+    task_metrics.on_publish(headers)
+
+
+@task_prerun.connect
+def record_task_start(task_id=None, task=None, **kwargs):
+    task_metrics.on_start(task_id, getattr(task.request, ENQUEUED_AT_HEADER, None))
+
+
+@task_postrun.connect
+def record_task_finish(task_id=None, task=None, state=None, **kwargs):
+    task_metrics.on_finish(task_id, task.name, state)
+
+
+@worker_process_init.connect
+def load_mail_templates(**kwargs):
+    """Compila las plantillas de correo una vez al iniciar cada proceso del worker."""
+    template_registry.load_all()
+
+
+# worker_process_shutdown solo existe con --pool=prefork; con threads o solo
+# las tareas corren en el proceso principal y se cierra en worker_shutdown
+@worker_shutdown.connect
+@worker_process_shutdown.connect
+def close_smtp_connections(**kwargs):
+    """Cierra las conexiones SMTP persistentes al apagar cada proceso del worker."""
+    close_smtp_pool()
+    if worker_loop.running:
+        worker_loop.stop(cleanup=_close_async_resources())
+
+
+async def _close_async_resources() -> None:
+    await close_async_smtp_pool()
+    await close_db()
+
+
+def use_worker_loop() -> bool:
+    """
+    Indica si las tareas asíncronas van al event loop persistente.
+
+    El loop se levanta en la primera tarea, que ya corre en el proceso que la
+    ejecuta (después del fork con --pool=prefork), con cualquier tipo de pool.
+    """
+    if not settings.CELERY_ASYNC_WORKER:
+        return False
+    worker_loop.start()
+    return True
+
+
+# Un rechazo del servidor hace fallar la tarea; una falla de conexión la
+# reintenta con espera exponencial. Así los estados FAILURE y RETRY de las
+# métricas de tareas reflejan el resultado real del envío.
+@c_app.task(
+    autoretry_for=TRANSIENT_ERRORS,
+    retry_backoff=True,
+    max_retries=settings.SEND_MAIL_MAX_RETRIES,
+)
+def send_mail(
+    recipients: List[str],
+    subject: str,
+    body: Optional[str] = None,
+    template: Optional[str] = None,
+    context: Optional[dict] = None,
+    priority: str = QUEUE_TRANSACTIONAL,
+):
+    """
+    Envía un correo. Lo habitual es pasar template y context en lugar del HTML
+    ya armado: el mensaje de Celery es más chico y el render ocurre en el worker.
+
+    Args:
+        recipients: Destinatarios
+        subject: Asunto
+        body: Cuerpo HTML ya armado
+        template: Nombre de la plantilla en bookly/templates
+        context: Variables de la plantilla
+        priority: "transactional" o "bulk"; lo usa el router de bookly.config
+            para elegir la cola, por eso debe pasarse por nombre
+    """
+    message = build_email(recipients, subject, body, template, context)
+
+    # Reutiliza una conexión SMTP abierta del pool del proceso
+    if use_worker_loop():
+        worker_loop.run(get_async_smtp_pool().send(message))
+    else:
+        get_smtp_pool().send(message)
+
+
 @c_app.task()
-def send_mail(recipients: List[str], subject: str, body: str):
-    
-    message = create_message(recipients=recipients, subject=subject, body=body)
+def send_mail_batch(messages: List[dict]):
+    """
+    Envía varios correos en una sola tarea: por una misma sesión SMTP o, con
+    el event loop persistente, a la vez por varias conexiones del pool.
+
+    Args:
+        messages: Lista de diccionarios con los argumentos de send_mail
+    """
+    emails = [build_email(**item) for item in messages]
+    if use_worker_loop():
+        sent = worker_loop.run(get_async_smtp_pool().send_many(emails))
+    else:
+        sent = get_smtp_pool().send_many(emails)
+    logger.info(f"Lote de correos enviado: {sent}/{len(messages)}")
+
+
+@c_app.task()
+def drain_email_outbox():
+    """
+    Envía los correos pendientes de la outbox (programada en Celery beat).
+
+    Si la ejecución termina con lotes llenos se vuelve a encolar, de modo que
+    con varios workers el drenado se reparte entre ellos (SKIP LOCKED).
+
+    Returns:
+        Reporte de DrainOutboxService
+    """
+    persistent = use_worker_loop()
+    report = worker_loop.run(_drain_email_outbox(persistent))
+    if report["remaining"]:
+        drain_email_outbox.delay()
+    return report
+
+
+async def _drain_email_outbox(persistent: bool) -> dict:
+    service = DrainOutboxService(OutboxRepository())
+    if persistent:
+        service.send_each = get_async_smtp_pool().send_each
 
-    async_to_sync(mail.send_message)(message)
+    async with task_session(persistent=persistent) as session:
+        return await service.execute(session)
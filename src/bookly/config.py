@@ -1,3 +1,5 @@
+from typing import Literal, Optional
+from kombu import Queue
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -17,6 +19,33 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
+    BOOK_CACHE_TTL: int = 300  # segundos
+    # Importación masiva de libros
+    BOOK_IMPORT_CHUNK_SIZE: int = 1000
+    BOOK_IMPORT_MAX_ERRORS: int = 1000
+    # Caché en memoria de JWT ya verificados (entradas por proceso)
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+    # Caché de principals (uid/rol/verificación) usada por la autorización
+    PRINCIPAL_CACHE_TTL: int = 300  # segundos en Redis
+    PRINCIPAL_LOCAL_CACHE_TTL: int = 15  # segundos en memoria de cada worker
+    PRINCIPAL_LOCAL_CACHE_MAX_SIZE: int = 10000
+    # Pool de hashing de contraseñas (bcrypt)
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # "thread" o "process"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64  # en ejecución + en cola; luego 503
+    # Costo de bcrypt (log2 de las iteraciones). Con BCRYPT_CALIBRATE se elige
+    # al arrancar el mayor costo cuyo hash tarda como máximo BCRYPT_TARGET_MS
+    BCRYPT_ROUNDS: int = 12
+    BCRYPT_CALIBRATE: bool = False
+    BCRYPT_TARGET_MS: int = 250
+    BCRYPT_MIN_ROUNDS: int = 10
+    BCRYPT_MAX_ROUNDS: int = 16
+    # Límite de intentos de login (ventana deslizante)
+    LOGIN_THROTTLE_WINDOW: int = 300  # segundos
+    LOGIN_THROTTLE_MAX_PER_EMAIL: int = 10
+    LOGIN_THROTTLE_MAX_PER_IP: int = 50
+    # Resincronización de la copia local de la blocklist de JWT
+    REVOCATION_RESYNC_INTERVAL: int = 300  # segundos
     # REDIS_HOST: str = "localhost"
     # REDIS_PORT: int = 6379
     # Mail
@@ -30,6 +59,29 @@ class Settings(BaseSettings):
     MAIL_SSL_TLS: bool = False
     USE_CREDENTIALS: bool = True
     VALIDATE_CERTS: bool = True
+    # Pool de conexiones SMTP del worker de Celery
+    SMTP_POOL_SIZE: int = 4
+    SMTP_POOL_MAX_IDLE: int = 30  # segundos sin uso antes de verificar con NOOP
+    SMTP_TIMEOUT: int = 30
+    SEND_MAIL_MAX_RETRIES: int = 5  # reintentos de send_mail ante fallas de conexión
+    # Outbox de correos (se drena desde Celery beat)
+    EMAIL_OUTBOX_DRAIN_INTERVAL: int = 5  # segundos
+    EMAIL_OUTBOX_BATCH_SIZE: int = 100
+    EMAIL_OUTBOX_MAX_BATCHES: int = 10  # lotes por ejecución de la tarea
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 5
+    EMAIL_OUTBOX_RETRY_BACKOFF: int = 30  # segundos, se duplica en cada intento
+    # Colas de Celery: cada worker atiende una sola (CELERY_WORKER_QUEUE) con
+    # su propio perfil de concurrencia y prefetch
+    CELERY_WORKER_QUEUE: Optional[Literal["transactional", "bulk"]] = None
+    CELERY_TRANSACTIONAL_CONCURRENCY: int = 4
+    CELERY_TRANSACTIONAL_PREFETCH: int = 1
+    CELERY_BULK_CONCURRENCY: int = 2
+    CELERY_BULK_PREFETCH: int = 16
+    # Tareas asíncronas en un event loop persistente por proceso del worker
+    # (ver bookly.worker_loop); conviene combinarlo con --pool=threads
+    CELERY_ASYNC_WORKER: bool = False
+    # Métricas por tarea de Celery (duración, espera en cola, estados) en Redis
+    TASK_METRICS_ENABLED: bool = True
     # Server configuration
     DOMAIN: str
 
@@ -43,6 +95,76 @@ broker_url = settings.REDIS_URL
 result_backend = settings.REDIS_URL
 broker_connection_retry_on_startup = True
 
+# La API no lee los resultados de las tareas: no se guardan salvo en las que
+# lo pidan con @c_app.task(ignore_result=False), y esos expiran en una hora.
+task_ignore_result = True
+result_expires = 3600
+
+# Colas: los correos transaccionales (verificación, reset de contraseña y la
+# outbox) no comparten cola ni worker con los envíos masivos, así que un
+# envío masivo grande no los deja esperando detrás de él.
+QUEUE_TRANSACTIONAL = "transactional"
+QUEUE_BULK = "bulk"
+
+task_queues = (Queue(QUEUE_TRANSACTIONAL), Queue(QUEUE_BULK))
+task_default_queue = QUEUE_TRANSACTIONAL
+
+# Tareas que siempre van a la cola masiva
+BULK_TASKS = {"bookly.celery_task.send_mail_batch"}
+
+
+def route_task(name, args, kwargs, options, task=None, **kw):
+    """
+    Router de Celery: elige la cola según la tarea o su argumento priority.
+
+    send_mail.delay(..., priority="bulk") va a la cola masiva; el resto de
+    las tareas va a la transaccional salvo las de BULK_TASKS.
+    """
+    if name in BULK_TASKS or (kwargs or {}).get("priority") == QUEUE_BULK:
+        return {"queue": QUEUE_BULK}
+    return {"queue": QUEUE_TRANSACTIONAL}
+
+
+task_routes = (route_task,)
+
+# Perfil de cada cola. Prefetch 1 en la transaccional: un proceso no reserva
+# correos mientras está ocupado y la latencia no depende de la tarea anterior.
+# La masiva reserva más mensajes para rendir más por viaje al broker.
+WORKER_PROFILES = {
+    QUEUE_TRANSACTIONAL: {
+        "concurrency": settings.CELERY_TRANSACTIONAL_CONCURRENCY,
+        "prefetch_multiplier": settings.CELERY_TRANSACTIONAL_PREFETCH,
+    },
+    QUEUE_BULK: {
+        "concurrency": settings.CELERY_BULK_CONCURRENCY,
+        "prefetch_multiplier": settings.CELERY_BULK_PREFETCH,
+    },
+}
+
+# Se aplica aquí (y no en una señal del worker) porque la CLI de Celery toma
+# los valores por defecto de --concurrency y --prefetch-multiplier de esta
+# configuración antes de crear el worker; los flags explícitos siguen ganando.
+if settings.CELERY_WORKER_QUEUE is not None:
+    worker_concurrency = WORKER_PROFILES[settings.CELERY_WORKER_QUEUE]["concurrency"]
+    worker_prefetch_multiplier = WORKER_PROFILES[settings.CELERY_WORKER_QUEUE][
+        "prefetch_multiplier"
+    ]
+
+# Celery beat: drenado periódico de la outbox de correos. La expiración evita
+# que se acumulen ejecuciones si los workers estuvieron caídos.
+beat_schedule = {
+    "drain-email-outbox": {
+        "task": "bookly.celery_task.drain_email_outbox",
+        "schedule": settings.EMAIL_OUTBOX_DRAIN_INTERVAL,
+        "options": {"expires": settings.EMAIL_OUTBOX_DRAIN_INTERVAL},
+    },
+}
+
 # Nota: El pool de workers se especifica al iniciar el worker, no en la configuración
 # En Windows, usa: celery -A bookly.celery_task.c_app worker --pool=solo
-# O para concurrencia: celery -A bookly.celery_task.c_app worker --pool=threads
\ No newline at end of file
+# O para concurrencia: celery -A bookly.celery_task.c_app worker --pool=threads
+# Beat (drenado de la outbox): celery -A bookly.celery_task.c_app beat
+# Un worker por cola:
+#   CELERY_WORKER_QUEUE=transactional celery -A bookly.celery_task.c_app worker -n transactional@%h
+#   CELERY_WORKER_QUEUE=bulk celery -A bookly.celery_task.c_app worker -n bulk@%h
+# Sin CELERY_WORKER_QUEUE (ni -Q) un worker atiende ambas colas, como antes.
\ No newline at end of file
@@ -0,0 +1,48 @@
+"""
+Perfiles de carga de relaciones.
+
+Las relaciones de los modelos usan la carga perezosa por defecto, que con
+AsyncSession no puede emitir SQL implícito. Cada repositorio traduce el perfil
+pedido por el endpoint a loader options (`selectinload`), de modo que solo se
+consultan las relaciones que la respuesta realmente va a leer.
+"""
+from enum import Enum
+from typing import Dict, List, Tuple
+
+from sqlalchemy.orm import selectinload
+
+
+class LoadProfile(str, Enum):
+    """
+    Perfiles de carga soportados por los repositorios.
+
+    Attributes:
+        BARE: Solo las columnas de la entidad, sin relaciones
+        WITH_REVIEWS: La entidad y sus reviews
+        FULL: La entidad con todas sus relaciones de colección
+    """
+
+    BARE = "bare"
+    WITH_REVIEWS = "with_reviews"
+    FULL = "full"
+
+
+def loader_options(
+    model, relationships: Dict[LoadProfile, Tuple[str, ...]], profile: LoadProfile
+) -> List:
+    """
+    Construye las loader options de un perfil para un modelo.
+
+    Se resuelven en cada consulta (y no al importar el módulo) porque crear
+    una option fuerza la configuración de los mappers, que necesita todos los
+    modelos relacionados ya importados.
+
+    Args:
+        model: Modelo SQLModel sobre el que se hace el select
+        relationships: Relaciones que carga cada perfil
+        profile: Perfil pedido por el llamador
+
+    Returns:
+        Lista de options para pasar a `select(...).options(*options)`
+    """
+    return [selectinload(getattr(model, name)) for name in relationships[profile]]
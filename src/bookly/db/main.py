@@ -6,10 +6,12 @@ utilizando SQLModel y SQLAlchemy con soporte asíncrono.
 """
 from sqlmodel import create_engine, text, SQLModel
 from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import NullPool
 from bookly.config import settings
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import sessionmaker
-from typing import AsyncGenerator
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,6 +20,7 @@ logger = logging.getLogger(__name__)
 from bookly.book.BookModel import Book
 from bookly.auth.userModel import User
 from bookly.reviews.reviewModel import Review
+from bookly.outbox.model import EmailOutbox
 
 # Crear el motor de base de datos usando la URL desde configuración
 # * Conexión Síncrona (comentada)
@@ -99,3 +102,35 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
 
     async with Session() as session:
         yield session
+
+
+@asynccontextmanager
+async def task_session(persistent: bool = False) -> AsyncIterator[AsyncSession]:
+    """
+    Abre una sesión para una tarea de Celery.
+
+    Con el event loop persistente del worker (persistent=True) se usa el motor
+    con pool del proceso, cuyas conexiones se reutilizan entre tareas. Si no,
+    cada tarea corre en su propio event loop y las conexiones de asyncpg no
+    pueden pasar de un loop a otro, así que se usa un motor sin pool que se
+    descarta al terminar.
+
+    Args:
+        persistent: Si la tarea corre en el event loop persistente del worker
+
+    Yields:
+        AsyncSession: Sesión de base de datos configurada
+    """
+    if persistent:
+        async with AsyncSession(get_engine(), expire_on_commit=False) as session:
+            yield session
+        return
+
+    task_engine = AsyncEngine(
+        create_engine(url=settings.DATABASE_URL, echo=False, poolclass=NullPool)
+    )
+    try:
+        async with AsyncSession(task_engine, expire_on_commit=False) as session:
+            yield session
+    finally:
+        await task_engine.dispose()
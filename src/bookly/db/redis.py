@@ -1,15 +1,71 @@
 """
 Módulo para gestionar la lista de tokens revocados (blocklist) usando Redis.
+
+Redis es la fuente de verdad, pero cada worker mantiene una copia local de los
+JTIs revocados (RevocationMirror): se siembra desde Redis al arrancar, se
+mantiene al día con un canal pub/sub en el que publica add_jti_to_blocklist y
+se resincroniza periódicamente por si se perdió algún mensaje. Mientras la
+copia está sincronizada la verificación por request es una búsqueda en memoria;
+si la suscripción se cae se vuelve a consultar Redis en cada request.
+
+Los JTIs revocados viven sólo en un sorted set (JTI -> exp). La resincronización
+lo lee sin escribir; las entradas vencidas las poda quien revoca. Las claves
+sueltas por JTI y por usuario de versiones anteriores se copian a los sorted
+sets una sola vez al arrancar (migrate_legacy_revocations).
+
+Además de los JTIs sueltos (logout de una sesión) existe una "época" de
+revocación por usuario: todos los tokens del usuario emitidos hasta ese
+instante son inválidos (logout de todas las sesiones, por ejemplo al
+restablecer la contraseña). Es una sola entrada por usuario sin importar
+cuántas sesiones tenga abiertas.
 """
+from typing import Dict, Optional, Tuple
 from redis.asyncio import Redis
 from redis.asyncio import from_url
 from bookly.config import settings
+from bookly.metrics.registry import metrics_registry
+import asyncio
+import json
 import logging
+import re
+import time
 
 logger = logging.getLogger(__name__)
 
 JTI_EXPIRY = 3600  # Tiempo de expiración en Redis (1 hora, igual que el access token)
 
+# Sorted set jti -> exp (timestamp) con los tokens revocados
+REVOKED_JTIS_KEY = "revoked_jtis"
+# Canal por el que se avisa a los workers de cada nueva revocación
+REVOCATIONS_CHANNEL = "token_revocations"
+# Las revocaciones anteriores al índice son claves sueltas con el JTI (un UUID)
+LEGACY_JTI_PATTERN = "????????-????-????-????-????????????"
+LEGACY_JTI_RE = re.compile(
+    r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$"
+)
+
+# Escritura condicional de las cachés read-through versionadas (libros y
+# principals): invalidate incrementa la versión y un miss sólo guarda lo que
+# leyó de la BD si la versión sigue siendo la que vio antes de leer.
+# KEYS: clave de la entrada, clave de su versión
+# ARGV: versión leída antes de consultar la BD, payload, TTL en segundos
+# Devuelve 1 si se guardó o 0 si la entrada se invalidó mientras tanto
+SET_IF_VERSION_LUA = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+# Sorted set user_uid -> época de revocación (timestamp en segundos)
+REVOKED_USERS_KEY = "revoked_user_epochs"
+# Las épocas anteriores al sorted set son claves sueltas por usuario
+USER_EPOCH_PREFIX = "revoked_before"
+# Vida máxima de un token (refresh token de 2 días): pasado ese tiempo ningún
+# token anterior a la época puede seguir vigente y la entrada ya no hace falta
+USER_EPOCH_EXPIRY = 2 * 24 * 3600
+
 # Cliente Redis global (se inicializa en init_redis)
 token_blocklist: Redis = None
 
@@ -26,7 +82,7 @@ async def init_redis() -> None:
         # db=0,
         decode_responses=True
     )
-    logger.info(f"Redis conectado en {settings.REDIS_HOST}:{settings.REDIS_PORT}")
+    logger.info(f"Redis conectado en {settings.REDIS_URL.split('@')[-1]}")
 
 
 async def close_redis() -> None:
@@ -40,18 +96,297 @@ async def close_redis() -> None:
         logger.info("Conexión a Redis cerrada")
 
 
-async def add_jti_to_blocklist(jti: str) -> None:
+async def get_redis() -> Redis:
+    """
+    Devuelve el cliente Redis compartido, inicializándolo si es necesario.
+
+    Returns:
+        Cliente Redis asíncrono (con decode_responses=True)
+    """
+    if token_blocklist is None:
+        await init_redis()
+    return token_blocklist
+
+
+class RevocationMirror:
+    """
+    Copia en memoria de los JTIs revocados, cada uno con el `exp` de su token.
+    """
+
+    def __init__(self, resync_interval: int = settings.REVOCATION_RESYNC_INTERVAL):
+        self.resync_interval = resync_interval
+        self._revoked: Dict[str, float] = {}
+        # user_uid -> (época, timestamp en el que deja de ser necesaria)
+        self._user_epochs: Dict[str, Tuple[int, float]] = {}
+        # True solo mientras la suscripción al canal está activa y sembrada
+        self.synced = False
+        self.local_checks = 0
+        self.redis_checks = 0
+        self._tasks = []
+
+    def add(self, jti: str, exp: float) -> None:
+        if exp > time.time():
+            self._revoked[jti] = exp
+
+    def contains(self, jti: str) -> bool:
+        """
+        Indica si un JTI está revocado según la copia local.
+
+        Args:
+            jti: Identificador único del token JWT
+
+        Returns:
+            True si el token está revocado y todavía no expiró
+        """
+        self.local_checks += 1
+        exp = self._revoked.get(jti)
+        if exp is None:
+            return False
+        if exp <= time.time():
+            del self._revoked[jti]
+            return False
+        return True
+
+    def add_user_epoch(self, user_uid: str, epoch: int, expires_at: float) -> None:
+        current = self._user_epochs.get(user_uid)
+        if expires_at > time.time() and (current is None or epoch >= current[0]):
+            self._user_epochs[user_uid] = (epoch, expires_at)
+
+    def user_revoked(self, user_uid: str, issued_at: int) -> bool:
+        """
+        Indica si un token del usuario fue emitido antes de su época de revocación.
+
+        Args:
+            user_uid: Identificador del usuario del token
+            issued_at: Claim `iat` del token
+
+        Returns:
+            True si el token quedó revocado por la época del usuario
+        """
+        entry = self._user_epochs.get(user_uid)
+        if entry is None:
+            return False
+        epoch, expires_at = entry
+        if expires_at <= time.time():
+            del self._user_epochs[user_uid]
+            return False
+        return issued_at <= epoch
+
+    def prune(self) -> None:
+        """Elimina las entradas cuyos tokens ya expiraron."""
+        now = time.time()
+        for jti in [jti for jti, exp in self._revoked.items() if exp <= now]:
+            del self._revoked[jti]
+        for user_uid in [
+            user_uid
+            for user_uid, (_, expires_at) in self._user_epochs.items()
+            if expires_at <= now
+        ]:
+            del self._user_epochs[user_uid]
+
+    async def seed(self, redis: Redis) -> None:
+        """
+        Carga desde Redis todos los JTIs revocados y vigentes.
+
+        Une (no reemplaza) con lo que ya hay en memoria: una revocación nunca se
+        deshace, así que no se pierde nada que haya llegado por el canal mientras
+        se leía Redis.
+
+        Args:
+            redis: Cliente Redis
+        """
+        now = time.time()
+        for jti, exp in await redis.zrangebyscore(
+            REVOKED_JTIS_KEY, now, "+inf", withscores=True
+        ):
+            self.add(jti, exp)
+
+        for user_uid, epoch in await redis.zrangebyscore(
+            REVOKED_USERS_KEY, now - USER_EPOCH_EXPIRY, "+inf", withscores=True
+        ):
+            self.add_user_epoch(user_uid, int(epoch), epoch + USER_EPOCH_EXPIRY)
+
+        self.prune()
+        logger.info(
+            f"Blocklist local sincronizada: {len(self._revoked)} JTIs revocados, "
+            f"{len(self._user_epochs)} usuarios con época de revocación"
+        )
+
+    async def start(self) -> None:
+        """Arranca la suscripción al canal y la resincronización periódica."""
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._listen()),
+            asyncio.create_task(self._resync_periodically()),
+        ]
+
+    async def stop(self) -> None:
+        """Detiene las tareas de sincronización."""
+        self.synced = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> dict:
+        """Estado de la copia local para el endpoint de métricas."""
+        return {
+            "synced": self.synced,
+            "size": len(self._revoked),
+            "user_epochs": len(self._user_epochs),
+            "local_checks": self.local_checks,
+            "redis_checks": self.redis_checks,
+        }
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = None
+            try:
+                redis = await get_redis()
+                pubsub = redis.pubsub()
+                # Suscribirse antes de sembrar para no perder revocaciones intermedias
+                await pubsub.subscribe(REVOCATIONS_CHANNEL)
+                await self.seed(redis)
+                self.synced = True
+
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    data = json.loads(message["data"])
+                    if "user_uid" in data:
+                        self.add_user_epoch(
+                            data["user_uid"], data["epoch"], data["expires_at"]
+                        )
+                    else:
+                        self.add(data["jti"], data["exp"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error en la suscripción de revocaciones: {e}")
+            finally:
+                self.synced = False
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+
+            await asyncio.sleep(1)
+
+    async def _resync_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.resync_interval)
+            if not self.synced:
+                continue
+            try:
+                await self.seed(await get_redis())
+            except Exception as e:
+                logger.error(f"Error al resincronizar la blocklist local: {e}")
+
+
+revocation_mirror = RevocationMirror()
+metrics_registry.register("revocation_mirror", revocation_mirror.stats)
+
+
+async def migrate_legacy_revocations(redis: Redis) -> int:
+    """
+    Copia a los sorted sets las revocaciones guardadas como claves sueltas
+    (una por JTI y una por usuario).
+
+    Recorre todo el keyspace con SCAN, así que solo se ejecuta al arrancar;
+    cuando esas claves vencen ya no encuentra nada. No pisa entradas que ya
+    estén en el sorted set.
+
+    Args:
+        redis: Cliente Redis
+
+    Returns:
+        Cantidad de JTIs y usuarios copiados
+    """
+    keys = [
+        key
+        async for key in redis.scan_iter(match=LEGACY_JTI_PATTERN, count=1000)
+        if LEGACY_JTI_RE.match(key)
+    ]
+    epoch_keys = [
+        key async for key in redis.scan_iter(match=f"{USER_EPOCH_PREFIX}:*", count=1000)
+    ]
+    if not keys and not epoch_keys:
+        return 0
+
+    async with redis.pipeline(transaction=False) as pipe:
+        for key in keys:
+            pipe.ttl(key)
+        for key in epoch_keys:
+            pipe.get(key)
+        values = await pipe.execute()
+
+    now = time.time()
+    revoked = {
+        key: now + ttl for key, ttl in zip(keys, values[: len(keys)]) if ttl > 0
+    }
+    epochs = {
+        key.split(":", 1)[1]: int(epoch)
+        for key, epoch in zip(epoch_keys, values[len(keys):])
+        if epoch is not None
+    }
+
+    added = 0
+    if revoked:
+        added += await redis.zadd(REVOKED_JTIS_KEY, revoked, nx=True)
+    if epochs:
+        added += await redis.zadd(REVOKED_USERS_KEY, epochs, gt=True, ch=True)
+    logger.info(f"{added} revocaciones sueltas copiadas a los sorted sets")
+    return added
+
+
+async def start_revocation_mirror() -> None:
+    """
+    Arranca la copia local de la blocklist.
+    Debe ser llamado durante el startup de la aplicación.
+    """
+    try:
+        await migrate_legacy_revocations(await get_redis())
+    except Exception as e:
+        logger.error(f"Error al migrar las revocaciones sueltas: {e}")
+    await revocation_mirror.start()
+
+
+async def stop_revocation_mirror() -> None:
+    """
+    Detiene la copia local de la blocklist.
+    Debe ser llamado durante el shutdown de la aplicación.
+    """
+    await revocation_mirror.stop()
+
+
+async def add_jti_to_blocklist(jti: str, exp: Optional[float] = None) -> None:
     """
-    Añade un JTI (JWT ID) a la blocklist de tokens revocados.
+    Añade un JTI (JWT ID) a la blocklist de tokens revocados y avisa a los
+    demás workers por el canal de revocaciones.
     
+    La entrada vive lo que le queda de vida al token: después el token ya es
+    rechazado por expirado.
+
     Args:
         jti: Identificador único del token JWT a revocar
+        exp: Timestamp de expiración del token (por defecto ahora + JTI_EXPIRY)
     """
     if token_blocklist is None:
         await init_redis()
-    
+
+    if exp is None:
+        exp = time.time() + JTI_EXPIRY
+
     try:
-        await token_blocklist.set(name=jti, value="revoked", ex=JTI_EXPIRY)
+        async with token_blocklist.pipeline(transaction=True) as pipe:
+            pipe.zadd(REVOKED_JTIS_KEY, {jti: exp})
+            # Las entradas vencidas se podan al escribir, no al resincronizar
+            pipe.zremrangebyscore(REVOKED_JTIS_KEY, "-inf", time.time())
+            pipe.publish(REVOCATIONS_CHANNEL, json.dumps({"jti": jti, "exp": exp}))
+            await pipe.execute()
+        revocation_mirror.add(jti, exp)
         logger.info(f"Token JTI {jti} añadido a la blocklist")
     except Exception as e:
         logger.error(f"Error al añadir JTI a blocklist: {e}")
@@ -68,13 +403,81 @@ async def token_in_blocklist(jti: str) -> bool:
     Returns:
         True si el token está revocado, False si es válido
     """
+    if revocation_mirror.synced:
+        return revocation_mirror.contains(jti)
+
     if token_blocklist is None:
         await init_redis()
     
+    revocation_mirror.redis_checks += 1
     try:
-        exists = await token_blocklist.exists(jti)
-        return exists == 1
+        exp = await token_blocklist.zscore(REVOKED_JTIS_KEY, jti)
+        return exp is not None and exp > time.time()
     except Exception as e:
         logger.error(f"Error al verificar JTI en blocklist: {e}")
         # En caso de error, permitimos el token (fail-open para evitar bloqueos)
         return False
+
+
+async def revoke_user_tokens(user_uid: str) -> None:
+    """
+    Revoca todos los tokens emitidos hasta ahora para un usuario.
+
+    Guarda la época (timestamp actual) en el sorted set de usuarios y avisa a
+    los demás workers; los tokens con `iat` menor o igual a la época se
+    rechazan. Los tokens emitidos en el mismo segundo que la revocación también
+    quedan revocados, así que el usuario puede tener que volver a iniciar sesión.
+
+    Args:
+        user_uid: Identificador único del usuario
+    """
+    if token_blocklist is None:
+        await init_redis()
+
+    user_uid = str(user_uid)
+    epoch = int(time.time())
+    expires_at = epoch + USER_EPOCH_EXPIRY
+
+    try:
+        async with token_blocklist.pipeline(transaction=True) as pipe:
+            pipe.zadd(REVOKED_USERS_KEY, {user_uid: epoch}, gt=True)
+            # Pasado USER_EPOCH_EXPIRY ningún token anterior a la época sigue vigente
+            pipe.zremrangebyscore(REVOKED_USERS_KEY, "-inf", epoch - USER_EPOCH_EXPIRY)
+            pipe.publish(
+                REVOCATIONS_CHANNEL,
+                json.dumps(
+                    {"user_uid": user_uid, "epoch": epoch, "expires_at": expires_at}
+                ),
+            )
+            await pipe.execute()
+        revocation_mirror.add_user_epoch(user_uid, epoch, expires_at)
+        logger.info(f"Tokens del usuario {user_uid} revocados hasta {epoch}")
+    except Exception as e:
+        logger.error(f"Error al revocar tokens del usuario {user_uid}: {e}")
+        raise
+
+
+async def user_tokens_revoked(user_uid: str, issued_at: int) -> bool:
+    """
+    Verifica si un token fue emitido antes de la época de revocación de su usuario.
+
+    Args:
+        user_uid: Identificador único del usuario del token
+        issued_at: Claim `iat` del token
+
+    Returns:
+        True si el token está revocado, False si es válido
+    """
+    if revocation_mirror.synced:
+        return revocation_mirror.user_revoked(str(user_uid), issued_at)
+
+    if token_blocklist is None:
+        await init_redis()
+
+    try:
+        epoch = await token_blocklist.zscore(REVOKED_USERS_KEY, str(user_uid))
+        return epoch is not None and issued_at <= int(epoch)
+    except Exception as e:
+        logger.error(f"Error al verificar la época de revocación del usuario: {e}")
+        # Igual que token_in_blocklist: fail-open para evitar bloqueos
+        return False
@@ -82,6 +82,24 @@ class AccountNotVerified(BooklyException):
     pass
 
 
+class ServiceBusy(BooklyException):
+    """The server is saturated and cannot accept the operation right now."""
+
+    pass
+
+
+class TooManyLoginAttempts(BooklyException):
+    """Too many login attempts for an email or client IP in the current window."""
+
+    def __init__(self, retry_after: int = 1):
+        """
+        Args:
+            retry_after: Segundos hasta que se libera un intento
+        """
+        self.retry_after = retry_after
+        super().__init__(f"Too many login attempts, retry after {retry_after}s")
+
+
 class ValidationError(BooklyException):
     """
     Error de validación para datos de entrada.
@@ -242,6 +260,16 @@ def register_all_errors(app: FastAPI):
             },
         ),
     )
+    app.add_exception_handler(
+        ServiceBusy,
+        create_exception_handler(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            initial_detail={
+                "message": "The server is busy, please try again in a moment.",
+                "error_code": "service_busy",
+            },
+        ),
+    )
     @app.exception_handler(ValidationError)
     async def validation_error_handler(request: Request, exc: ValidationError):
         """
@@ -256,6 +284,22 @@ def register_all_errors(app: FastAPI):
             status_code=status.HTTP_400_BAD_REQUEST,
         )
 
+    @app.exception_handler(TooManyLoginAttempts)
+    async def too_many_login_attempts_handler(
+        request: Request, exc: TooManyLoginAttempts
+    ):
+        """
+        Manejador para el límite de intentos de login (429 con Retry-After).
+        """
+        return JSONResponse(
+            content={
+                "message": "Too many login attempts. Please try again later.",
+                "error_code": "too_many_login_attempts",
+            },
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+
     @app.exception_handler(500)
     async def internal_server_error(request, exc):
         return JSONResponse(
@@ -0,0 +1,80 @@
+"""
+Utilidades de caché HTTP: ETags débiles y GET condicional (If-None-Match).
+
+Los controllers calculan el ETag a partir de un "validador" barato (UID, fechas
+de modificación y conteos) sin cargar relaciones; si coincide con el que envía
+el cliente se responde 304 sin volver a consultar ni serializar el recurso.
+"""
+from typing import Any, Optional
+import hashlib
+
+from fastapi import Response, status
+
+# Respuestas autenticadas: solo caché del cliente y siempre revalidando
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Construye un ETag débil a partir de los valores que identifican una versión.
+
+    Args:
+        parts: Valores del validador (UID, updated_at, conteos, ...)
+
+    Returns:
+        ETag con formato W/"<hash>"
+    """
+    raw = "|".join("" if part is None else str(part) for part in parts)
+    digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Compara el header If-None-Match con un ETag usando comparación débil.
+
+    Args:
+        if_none_match: Valor del header (puede traer varios ETags separados por coma)
+        etag: ETag actual del recurso
+
+    Returns:
+        True si el cliente ya tiene la versión actual
+    """
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    current = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == current
+        for candidate in if_none_match.split(",")
+    )
+
+
+def set_cache_headers(response: Response, etag: str) -> None:
+    """
+    Agrega los headers ETag y Cache-Control a una respuesta.
+
+    Args:
+        response: Respuesta (o parámetro Response de FastAPI) a modificar
+        etag: ETag actual del recurso
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    """
+    Construye una respuesta 304 Not Modified con los headers de caché.
+
+    Args:
+        etag: ETag actual del recurso
+
+    Returns:
+        Response sin cuerpo con status 304
+    """
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_cache_headers(response, etag)
+    return response
@@ -0,0 +1,93 @@
+"""
+Registro de plantillas Jinja de los correos.
+
+Los servicios ya no arman el HTML en la petición: envían a la outbox (o a
+send_mail) solo el nombre de la plantilla y su contexto, y el worker renderiza
+el cuerpo. Las plantillas de bookly/templates se compilan una sola vez al
+iniciar cada proceso del worker y se guardan en memoria, así que renderizar
+no vuelve a leer ni a compilar archivos.
+"""
+from pathlib import Path
+from typing import Dict, Optional
+import logging
+import threading
+
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_FOLDER = Path(__file__).resolve().parent / "templates"
+
+
+class TemplateRegistry:
+    """
+    Plantillas compiladas indexadas por nombre (por ejemplo "verify_email.html").
+    """
+
+    def __init__(self, folder: Path = TEMPLATE_FOLDER) -> None:
+        # auto_reload=False: Jinja no vuelve a revisar el archivo en cada uso
+        self.environment = Environment(
+            loader=FileSystemLoader(folder),
+            autoescape=select_autoescape(["html"]),
+            auto_reload=False,
+        )
+        self._templates: Dict[str, Template] = {}
+        self._lock = threading.Lock()
+        self.renders = 0
+
+    def load_all(self) -> int:
+        """
+        Compila todas las plantillas de la carpeta (al iniciar el worker).
+
+        Returns:
+            Cantidad de plantillas cargadas
+        """
+        templates = {
+            name: self.environment.get_template(name)
+            for name in self.environment.list_templates()
+        }
+        with self._lock:
+            self._templates.update(templates)
+        logger.info(f"Plantillas de correo compiladas: {len(templates)}")
+        return len(templates)
+
+    def get(self, name: str) -> Template:
+        """
+        Obtiene una plantilla compilada, cargándola si todavía no lo está.
+
+        Args:
+            name: Nombre del archivo dentro de la carpeta de plantillas
+
+        Returns:
+            Plantilla compilada
+
+        Raises:
+            TemplateNotFound: Si la plantilla no existe
+        """
+        template = self._templates.get(name)
+        if template is None:
+            template = self.environment.get_template(name)
+            with self._lock:
+                self._templates[name] = template
+        return template
+
+    def render(self, name: str, context: Optional[dict] = None) -> str:
+        """
+        Renderiza una plantilla.
+
+        Args:
+            name: Nombre de la plantilla
+            context: Variables de la plantilla
+
+        Returns:
+            HTML renderizado
+        """
+        body = self.get(name).render(context or {})
+        self.renders += 1
+        return body
+
+    def stats(self) -> dict:
+        return {"templates": len(self._templates), "renders": self.renders}
+
+
+template_registry = TemplateRegistry()
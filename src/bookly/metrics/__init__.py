@@ -0,0 +1,3 @@
+"""
+Métricas internas de la aplicación (cachés, colas, rate limits, workers).
+"""
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends
+
+from bookly.auth.dependencies import RoleChecker
+from .registry import metrics_registry
+
+metrics_router = APIRouter()
+admin_role_checker = Depends(RoleChecker(["admin"]))
+
+
+@metrics_router.get("/", dependencies=[admin_role_checker])
+async def get_metrics() -> dict:
+    """
+    Devuelve un snapshot de las métricas internas de la aplicación.
+
+    Returns:
+        Diccionario con una sección por componente registrado
+    """
+    return await metrics_registry.snapshot()
@@ -0,0 +1,58 @@
+"""
+Registro de proveedores de métricas.
+
+Cada componente registra una función que devuelve un diccionario con sus
+contadores (puede ser síncrona o asíncrona); el endpoint de métricas arma un
+snapshot con todos ellos sin que el registro conozca a los componentes.
+"""
+from typing import Awaitable, Callable, Dict, Union
+import inspect
+import logging
+
+logger = logging.getLogger(__name__)
+
+MetricsProvider = Callable[[], Union[dict, Awaitable[dict]]]
+
+
+class MetricsRegistry:
+    """
+    Proveedores de métricas indexados por nombre.
+    """
+
+    def __init__(self) -> None:
+        self._providers: Dict[str, MetricsProvider] = {}
+
+    def register(self, name: str, provider: MetricsProvider) -> None:
+        """
+        Registra (o reemplaza) un proveedor de métricas.
+
+        Args:
+            name: Nombre de la sección en el snapshot (por ejemplo "token_cache")
+            provider: Función sin argumentos que devuelve un diccionario
+        """
+        self._providers[name] = provider
+
+    async def snapshot(self) -> Dict[str, dict]:
+        """
+        Obtiene los valores actuales de todos los proveedores.
+
+        Un proveedor que falla no impide leer el resto: su sección devuelve
+        el error en lugar de los contadores.
+
+        Returns:
+            Diccionario nombre -> métricas del proveedor
+        """
+        snapshot = {}
+        for name, provider in self._providers.items():
+            try:
+                values = provider()
+                if inspect.isawaitable(values):
+                    values = await values
+                snapshot[name] = values
+            except Exception as e:
+                logger.error(f"Error al leer métricas de {name}: {e}")
+                snapshot[name] = {"error": str(e)}
+        return snapshot
+
+
+metrics_registry = MetricsRegistry()
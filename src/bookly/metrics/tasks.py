@@ -0,0 +1,167 @@
+"""
+Métricas de las tareas de Celery para dimensionar los workers.
+
+Los workers registran, con las señales de Celery, el tiempo de ejecución, la
+espera en cola (desde que se publica la tarea hasta que empieza) y el estado
+final de cada tarea en hashes de Redis: un contador por estado y un
+histograma por rangos de milisegundos. La API los lee y los expone en el
+endpoint de métricas con promedios y percentiles aproximados.
+"""
+from typing import Dict, List, Optional
+import logging
+import os
+import threading
+import time
+
+import redis
+
+from bookly.config import settings
+from bookly.db.redis import get_redis
+from .registry import metrics_registry
+
+logger = logging.getLogger(__name__)
+
+TASK_METRICS_PREFIX = "task_metrics"
+TASK_METRICS_NAMES_KEY = f"{TASK_METRICS_PREFIX}:tasks"
+# Header que agrega before_task_publish (segundos epoch; se asume reloj sincronizado)
+ENQUEUED_AT_HEADER = "bookly_enqueued_at"
+# Límites superiores de los rangos del histograma, en milisegundos
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+STATES = ("SUCCESS", "FAILURE", "RETRY")
+
+
+def _bucket(value_ms: float) -> str:
+    for bound in BUCKETS_MS:
+        if value_ms <= bound:
+            return str(bound)
+    return "inf"
+
+
+class TaskMetricsRecorder:
+    """
+    Lado worker: acumula las métricas de cada tarea en Redis.
+
+    Cada tarea escribe una sola vez (un pipeline al terminar). Si Redis
+    falla se registra el error y la tarea sigue sin métricas.
+    """
+
+    def __init__(self, enabled: bool = settings.TASK_METRICS_ENABLED) -> None:
+        self.enabled = enabled
+        self._started: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._client: Optional[redis.Redis] = None
+        self._client_pid: Optional[int] = None
+
+    def on_publish(self, headers: Optional[dict]) -> None:
+        """Marca el instante de publicación en los headers del mensaje."""
+        if self.enabled and headers is not None:
+            headers.setdefault(ENQUEUED_AT_HEADER, time.time())
+
+    def on_start(self, task_id: str, enqueued_at: Optional[float]) -> None:
+        """Guarda el inicio de la tarea (task_prerun)."""
+        if not self.enabled:
+            return
+        now = time.time()
+        wait_ms = None
+        if enqueued_at is not None:
+            wait_ms = max((now - float(enqueued_at)) * 1000, 0)
+        with self._lock:
+            self._started[task_id] = (time.perf_counter(), wait_ms)
+
+    def on_finish(self, task_id: str, task_name: str, state: Optional[str]) -> None:
+        """Registra duración, espera y estado final de la tarea (task_postrun)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            started = self._started.pop(task_id, None)
+        if started is None:
+            return
+
+        started_at, wait_ms = started
+        runtime_ms = (time.perf_counter() - started_at) * 1000
+        key = f"{TASK_METRICS_PREFIX}:{task_name}"
+
+        try:
+            pipe = self._redis().pipeline(transaction=False)
+            pipe.sadd(TASK_METRICS_NAMES_KEY, task_name)
+            pipe.hincrby(key, "count", 1)
+            pipe.hincrby(key, f"state:{state}", 1)
+            pipe.hincrbyfloat(key, "runtime_ms_sum", runtime_ms)
+            pipe.hincrby(key, f"runtime:{_bucket(runtime_ms)}", 1)
+            if wait_ms is not None:
+                pipe.hincrby(key, "wait_count", 1)
+                pipe.hincrbyfloat(key, "wait_ms_sum", wait_ms)
+                pipe.hincrby(key, f"wait:{_bucket(wait_ms)}", 1)
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Error al registrar métricas de la tarea {task_name}: {e}")
+
+    def _redis(self) -> redis.Redis:
+        # Un cliente por proceso: no se comparte el socket después del fork
+        if self._client is None or self._client_pid != os.getpid():
+            self._client = redis.Redis.from_url(settings.REDIS_URL)
+            self._client_pid = os.getpid()
+        return self._client
+
+
+def _percentile(histogram: Dict[str, int], total: int, quantile: float) -> Optional[float]:
+    """Límite superior del rango que contiene el percentil (None si supera el último)."""
+    if total == 0:
+        return None
+    target = quantile * total
+    seen = 0
+    for bound in BUCKETS_MS:
+        seen += histogram.get(str(bound), 0)
+        if seen >= target:
+            return bound
+    return None
+
+
+def _summary(values: Dict[str, str], prefix: str, total: int, total_ms: float) -> dict:
+    histogram = {
+        field.split(":", 1)[1]: int(count)
+        for field, count in values.items()
+        if field.startswith(f"{prefix}:")
+    }
+    return {
+        "avg": round(total_ms / total, 2) if total else None,
+        "p50": _percentile(histogram, total, 0.50),
+        "p95": _percentile(histogram, total, 0.95),
+        "p99": _percentile(histogram, total, 0.99),
+    }
+
+
+async def task_metrics_snapshot() -> dict:
+    """
+    Lado API: resume las métricas de todas las tareas registradas.
+
+    Los percentiles son aproximados: el límite superior en ms del rango del
+    histograma donde caen (None si caen por encima del último rango).
+
+    Returns:
+        Diccionario nombre de tarea -> métricas
+    """
+    client = await get_redis()
+    names: List[str] = sorted(await client.smembers(TASK_METRICS_NAMES_KEY))
+    snapshot = {}
+    for name in names:
+        values = await client.hgetall(f"{TASK_METRICS_PREFIX}:{name}")
+        count = int(values.get("count", 0))
+        wait_count = int(values.get("wait_count", 0))
+        states = {state.lower(): int(values.get(f"state:{state}", 0)) for state in STATES}
+        snapshot[name] = {
+            "count": count,
+            **states,
+            "failure_rate": round(states["failure"] / count, 4) if count else 0.0,
+            "runtime_ms": _summary(
+                values, "runtime", count, float(values.get("runtime_ms_sum", 0))
+            ),
+            "queue_wait_ms": _summary(
+                values, "wait", wait_count, float(values.get("wait_ms_sum", 0))
+            ),
+        }
+    return snapshot
+
+
+task_metrics = TaskMetricsRecorder()
+metrics_registry.register("celery_tasks", task_metrics_snapshot)
@@ -0,0 +1,4 @@
+"""
+Outbox transaccional de correos: se escriben junto con el cambio que los
+origina y un worker de Celery los envía por lotes.
+"""
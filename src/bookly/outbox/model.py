@@ -0,0 +1,57 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID, uuid4
+from sqlalchemy import Index, text
+from sqlalchemy.dialects import postgresql as pg
+from sqlmodel import Field, Column, SQLModel
+
+OUTBOX_PENDING = "pending"
+OUTBOX_FAILED = "failed"
+
+
+class EmailOutbox(SQLModel, table=True):
+    """
+    Correo pendiente de envío (patrón transactional outbox).
+
+    Se inserta en la misma transacción que el cambio que lo origina y lo envía
+    después un worker de Celery; al enviarse la fila se elimina.
+
+    Attributes:
+        uid: Identificador único del correo
+        message: Argumentos de send_mail (recipients, subject, template, context)
+        status: "pending" mientras quedan intentos, "failed" al agotarlos
+        attempts: Intentos de envío fallidos
+        last_error: Último error devuelto por el servidor SMTP
+        available_at: Momento a partir del cual se puede (re)intentar el envío
+        created_at: Fecha de creación
+    """
+
+    __tablename__ = "email_outbox"
+    # Solo se indexan las filas pendientes: las que busca el drenado
+    __table_args__ = (
+        Index(
+            "ix_email_outbox_pending",
+            "available_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
+
+    uid: UUID = Field(
+        sa_column=Column(pg.UUID, nullable=False, primary_key=True, default=uuid4)
+    )
+    message: dict = Field(sa_column=Column(pg.JSONB, nullable=False))
+    status: str = Field(
+        default=OUTBOX_PENDING,
+        sa_column=Column(pg.VARCHAR, nullable=False, server_default=OUTBOX_PENDING),
+    )
+    attempts: int = Field(
+        default=0, sa_column=Column(pg.INTEGER, nullable=False, server_default="0")
+    )
+    last_error: Optional[str] = Field(default=None, sa_column=Column(pg.TEXT))
+    available_at: datetime = Field(
+        sa_column=Column(pg.TIMESTAMP, nullable=False, default=datetime.now)
+    )
+    created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
+
+    def __repr__(self) -> str:
+        return f"<EmailOutbox {self.uid} {self.status}>"
@@ -0,0 +1,79 @@
+from datetime import datetime
+from typing import List
+from sqlmodel import select
+from sqlalchemy import delete
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .model import EmailOutbox, OUTBOX_PENDING
+
+
+class OutboxRepository:
+
+    def add(self, message: dict, session: AsyncSession) -> EmailOutbox:
+        """
+        Agrega un correo a la outbox sin hacer commit.
+
+        Se confirma con el commit de la operación que lo origina, de modo que
+        el correo existe si y solo si el cambio se guardó.
+
+        Args:
+            message: Argumentos de send_mail (recipients, subject, template, context)
+            session: Sesión de base de datos asíncrona
+
+        Returns:
+            Fila agregada a la sesión
+        """
+        item = EmailOutbox(message=message)
+        session.add(item)
+        return item
+
+    def add_many(self, messages: List[dict], session: AsyncSession) -> None:
+        """
+        Agrega varios correos a la outbox sin hacer commit.
+
+        Args:
+            messages: Argumentos de send_mail de cada correo
+            session: Sesión de base de datos asíncrona
+        """
+        session.add_all([EmailOutbox(message=message) for message in messages])
+
+    async def claim_batch(self, limit: int, session: AsyncSession) -> List[EmailOutbox]:
+        """
+        Bloquea un lote de correos listos para enviar.
+
+        Usa FOR UPDATE SKIP LOCKED: las filas quedan bloqueadas hasta el commit
+        o rollback y otros workers que drenan a la vez toman las siguientes en
+        lugar de esperar, así que dos workers nunca envían el mismo correo. La
+        entrega es al menos una vez: si la conexión SMTP se corta justo durante
+        un envío, ese correo queda pendiente y puede llegar dos veces.
+
+        Args:
+            limit: Cantidad máxima de correos
+            session: Sesión de base de datos asíncrona
+
+        Returns:
+            Correos pendientes, empezando por los más antiguos
+        """
+        stm = (
+            select(EmailOutbox)
+            .where(
+                EmailOutbox.status == OUTBOX_PENDING,
+                EmailOutbox.available_at <= datetime.now(),
+            )
+            .order_by(EmailOutbox.available_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await session.exec(stm)
+        return list(result.all())
+
+    async def delete_many(self, uids: List, session: AsyncSession) -> None:
+        """
+        Elimina correos ya enviados sin hacer commit.
+
+        Args:
+            uids: Identificadores de los correos
+            session: Sesión de base de datos asíncrona
+        """
+        if uids:
+            await session.execute(delete(EmailOutbox).where(EmailOutbox.uid.in_(uids)))
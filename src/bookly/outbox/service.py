@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import Awaitable, Callable, List, Optional
+from sqlmodel.ext.asyncio.session import AsyncSession
+import asyncio
+import logging
+
+from bookly.config import settings
+from bookly.smtp_pool import build_email, get_smtp_pool, NOT_ATTEMPTED
+from .model import EmailOutbox, OUTBOX_FAILED
+from .repository import OutboxRepository
+
+logger = logging.getLogger(__name__)
+
+SendEach = Callable[[List[EmailMessage]], Awaitable[List[Optional[str]]]]
+
+
+async def send_each_in_thread(messages: List[EmailMessage]) -> List[Optional[str]]:
+    """Envía con el pool SMTP síncrono en un hilo, sin bloquear el event loop."""
+    return await asyncio.to_thread(get_smtp_pool().send_each, messages)
+
+
+class DrainOutboxService:
+    """
+    Servicio que envía los correos pendientes de la outbox por lotes.
+
+    Cada lote se bloquea con SKIP LOCKED, se envía por una sola sesión SMTP y
+    se confirma en un commit: los enviados se eliminan y los rechazados se
+    reprograman con espera exponencial hasta agotar los intentos. Varios
+    workers pueden drenar a la vez sin repartirse el mismo correo.
+    """
+
+    def __init__(
+        self,
+        outbox_repository: OutboxRepository,
+        batch_size: int = settings.EMAIL_OUTBOX_BATCH_SIZE,
+        max_batches: int = settings.EMAIL_OUTBOX_MAX_BATCHES,
+        max_attempts: int = settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+        retry_backoff: int = settings.EMAIL_OUTBOX_RETRY_BACKOFF,
+        send_each: SendEach = send_each_in_thread,
+    ):
+        self.outbox_repository = outbox_repository
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        # Con el event loop persistente del worker se pasa el pool asíncrono
+        self.send_each = send_each
+
+    async def execute(self, session: AsyncSession) -> dict:
+        """
+        Drena hasta max_batches lotes.
+
+        Args:
+            session: Sesión de base de datos asíncrona
+
+        Returns:
+            Diccionario con sent, retried, failed y remaining (True si el
+            último lote estaba lleno y probablemente quedan correos)
+        """
+        report = {"sent": 0, "retried": 0, "failed": 0, "remaining": False}
+
+        for _ in range(self.max_batches):
+            batch = await self.outbox_repository.claim_batch(self.batch_size, session)
+            if not batch:
+                break
+
+            # Un correo que no se puede construir (plantilla inexistente o
+            # contexto inválido) cuenta como un intento fallido propio
+            messages, errors = {}, {}
+            for item in batch:
+                try:
+                    messages[item.uid] = build_email(**item.message)
+                except Exception as e:
+                    errors[item.uid] = f"Invalid message: {e}"
+
+            try:
+                results = await self.send_each(list(messages.values()))
+            except Exception as e:
+                # Error inesperado del envío: se liberan las filas sin consumir
+                # intentos y se prueba de nuevo en la próxima ejecución
+                logger.error(f"No se pudo drenar la outbox de correos: {e}")
+                await session.rollback()
+                break
+
+            sent, not_attempted = [], 0
+            for uid, error in zip(messages, results):
+                if error is None:
+                    sent.append(uid)
+                elif error == NOT_ATTEMPTED:
+                    not_attempted += 1
+                else:
+                    errors[uid] = error
+
+            # Aunque la conexión se haya perdido, los ya enviados se eliminan
+            # en este commit para no volver a enviarlos; los no intentados
+            # quedan pendientes sin consumir intentos
+            await self.outbox_repository.delete_many(sent, session)
+            report["sent"] += len(sent)
+
+            for item in batch:
+                if item.uid in errors:
+                    self._schedule_retry(item, errors[item.uid], report)
+
+            await session.commit()
+
+            if not_attempted:
+                logger.error(
+                    f"Drenado de la outbox interrumpido: {not_attempted} correos "
+                    f"quedan pendientes para la próxima ejecución"
+                )
+                break
+
+            if len(batch) < self.batch_size:
+                break
+        else:
+            report["remaining"] = True
+
+        if report["sent"] or report["retried"] or report["failed"]:
+            logger.info(
+                f"Outbox de correos: {report['sent']} enviados, "
+                f"{report['retried']} reprogramados, {report['failed']} descartados"
+            )
+        return report
+
+    def _schedule_retry(self, item: EmailOutbox, error: str, report: dict) -> None:
+        item.attempts += 1
+        item.last_error = error
+        if item.attempts >= self.max_attempts:
+            item.status = OUTBOX_FAILED
+            report["failed"] += 1
+            logger.error(f"Correo {item.uid} descartado tras {item.attempts} intentos: {error}")
+        else:
+            delay = self.retry_backoff * 2 ** (item.attempts - 1)
+            item.available_at = datetime.now() + timedelta(seconds=delay)
+            report["retried"] += 1
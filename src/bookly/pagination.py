@@ -0,0 +1,133 @@
+"""
+Utilidades de paginación por cursor (keyset pagination).
+
+El cursor es opaco para el cliente: codifica en base64 (URL-safe) los valores
+de la última fila entregada, de modo que la siguiente página se obtiene con un
+`WHERE (a, b) < (:a, :b)` sobre un índice en lugar de un OFFSET.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import base64
+import binascii
+import json
+import uuid
+
+from sqlalchemy import desc, tuple_
+
+from bookly.errors import ValidationError
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """
+    Codifica los valores de la última fila de una página en un cursor opaco.
+
+    Args:
+        values: Diccionario con los valores de las columnas de ordenamiento
+            (deben ser serializables a JSON)
+
+    Returns:
+        Cursor como string base64 URL-safe sin padding
+    """
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Decodifica un cursor generado por `encode_cursor`.
+
+    Args:
+        cursor: Cursor recibido del cliente (o None para la primera página)
+
+    Returns:
+        Diccionario con los valores codificados o None si no hay cursor
+
+    Raises:
+        ValidationError: Si el cursor no tiene un formato válido
+    """
+    if not cursor:
+        return None
+
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(cursor + padding)
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise ValidationError("Invalid cursor.")
+
+    if not isinstance(values, dict):
+        raise ValidationError("Invalid cursor.")
+
+    return values
+
+
+def decode_created_at_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, uuid.UUID]]:
+    """
+    Decodifica un cursor de `paginate_by_created_at`.
+
+    Args:
+        cursor: Cursor recibido del cliente (o None para la primera página)
+
+    Returns:
+        Tupla (created_at, uid) de la última fila entregada o None
+
+    Raises:
+        ValidationError: Si el cursor no tiene un formato válido
+    """
+    values = decode_cursor(cursor)
+    if values is None:
+        return None
+
+    try:
+        return (
+            datetime.fromisoformat(values["created_at"]),
+            uuid.UUID(values["uid"]),
+        )
+    except (KeyError, TypeError, ValueError):
+        raise ValidationError("Invalid cursor.")
+
+
+async def paginate_by_created_at(
+    statement, model, session, limit: int, cursor: Optional[str]
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Aplica paginación keyset sobre (created_at, uid) descendente a un select.
+
+    Se pide una fila extra para saber si existe una página siguiente sin
+    necesidad de un COUNT.
+
+    Args:
+        statement: select(model) con los filtros ya aplicados
+        model: Modelo con columnas `created_at` y `uid`
+        session: Sesión asíncrona de SQLModel
+        limit: Cantidad máxima de filas de la página
+        cursor: Cursor devuelto por la página anterior (None para la primera)
+
+    Returns:
+        Tupla con las filas de la página y el cursor de la siguiente (o None)
+
+    Raises:
+        ValidationError: Si el cursor es inválido
+    """
+    after = decode_created_at_cursor(cursor)
+    if after is not None:
+        statement = statement.where(tuple_(model.created_at, model.uid) < after)
+
+    statement = statement.order_by(desc(model.created_at), desc(model.uid)).limit(
+        limit + 1
+    )
+    result = await session.exec(statement)
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            {"created_at": last.created_at.isoformat(), "uid": str(last.uid)}
+        )
+
+    return rows, next_cursor
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio.session import AsyncSession
 
-from bookly.auth.dependencies import get_current_user
-from bookly.auth.userModel import User
+from bookly.auth.dependencies import get_current_principal
+from bookly.auth.principal import Principal
 from bookly.db.main import get_session
 from bookly.reviews.reviewDto import ReviewCreateDTO
 from bookly.reviews.reviewRepository import ReviewRepository
@@ -22,7 +22,7 @@ create_review_service = CreateReviewService(
 async def add_review_to_book(
     book_uid: str, 
     review_data: ReviewCreateDTO,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     session: AsyncSession = Depends(get_session)
 ):
     new_review = await create_review_service.execute(
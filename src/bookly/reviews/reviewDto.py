@@ -1,8 +1,10 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
+from bookly.reviews.reviewModel import RATING_STARS
+
 
 class ReviewDTO(BaseModel):
     uid: UUID
@@ -14,6 +16,18 @@ class ReviewDTO(BaseModel):
     updated_at: datetime
 
 
+class ReviewPageDTO(BaseModel):
+    """
+    Página de reviews obtenida con paginación por cursor.
+
+    Attributes:
+        items: Reviews de la página actual
+        next_cursor: Cursor para pedir la siguiente página (None si es la última)
+    """
+    items: List[ReviewDTO]
+    next_cursor: Optional[str] = None
+
+
 class ReviewCreateDTO(BaseModel):
-    rating: int
+    rating: int = Field(..., ge=1, le=RATING_STARS, description="Estrellas (1 a 5)")
     review_text: str
@@ -1,5 +1,6 @@
 from typing import Optional, TYPE_CHECKING
 from sqlmodel import Relationship, SQLModel, Field, Column
+from sqlalchemy import Index
 import sqlalchemy.dialects.postgresql as pg
 from datetime import datetime
 import uuid
@@ -8,17 +9,26 @@ if TYPE_CHECKING:
     from bookly.auth.userModel import User
     from bookly.book.BookModel import Book
 
+RATING_STARS = 5
+
 
 class Review(SQLModel, table=True):
     __tablename__ = "reviews"
+    # Reviews de un usuario paginadas por (created_at, uid); también cubre
+    # los filtros por user_uid solo
+    __table_args__ = (
+        Index("ix_reviews_user_uid_created_at_uid", "user_uid", "created_at", "uid"),
+    )
 
     uid: uuid.UUID = Field(
         sa_column=Column(pg.UUID, nullable=False, primary_key=True, default=uuid.uuid4)
     )
-    rating: int = Field(lt=5)
+    rating: int = Field(ge=1, le=RATING_STARS)
     review_text: str
     user_uid: Optional[uuid.UUID] = Field(default=None, foreign_key="users.uid")
-    book_uid: Optional[uuid.UUID] = Field(default=None, foreign_key="books.uid")
+    book_uid: Optional[uuid.UUID] = Field(
+        default=None, foreign_key="books.uid", index=True
+    )
     created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
     updated_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
     # Associated entities:
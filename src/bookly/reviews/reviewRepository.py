@@ -1,12 +1,42 @@
-from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
+from sqlalchemy import update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+import uuid
 
 from bookly.reviews.reviewModel import Review
 from bookly.reviews.reviewDto import ReviewCreateDTO
 from bookly.auth.userModel import User
 from bookly.book.BookModel import Book
+from bookly.book.BookCache import book_cache
+from bookly.pagination import DEFAULT_PAGE_SIZE, paginate_by_created_at
 
 
 class ReviewRepository:
+    async def get_reviews_by_user(
+        self,
+        user_uid: uuid.UUID,
+        session: AsyncSession,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Review], Optional[str]]:
+        """
+        Get a page of the reviews written by a user, newest first.
+
+        Uses keyset pagination over the (user_uid, created_at, uid) index.
+
+        Args:
+            user_uid (UUID): The review author.
+            session (AsyncSession): Database session.
+            limit (int): Maximum number of reviews in the page.
+            cursor (str): Cursor returned by the previous page (None for the first).
+
+        Returns:
+            Tuple[List[Review], Optional[str]]: The reviews and the next page cursor.
+        """
+        statement = select(Review).where(Review.user_uid == user_uid)
+        return await paginate_by_created_at(statement, Review, session, limit, cursor)
+
     async def create_review(
         self,
         review_data: ReviewCreateDTO,
@@ -33,7 +63,46 @@ class ReviewRepository:
         new_review.user = user
 
         session.add(new_review)
+        await self._apply_rating(book.uid, new_review.rating, 1, session)
         await session.commit()
         await session.refresh(new_review)
+        await book_cache.invalidate(book.uid)
 
         return new_review
+
+    async def _apply_rating(
+        self,
+        book_uid: uuid.UUID,
+        rating: int,
+        delta: int,
+        session: AsyncSession,
+    ) -> None:
+        """
+        Update the book's review aggregates (count, rating sum and histogram).
+
+        Runs as a single relative UPDATE (col = col + delta) inside the review's
+        transaction, so concurrent reviews on the same book do not overwrite
+        each other. Editing or deleting a review calls this with -1 for the old
+        rating and +1 for the new one.
+
+        Args:
+            book_uid (UUID): The reviewed book.
+            rating (int): The review's stars (1 to 5).
+            delta (int): +1 when a review is added, -1 when it is removed.
+            session (AsyncSession): Session of the ongoing transaction.
+        """
+        books = Book.__table__
+        # Postgres arrays are 1-based, so the rating is the bucket index
+        bucket = books.c.rating_histogram[rating]
+
+        await session.execute(
+            update(books)
+            .where(books.c.uid == book_uid)
+            .values(
+                {
+                    books.c.review_count: books.c.review_count + delta,
+                    books.c.rating_sum: books.c.rating_sum + rating * delta,
+                    bucket: bucket + delta,
+                }
+            )
+        )
@@ -0,0 +1,573 @@
+"""
+Pool de conexiones SMTP persistentes para el worker de Celery.
+
+Enviar cada correo con FastMail abre un event loop y una conexión SMTP nueva
+(con su handshake STARTTLS y login), lo que limita el worker a unos pocos
+correos por segundo. SMTPConnectionPool mantiene conexiones smtplib abiertas
+entre tareas dentro de cada proceso del worker: antes de reutilizar una
+conexión que estuvo inactiva se verifica con NOOP y, si el servidor la cerró,
+se reconecta y se reintenta el envío una vez.
+
+Para probar contra un servidor local (por ejemplo `python -m aiosmtpd -n -l
+localhost:8025`) basta con MAIL_SERVER=localhost, MAIL_PORT=8025,
+MAIL_STARTTLS=False y USE_CREDENTIALS=False.
+"""
+from contextlib import contextmanager
+from email.message import EmailMessage
+from email.utils import formataddr
+from typing import Iterator, List, Optional
+import asyncio
+import logging
+import smtplib
+import ssl
+import threading
+import time
+
+import aiosmtplib
+
+from bookly.config import settings
+from bookly.mail_templates import template_registry
+
+logger = logging.getLogger(__name__)
+
+# Errores de smtplib que indican que se perdió la conexión. SMTPException
+# hereda de OSError, así que el resto de las excepciones de smtplib
+# (autenticación, extensiones no soportadas, respuestas inesperadas) se
+# descartan antes de tratar un OSError como caída: reconectar no las arregla.
+SMTP_CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)
+# Rechazos del propio mensaje: la conexión sigue sana y reintentar no ayuda
+MESSAGE_ERRORS = (
+    smtplib.SMTPRecipientsRefused,
+    smtplib.SMTPSenderRefused,
+    smtplib.SMTPDataError,
+)
+# Fallas transitorias de conexión (smtplib y aiosmtplib) tras las que la
+# tarea de Celery se reintenta. No se usa OSError: también abarca los
+# rechazos de smtplib, que son definitivos.
+TRANSIENT_ERRORS = (
+    smtplib.SMTPServerDisconnected,
+    smtplib.SMTPConnectError,
+    ConnectionError,
+    TimeoutError,
+)
+# Resultado de send_each para los mensajes que no llegaron a enviarse porque
+# se perdió la conexión y no se pudo recuperar
+NOT_ATTEMPTED = "not attempted"
+
+
+def is_connection_error(error: BaseException) -> bool:
+    """
+    Indica si un error de envío es una pérdida de conexión.
+
+    Sirve para smtplib y aiosmtplib: los errores de conexión de aiosmtplib
+    heredan de ConnectionError o TimeoutError y sus rechazos no heredan de
+    OSError.
+
+    Args:
+        error: Excepción lanzada al conectar o enviar
+
+    Returns:
+        True si conviene reconectar o reintentar más tarde
+    """
+    if isinstance(error, smtplib.SMTPException):
+        return isinstance(error, SMTP_CONNECTION_ERRORS)
+    return isinstance(error, OSError)
+
+
+def build_email(
+    recipients: List[str],
+    subject: str,
+    body: Optional[str] = None,
+    template: Optional[str] = None,
+    context: Optional[dict] = None,
+) -> EmailMessage:
+    """
+    Construye un correo HTML con el remitente configurado.
+
+    Args:
+        recipients: Destinatarios
+        subject: Asunto
+        body: Cuerpo HTML ya armado
+        template: Nombre de la plantilla a renderizar si no se pasa body
+        context: Variables de la plantilla
+
+    Returns:
+        Mensaje listo para enviar
+    """
+    if body is None:
+        body = template_registry.render(template, context)
+
+    message = EmailMessage()
+    message["From"] = formataddr((settings.MAIL_FROM_NAME, settings.MAIL_FROM))
+    message["To"] = ", ".join(recipients)
+    message["Subject"] = subject
+    message.set_content(body, subtype="html")
+    return message
+
+
+class SMTPConnectionPool:
+    """
+    Conexiones SMTP reutilizables y seguras entre hilos.
+    """
+
+    def __init__(
+        self,
+        host: str = settings.MAIL_SERVER,
+        port: int = settings.MAIL_PORT,
+        username: Optional[str] = settings.MAIL_USERNAME,
+        password: Optional[str] = settings.MAIL_PASSWORD,
+        starttls: bool = settings.MAIL_STARTTLS,
+        ssl_tls: bool = settings.MAIL_SSL_TLS,
+        use_credentials: bool = settings.USE_CREDENTIALS,
+        validate_certs: bool = settings.VALIDATE_CERTS,
+        max_size: int = settings.SMTP_POOL_SIZE,
+        max_idle: int = settings.SMTP_POOL_MAX_IDLE,
+        timeout: int = settings.SMTP_TIMEOUT,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.ssl_tls = ssl_tls
+        self.use_credentials = use_credentials
+        self.validate_certs = validate_certs
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.timeout = timeout
+        # Conexiones libres con el instante de su último uso (LIFO)
+        self._idle: List[tuple] = []
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self.messages_sent = 0
+
+    def send(self, message: EmailMessage) -> None:
+        """
+        Envía un correo reutilizando una conexión del pool.
+
+        A diferencia de send_many, los errores no se registran y se omiten: se
+        propagan para que la tarea de Celery que envía el correo falle.
+
+        Args:
+            message: Mensaje a enviar
+
+        Raises:
+            SMTPException: Si el servidor rechaza el mensaje o se pierde la
+                conexión también en el reintento
+            OSError: Si no se puede abrir la conexión
+        """
+        with self.connection() as holder:
+            self._send_with_retry(holder, message)
+
+    def send_many(self, messages: List[EmailMessage]) -> int:
+        """
+        Envía varios correos por una misma sesión SMTP.
+
+        Si la conexión se cae a mitad del lote se reconecta y se continúa desde
+        el mensaje que falló; si tampoco se puede reconectar, el resto del lote
+        no se envía. Un error propio de un mensaje (por ejemplo un
+        destinatario rechazado) se registra y no frena al resto.
+
+        Args:
+            messages: Mensajes a enviar
+
+        Returns:
+            Cantidad de mensajes enviados
+        """
+        return sum(error is None for error in self.send_each(messages))
+
+    def send_each(self, messages: List[EmailMessage]) -> List[Optional[str]]:
+        """
+        Igual que send_many, pero informa el resultado de cada mensaje.
+
+        Args:
+            messages: Mensajes a enviar
+
+        Returns:
+            Lista paralela a messages: None si se envió, el error SMTP si el
+            servidor lo rechazó o NOT_ATTEMPTED si no se llegó a enviar por
+            haberse perdido la conexión (incluye el mensaje en curso). Un
+            error SMTP que no es de conexión (por ejemplo de autenticación)
+            corta el lote y se informa para el mensaje en curso y los
+            siguientes, así cuentan como intento fallido
+        """
+        errors: List[Optional[str]] = []
+        try:
+            with self.connection() as holder:
+                for message in messages:
+                    try:
+                        self._send_with_retry(holder, message)
+                        errors.append(None)
+                    except MESSAGE_ERRORS as e:
+                        logger.error(f"Error al enviar correo a {message['To']}: {e}")
+                        errors.append(str(e))
+        except (smtplib.SMTPException, OSError) as e:
+            pending = len(messages) - len(errors)
+            if is_connection_error(e):
+                logger.error(f"Conexión SMTP perdida, {pending} correos sin enviar: {e}")
+                return errors + [NOT_ATTEMPTED] * pending
+            logger.error(f"Error SMTP, {pending} correos sin enviar: {e}")
+            return errors + [str(e)] * pending
+        return errors
+
+    @contextmanager
+    def connection(self) -> Iterator[list]:
+        """
+        Presta una conexión sana del pool y la devuelve al terminar.
+
+        Yields:
+            Lista de un elemento con la conexión (se reemplaza al reconectar)
+        """
+        holder = [self._acquire()]
+        try:
+            yield holder
+        except MESSAGE_ERRORS:
+            # El servidor rechazó el mensaje pero la conexión sigue sana
+            self._release(holder[0])
+            raise
+        except BaseException:
+            self._close(holder[0])
+            raise
+        else:
+            self._release(holder[0])
+
+    def close_all(self) -> None:
+        """Cierra todas las conexiones libres (al apagar el proceso del worker)."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            self._close(connection, quit=True)
+
+    def stats(self) -> dict:
+        return {
+            "idle": len(self._idle),
+            "connections_opened": self.connections_opened,
+            "messages_sent": self.messages_sent,
+        }
+
+    def _send_with_retry(self, holder: list, message: EmailMessage) -> None:
+        try:
+            holder[0].send_message(message)
+        except (smtplib.SMTPException, OSError) as e:
+            if not is_connection_error(e):
+                raise
+            logger.warning(f"Conexión SMTP perdida ({e}), reconectando")
+            self._close(holder[0])
+            holder[0] = self._connect()
+            holder[0].send_message(message)
+        self.messages_sent += 1
+
+    def _acquire(self) -> smtplib.SMTP:
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                connection, last_used = self._idle.pop()
+
+            if self._healthy(connection, last_used):
+                return connection
+            self._close(connection)
+
+        return self._connect()
+
+    def _release(self, connection: smtplib.SMTP) -> None:
+        with self._lock:
+            if len(self._idle) < self.max_size:
+                self._idle.append((connection, time.monotonic()))
+                return
+        self._close(connection, quit=True)
+
+    def _healthy(self, connection: smtplib.SMTP, last_used: float) -> bool:
+        # Una conexión usada hace poco se da por buena; si no, se prueba con NOOP
+        if time.monotonic() - last_used < self.max_idle:
+            return True
+        try:
+            return connection.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def _connect(self) -> smtplib.SMTP:
+        context = ssl.create_default_context()
+        if not self.validate_certs:
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+
+        if self.ssl_tls:
+            connection = smtplib.SMTP_SSL(
+                self.host, self.port, timeout=self.timeout, context=context
+            )
+        else:
+            connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.starttls:
+                connection.starttls(context=context)
+
+        if self.use_credentials:
+            connection.login(self.username, self.password)
+
+        self.connections_opened += 1
+        logger.info(f"Conexión SMTP abierta con {self.host}:{self.port}")
+        return connection
+
+    @staticmethod
+    def _close(connection: smtplib.SMTP, quit: bool = False) -> None:
+        try:
+            if quit:
+                connection.quit()
+            else:
+                connection.close()
+        except Exception:
+            pass
+
+
+# Equivalentes para aiosmtplib. Sus errores de conexión (SMTPServerDisconnected,
+# SMTPConnectError, SMTPTimeoutError) heredan de ConnectionError o
+# TimeoutError, mientras que los rechazos y los errores de autenticación o de
+# HELO sólo heredan de SMTPException, así que OSError no los abarca
+ASYNC_RECONNECT_ERRORS = (
+    aiosmtplib.SMTPServerDisconnected,
+    aiosmtplib.SMTPConnectError,
+    aiosmtplib.SMTPTimeoutError,
+    OSError,
+)
+ASYNC_MESSAGE_ERRORS = (
+    aiosmtplib.SMTPRecipientsRefused,
+    aiosmtplib.SMTPRecipientRefused,
+    aiosmtplib.SMTPSenderRefused,
+    aiosmtplib.SMTPDataError,
+)
+
+
+class AsyncSMTPConnectionPool:
+    """
+    Versión asíncrona (aiosmtplib) de SMTPConnectionPool para el event loop
+    persistente del worker (ver bookly.worker_loop).
+
+    Se usa siempre desde el mismo loop, así que no necesita locks. A
+    diferencia del pool síncrono, send_each reparte los mensajes entre hasta
+    max_size conexiones y los envía a la vez.
+    """
+
+    def __init__(
+        self,
+        host: str = settings.MAIL_SERVER,
+        port: int = settings.MAIL_PORT,
+        username: Optional[str] = settings.MAIL_USERNAME,
+        password: Optional[str] = settings.MAIL_PASSWORD,
+        starttls: bool = settings.MAIL_STARTTLS,
+        ssl_tls: bool = settings.MAIL_SSL_TLS,
+        use_credentials: bool = settings.USE_CREDENTIALS,
+        validate_certs: bool = settings.VALIDATE_CERTS,
+        max_size: int = settings.SMTP_POOL_SIZE,
+        max_idle: int = settings.SMTP_POOL_MAX_IDLE,
+        timeout: int = settings.SMTP_TIMEOUT,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.username = username if use_credentials else None
+        self.password = password if use_credentials else None
+        self.starttls = starttls
+        self.ssl_tls = ssl_tls
+        self.validate_certs = validate_certs
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self._idle: List[tuple] = []
+        # Limita los envíos simultáneos (y por lo tanto las conexiones abiertas)
+        self._slots = asyncio.Semaphore(max_size)
+        self.connections_opened = 0
+        self.messages_sent = 0
+
+    async def send(self, message: EmailMessage) -> None:
+        """
+        Envía un correo reutilizando una conexión del pool.
+
+        Args:
+            message: Mensaje a enviar
+
+        Raises:
+            SMTPException: Si el servidor rechaza el mensaje o se pierde la
+                conexión también en el reintento
+            OSError: Si no se puede abrir la conexión
+        """
+        await self._send_one(message, raise_errors=True)
+
+    async def send_many(self, messages: List[EmailMessage]) -> int:
+        """
+        Envía varios correos a la vez por las conexiones del pool.
+
+        Args:
+            messages: Mensajes a enviar
+
+        Returns:
+            Cantidad de mensajes enviados
+        """
+        return sum(error is None for error in await self.send_each(messages))
+
+    async def send_each(self, messages: List[EmailMessage]) -> List[Optional[str]]:
+        """
+        Igual que send_many, pero informa el resultado de cada mensaje.
+
+        Args:
+            messages: Mensajes a enviar
+
+        Returns:
+            Lista paralela a messages: None si se envió, el error SMTP si el
+            servidor lo rechazó o NOT_ATTEMPTED si no se pudo enviar por
+            haberse perdido la conexión. Los demás errores SMTP (por ejemplo
+            de autenticación) se informan como error del mensaje
+        """
+        results = await asyncio.gather(
+            *(self._send_one(m) for m in messages), return_exceptions=True
+        )
+        errors: List[Optional[str]] = []
+        for message, result in zip(messages, results):
+            if isinstance(result, BaseException):
+                if not isinstance(result, Exception):
+                    raise result
+                if is_connection_error(result):
+                    logger.error(
+                        f"Conexión SMTP perdida al enviar a {message['To']}: {result}"
+                    )
+                    errors.append(NOT_ATTEMPTED)
+                else:
+                    logger.error(f"Error SMTP al enviar a {message['To']}: {result}")
+                    errors.append(str(result))
+            else:
+                errors.append(result)
+        return errors
+
+    async def close_all(self) -> None:
+        """Cierra todas las conexiones libres (al apagar el proceso del worker)."""
+        idle, self._idle = self._idle, []
+        for client, _ in idle:
+            await self._close(client, quit=True)
+
+    def stats(self) -> dict:
+        return {
+            "idle": len(self._idle),
+            "connections_opened": self.connections_opened,
+            "messages_sent": self.messages_sent,
+        }
+
+    async def _send_one(
+        self, message: EmailMessage, raise_errors: bool = False
+    ) -> Optional[str]:
+        async with self._slots:
+            client = await self._acquire()
+            try:
+                try:
+                    await client.send_message(message)
+                except ASYNC_RECONNECT_ERRORS as e:
+                    logger.warning(f"Conexión SMTP perdida ({e}), reconectando")
+                    await self._close(client)
+                    client = await self._connect()
+                    await client.send_message(message)
+            except ASYNC_MESSAGE_ERRORS as e:
+                # El servidor rechazó el mensaje pero la conexión sigue sana
+                self._release(client)
+                if raise_errors:
+                    raise
+                logger.error(f"Error al enviar correo a {message['To']}: {e}")
+                return str(e)
+            except BaseException:
+                await self._close(client)
+                raise
+
+            self.messages_sent += 1
+            self._release(client)
+            return None
+
+    async def _acquire(self) -> aiosmtplib.SMTP:
+        while self._idle:
+            client, last_used = self._idle.pop()
+            if await self._healthy(client, last_used):
+                return client
+            await self._close(client)
+
+        return await self._connect()
+
+    def _release(self, client: aiosmtplib.SMTP) -> None:
+        if len(self._idle) < self.max_size:
+            self._idle.append((client, time.monotonic()))
+        else:
+            client.close()
+
+    async def _healthy(self, client: aiosmtplib.SMTP, last_used: float) -> bool:
+        if not client.is_connected:
+            return False
+        if time.monotonic() - last_used < self.max_idle:
+            return True
+        try:
+            return (await client.noop()).code == 250
+        except (aiosmtplib.SMTPException, OSError):
+            return False
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        client = aiosmtplib.SMTP(
+            hostname=self.host,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            use_tls=self.ssl_tls,
+            # None haría STARTTLS automático si el servidor lo ofrece
+            start_tls=self.starttls and not self.ssl_tls,
+            validate_certs=self.validate_certs,
+            timeout=self.timeout,
+        )
+        await client.connect()
+        self.connections_opened += 1
+        logger.info(f"Conexión SMTP asíncrona abierta con {self.host}:{self.port}")
+        return client
+
+    @staticmethod
+    async def _close(client: aiosmtplib.SMTP, quit: bool = False) -> None:
+        try:
+            if quit and client.is_connected:
+                await client.quit()
+            else:
+                client.close()
+        except Exception:
+            pass
+
+
+# Un pool por proceso: se crea en el primer uso, después del fork del worker
+_pool: Optional[SMTPConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_smtp_pool() -> SMTPConnectionPool:
+    """Devuelve el pool de este proceso, creándolo si es necesario."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SMTPConnectionPool()
+        return _pool
+
+
+def close_smtp_pool() -> None:
+    """Cierra las conexiones del pool de este proceso."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+            _pool = None
+
+
+# Pool asíncrono: solo se usa desde el event loop persistente del proceso
+_async_pool: Optional[AsyncSMTPConnectionPool] = None
+
+
+def get_async_smtp_pool() -> AsyncSMTPConnectionPool:
+    """Devuelve el pool asíncrono de este proceso, creándolo si es necesario."""
+    global _async_pool
+    if _async_pool is None:
+        _async_pool = AsyncSMTPConnectionPool()
+    return _async_pool
+
+
+async def close_async_smtp_pool() -> None:
+    """Cierra las conexiones del pool asíncrono de este proceso."""
+    global _async_pool
+    if _async_pool is not None:
+        await _async_pool.close_all()
+        _async_pool = None
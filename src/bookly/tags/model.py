@@ -1,4 +1,5 @@
 from uuid import UUID, uuid4
+from sqlalchemy import Index
 from sqlalchemy.dialects import postgresql as pg
 from sqlmodel import Field, Column, SQLModel, Relationship
 from typing import List, TYPE_CHECKING
@@ -9,21 +10,22 @@ if TYPE_CHECKING:
 
 class BookTag(SQLModel, table=True):
     book_id: UUID = Field(default=None, foreign_key="books.uid", primary_key=True)
-    tag_id: UUID = Field(default=None, foreign_key="tags.uid", primary_key=True)
+    # La PK (book_id, tag_id) cubre las búsquedas por libro; este índice las de tag
+    tag_id: UUID = Field(
+        default=None, foreign_key="tags.uid", primary_key=True, index=True
+    )
 
 
 class Tag(SQLModel, table=True):
     __tablename__ = "tags"
+    __table_args__ = (Index("ix_tags_name", "name", unique=True),)
+
     uid: UUID = Field(
         sa_column=Column(pg.UUID, nullable=False, primary_key=True, default=uuid4)
     )
     name: str = Field(sa_column=Column(pg.VARCHAR, nullable=False))
     created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
-    books: List["Book"] = Relationship(
-        link_model=BookTag,
-        back_populates="tags",
-        sa_relationship_kwargs={"lazy": "selectin"},
-    )
+    books: List["Book"] = Relationship(link_model=BookTag, back_populates="tags")
 
     def __repr__(self) -> str:
         return f"<Tag {self.name}>"
\ No newline at end of file
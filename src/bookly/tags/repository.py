@@ -4,6 +4,8 @@ from sqlmodel import desc, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from bookly.book.BookRepository import BooksRepository
+from bookly.book.BookCache import book_cache
+from bookly.db.loading import LoadProfile
 
 from .model import Tag
 from .dto import TagAddDTO, TagCreateDTO
@@ -33,7 +35,9 @@ class TagService:
     ):
         """Add tags to a book"""
 
-        book = await book_repository.get_book(book_uid=book_uid, session=session)
+        book = await book_repository.get_book(
+            book_uid=book_uid, session=session, profile=LoadProfile.FULL
+        )
 
         if not book:
             raise BookNotFound()
@@ -49,6 +53,7 @@ class TagService:
         session.add(book)
         await session.commit()
         await session.refresh(book)
+        await book_cache.invalidate(book.uid)
         return book
 
     async def get_tag_by_uid(self, tag_uid: str, session: AsyncSession):
@@ -0,0 +1,100 @@
+"""
+Event loop persistente para las tareas asíncronas del worker de Celery.
+
+Sin él cada tarea asíncrona corre con asyncio.run (o async_to_sync): crea un
+loop nuevo, abre sus conexiones (PostgreSQL, SMTP) y las descarta al terminar.
+Con CELERY_ASYNC_WORKER cada proceso del worker levanta un único loop en un
+hilo propio con su primera tarea; las tareas le envían sus corrutinas y
+esperan el resultado, así que las conexiones asíncronas sobreviven entre tareas y, con
+--pool=threads, las tareas de todos los hilos comparten el mismo loop y
+tienen sus envíos en vuelo a la vez.
+"""
+from typing import Awaitable, Coroutine, Optional, TypeVar
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class WorkerEventLoop:
+    """
+    Loop de asyncio que corre en un hilo daemon durante toda la vida del proceso.
+    """
+
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.tasks_run = 0
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None and self._loop.is_running()
+
+    def start(self) -> None:
+        """Crea el loop y lo pone a correr (no hace nada si ya está corriendo)."""
+        with self._lock:
+            if self._loop is not None:
+                return
+            self._loop = asyncio.new_event_loop()
+            ready = threading.Event()
+            self._loop.call_soon(ready.set)
+            self._thread = threading.Thread(
+                target=self._loop.run_forever, name="worker-event-loop", daemon=True
+            )
+            self._thread.start()
+            ready.wait()
+        logger.info("Event loop persistente del worker iniciado")
+
+    def run(self, coro: Coroutine[None, None, T], timeout: Optional[float] = None) -> T:
+        """
+        Ejecuta una corrutina y espera su resultado desde código síncrono.
+
+        Si el loop persistente no está corriendo (modo por defecto, tareas
+        ejecutadas fuera del worker) se usa asyncio.run como antes.
+
+        Args:
+            coro: Corrutina a ejecutar
+            timeout: Segundos máximos de espera
+
+        Returns:
+            Resultado de la corrutina
+        """
+        if not self.running:
+            return asyncio.run(coro)
+
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        self.tasks_run += 1
+        return future.result(timeout)
+
+    def stop(self, cleanup: Optional[Awaitable] = None, timeout: float = 30) -> None:
+        """
+        Detiene el loop (al apagar el proceso del worker).
+
+        Args:
+            cleanup: Corrutina que cierra los recursos asíncronos antes de parar
+            timeout: Segundos máximos de espera para la limpieza
+        """
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            if loop is None:
+                return
+            if cleanup is not None:
+                try:
+                    asyncio.run_coroutine_threadsafe(cleanup, loop).result(timeout)
+                except Exception as e:
+                    logger.error(f"Error al cerrar recursos del event loop: {e}")
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout)
+            loop.close()
+            self._loop = self._thread = None
+        logger.info("Event loop persistente del worker detenido")
+
+    def stats(self) -> dict:
+        return {"running": self.running, "tasks_run": self.tasks_run}
+
+
+worker_loop = WorkerEventLoop()
@@ -0,0 +1,171 @@
+"""
+Tests del parser de la importación masiva de libros (NDJSON y CSV).
+
+El repositorio se reemplaza por uno que guarda los lotes recibidos, así se
+prueban el parseo, la validación por fila y el corte en lotes sin base de
+datos.
+"""
+import asyncio
+import json
+
+import pytest
+
+from bookly.book.service.importBooks import (
+    ImportBooksService,
+    iter_csv_records,
+    iter_lines,
+)
+from bookly.errors import ValidationError
+
+CSV_HEADER = "title,author,publisher,published_date,page_count,language\r\n"
+
+
+class RecordingRepository:
+    def __init__(self, fail_on_batch=None):
+        self.batches = []
+        self.fail_on_batch = fail_on_batch
+
+    async def bulk_insert_books(self, books, user_uid, session):
+        self.batches.append(books)
+        if len(self.batches) == self.fail_on_batch:
+            raise RuntimeError("connection lost")
+        return len(books)
+
+
+class RecordingSession:
+    def __init__(self):
+        self.rollbacks = 0
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+async def stream_of(data: bytes, fragment_size: int):
+    for start in range(0, len(data), fragment_size):
+        yield data[start:start + fragment_size]
+
+
+def run_import(data: str, import_format: str, fragment_size: int = 7, **options):
+    repository = RecordingRepository(options.pop("fail_on_batch", None))
+    session = RecordingSession()
+    service = ImportBooksService(repository, **options)
+    report = asyncio.run(
+        service.execute(
+            stream_of(data.encode("utf-8"), fragment_size), import_format, "user", session
+        )
+    )
+    return report, repository, session
+
+
+def csv_row(title, publisher="Editorial", page_count="100"):
+    return f"{title},Autor,{publisher},2020-01-01,{page_count},es\r\n"
+
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+
+def test_iter_lines_joins_lines_split_across_fragments():
+    data = b"uno\r\ndos\ntres"
+
+    lines = asyncio.run(collect(iter_lines(stream_of(data, 2))))
+
+    assert lines == [(1, b"uno"), (2, b"dos"), (3, b"tres")]
+
+
+def test_iter_csv_records_keeps_quoted_newlines_together():
+    data = b'a,"b\nc ""d""\ne",f\ng,h\n'
+
+    records = asyncio.run(collect(iter_csv_records(stream_of(data, 3))))
+
+    assert records == [(1, b'a,"b\nc ""d""\ne",f'), (4, b"g,h")]
+
+
+@pytest.mark.parametrize("fragment_size", [1, 5, 4096])
+def test_csv_quoted_commas_and_newlines(fragment_size):
+    data = (
+        CSV_HEADER
+        + csv_row('"Uno, dos"', publisher='"Casa\r\nEditorial ""X"""')
+        + csv_row("Tres")
+    )
+
+    report, repository, _ = run_import(data, "csv", fragment_size)
+
+    assert report == {"imported": 2, "failed": 0, "errors": [], "errors_truncated": False}
+    books = repository.batches[0]
+    assert [book.title for book in books] == ["Uno, dos", "Tres"]
+    assert books[0].publisher == 'Casa\nEditorial "X"'
+
+
+def test_csv_reports_invalid_rows_by_first_line():
+    data = (
+        CSV_HEADER
+        + csv_row("Uno", publisher='"Casa\nEditorial"')
+        + "\r\n"
+        + csv_row("Dos", page_count="muchas")
+        + csv_row("Tres")
+    )
+
+    report, repository, _ = run_import(data, "csv")
+
+    assert report["imported"] == 2
+    assert report["failed"] == 1
+    assert [error["line"] for error in report["errors"]] == [5]
+    assert report["errors"][0]["errors"][0].startswith("page_count: ")
+    assert [book.title for book in repository.batches[0]] == ["Uno", "Tres"]
+
+
+def test_ndjson_reports_invalid_json_and_fields():
+    rows = [
+        json.dumps({"title": "Uno", "author": "A", "publisher": "P",
+                    "published_date": "2020-01-01", "page_count": 10, "language": "es"}),
+        "{not json",
+        json.dumps({"title": "Tres"}),
+    ]
+
+    report, repository, _ = run_import("\n".join(rows) + "\n", "ndjson")
+
+    assert report["imported"] == 1
+    assert report["failed"] == 2
+    assert [error["line"] for error in report["errors"]] == [2, 3]
+    assert any("author" in message for message in report["errors"][1]["errors"])
+
+
+def test_errors_are_truncated_at_max_errors():
+    data = CSV_HEADER + "".join(csv_row(f"Libro {i}", page_count="x") for i in range(5))
+
+    report, _, _ = run_import(data, "csv", max_errors=2)
+
+    assert report["failed"] == 5
+    assert [error["line"] for error in report["errors"]] == [2, 3]
+    assert report["errors_truncated"] is True
+
+
+def test_rows_are_inserted_in_chunks():
+    data = CSV_HEADER + "".join(csv_row(f"Libro {i}") for i in range(5))
+
+    report, repository, _ = run_import(data, "csv", chunk_size=2)
+
+    assert report["imported"] == 5
+    assert [len(batch) for batch in repository.batches] == [2, 2, 1]
+    assert [book.title for batch in repository.batches for book in batch] == [
+        f"Libro {i}" for i in range(5)
+    ]
+
+
+def test_failed_chunk_rejects_only_its_rows():
+    data = CSV_HEADER + "".join(csv_row(f"Libro {i}") for i in range(5))
+
+    report, repository, session = run_import(data, "csv", chunk_size=2, fail_on_batch=2)
+
+    assert report["imported"] == 3
+    assert report["failed"] == 2
+    assert [error["line"] for error in report["errors"]] == [4, 5]
+    assert report["errors"][0]["errors"] == ["Database error: connection lost"]
+    assert session.rollbacks == 1
+    assert len(repository.batches) == 3
+
+
+def test_unsupported_format_is_rejected():
+    with pytest.raises(ValidationError):
+        run_import("", "xml")
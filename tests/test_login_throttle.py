@@ -0,0 +1,145 @@
+"""
+Tests de LoginThrottle sobre fakeredis (el script Lua de la ventana
+deslizante se ejecuta tal cual).
+
+El reloj se fija con time.time, que usan tanto el limitador como fakeredis
+para los vencimientos.
+"""
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI, status
+from starlette.requests import Request
+
+from bookly.auth.loginThrottle import LoginThrottle
+from bookly.errors import TooManyLoginAttempts, register_all_errors
+
+
+class Clock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock(time.time())
+    monkeypatch.setattr(time, "time", clock)
+    return clock
+
+
+def attempt(throttle, email="reader@example.com", client_ip="10.0.0.1"):
+    asyncio.run(throttle.check(email, client_ip))
+
+
+def rejected(throttle, email="reader@example.com", client_ip="10.0.0.1"):
+    with pytest.raises(TooManyLoginAttempts) as info:
+        attempt(throttle, email, client_ip)
+    return info.value
+
+
+def test_attempts_over_the_email_limit_are_rejected(fake_redis, clock):
+    throttle = LoginThrottle(window=60, max_per_email=2, max_per_ip=100)
+
+    attempt(throttle)
+    attempt(throttle, email=" Reader@Example.COM ")
+    rejected(throttle)
+
+    # Otro email desde la misma IP no comparte el límite
+    attempt(throttle, email="other@example.com")
+    assert throttle.rejected == {"email": 1, "ip": 0}
+    assert throttle.allowed == 3
+
+
+def test_attempts_over_the_ip_limit_are_rejected(fake_redis, clock):
+    throttle = LoginThrottle(window=60, max_per_email=100, max_per_ip=3)
+
+    for i in range(3):
+        attempt(throttle, email=f"user{i}@example.com")
+    rejected(throttle, email="user3@example.com")
+
+    attempt(throttle, email="user3@example.com", client_ip="10.0.0.2")
+    attempt(throttle, email="user4@example.com", client_ip=None)
+    assert throttle.rejected == {"email": 0, "ip": 1}
+
+
+def test_window_slides_and_rejected_attempts_are_not_counted(fake_redis, clock):
+    throttle = LoginThrottle(window=60, max_per_email=2, max_per_ip=100)
+
+    attempt(throttle)
+    clock.advance(30)
+    attempt(throttle)
+    clock.advance(15)
+    rejected(throttle)
+    rejected(throttle)
+
+    # Sale el primer intento de la ventana, el de t=30 sigue dentro
+    clock.advance(15.001)
+    attempt(throttle)
+    rejected(throttle)
+
+    clock.advance(60)
+    attempt(throttle)
+    attempt(throttle)
+
+
+def test_retry_after_is_the_time_until_the_oldest_attempt_leaves(fake_redis, clock):
+    throttle = LoginThrottle(window=60, max_per_email=2, max_per_ip=100)
+
+    attempt(throttle)
+    clock.advance(10)
+    attempt(throttle)
+    clock.advance(5)
+    assert rejected(throttle).retry_after == 45
+
+    clock.advance(44.5)
+    # Nunca menos de un segundo
+    assert rejected(throttle).retry_after == 1
+
+
+def test_too_many_login_attempts_response_has_retry_after():
+    app = FastAPI()
+    register_all_errors(app)
+    request = Request({"type": "http", "method": "POST", "path": "/", "headers": []})
+    handler = app.exception_handlers[TooManyLoginAttempts]
+
+    response = asyncio.run(handler(request, TooManyLoginAttempts(retry_after=45)))
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response.headers["Retry-After"] == "45"
+
+
+def test_reset_clears_only_the_email_attempts(fake_redis, clock):
+    throttle = LoginThrottle(window=60, max_per_email=2, max_per_ip=3)
+
+    attempt(throttle)
+    attempt(throttle)
+    rejected(throttle)
+
+    asyncio.run(throttle.reset(" Reader@Example.com"))
+    attempt(throttle)
+    rejected(throttle, email="other@example.com")
+    assert throttle.rejected == {"email": 1, "ip": 1}
+
+
+def test_redis_errors_fail_open(fake_redis, monkeypatch):
+    throttle = LoginThrottle(window=60, max_per_email=1, max_per_ip=1)
+
+    async def broken_script(**kwargs):
+        raise ConnectionError("redis down")
+
+    async def get_script():
+        return broken_script
+
+    monkeypatch.setattr(throttle, "_get_script", get_script)
+    attempt(throttle)
+    attempt(throttle)
+
+    assert throttle.errors == 2
+    assert throttle.allowed == 0
@@ -0,0 +1,181 @@
+"""
+Tests de DrainOutboxService.execute.
+
+El repositorio guarda las filas en memoria y el envío se inyecta con
+send_each, así se prueban el reintento con espera exponencial, el descarte al
+agotar los intentos y los correos no intentados sin base de datos ni SMTP.
+"""
+from datetime import datetime, timedelta
+import asyncio
+import uuid
+
+import pytest
+
+from bookly.outbox import service as service_module
+from bookly.outbox.model import OUTBOX_FAILED, OUTBOX_PENDING, EmailOutbox
+from bookly.outbox.service import DrainOutboxService
+from bookly.smtp_pool import NOT_ATTEMPTED
+
+NOW = datetime(2026, 3, 1, 12, 0, 0)
+
+
+class FrozenDatetime(datetime):
+    now_value = NOW
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.now_value
+
+
+class InMemoryOutboxRepository:
+    def __init__(self, items):
+        self.items = {item.uid: item for item in items}
+        self.claims = 0
+
+    async def claim_batch(self, limit, session):
+        self.claims += 1
+        ready = [
+            item
+            for item in self.items.values()
+            if item.status == OUTBOX_PENDING and item.available_at <= FrozenDatetime.now()
+        ]
+        return sorted(ready, key=lambda item: item.available_at)[:limit]
+
+    async def delete_many(self, uids, session):
+        for uid in uids:
+            del self.items[uid]
+
+
+class RecordingSession:
+    def __init__(self):
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+class ScriptedSender:
+    """Devuelve el resultado asignado al asunto de cada correo (None por defecto)."""
+
+    def __init__(self, results=None, error=None):
+        self.results = results or {}
+        self.error = error
+        self.sent = []
+
+    async def __call__(self, messages):
+        if self.error is not None:
+            raise self.error
+        self.sent.extend(message["Subject"] for message in messages)
+        return [self.results.get(message["Subject"]) for message in messages]
+
+
+@pytest.fixture(autouse=True)
+def frozen_now(monkeypatch):
+    monkeypatch.setattr(FrozenDatetime, "now_value", NOW)
+    monkeypatch.setattr(service_module, "datetime", FrozenDatetime)
+
+
+def outbox_item(subject, minutes_ago=0, **message):
+    return EmailOutbox(
+        uid=uuid.uuid4(),
+        message={
+            "recipients": ["reader@example.com"],
+            "subject": subject,
+            "body": "<p>hola</p>",
+            **message,
+        },
+        available_at=NOW - timedelta(minutes=minutes_ago),
+    )
+
+
+def drain(repository, sender, **options):
+    session = RecordingSession()
+    service = DrainOutboxService(repository, send_each=sender, **options)
+    return asyncio.run(service.execute(session)), session
+
+
+def test_rejected_messages_back_off_exponentially_until_failed():
+    item = outbox_item("rechazado")
+    repository = InMemoryOutboxRepository([item])
+    sender = ScriptedSender({"rechazado": "550 mailbox unavailable"})
+    options = {"max_attempts": 4, "retry_backoff": 30}
+
+    for attempts, delay in [(1, 30), (2, 60), (3, 120)]:
+        report, _ = drain(repository, sender, **options)
+        assert report == {"sent": 0, "retried": 1, "failed": 0, "remaining": False}
+        assert item.attempts == attempts
+        assert item.available_at == FrozenDatetime.now_value + timedelta(seconds=delay)
+        assert item.last_error == "550 mailbox unavailable"
+
+        # Antes de vencer la espera no se vuelve a intentar
+        assert drain(repository, sender, **options)[0]["retried"] == 0
+        FrozenDatetime.now_value = item.available_at
+
+    report, _ = drain(repository, sender, **options)
+
+    assert report == {"sent": 0, "retried": 0, "failed": 1, "remaining": False}
+    assert item.attempts == 4
+    assert item.status == OUTBOX_FAILED
+    assert len(sender.sent) == 4
+    assert drain(repository, sender, **options)[0]["failed"] == 0
+
+
+def test_sent_messages_are_deleted_and_invalid_ones_spend_an_attempt():
+    sent, rejected = outbox_item("enviado", 3), outbox_item("rechazado", 2)
+    invalid = outbox_item("inválido", 1, unknown_argument=True)
+    repository = InMemoryOutboxRepository([sent, rejected, invalid])
+    sender = ScriptedSender({"rechazado": "550 mailbox unavailable"})
+
+    report, session = drain(repository, sender, max_attempts=3, retry_backoff=30)
+
+    assert report == {"sent": 1, "retried": 2, "failed": 0, "remaining": False}
+    assert sender.sent == ["enviado", "rechazado"]
+    assert set(repository.items) == {rejected.uid, invalid.uid}
+    assert invalid.attempts == 1
+    assert invalid.last_error.startswith("Invalid message: ")
+    assert session.commits == 1
+
+
+def test_not_attempted_messages_stay_pending_without_spending_attempts():
+    items = [outbox_item(f"correo {i}", 10 - i) for i in range(5)]
+    repository = InMemoryOutboxRepository(items)
+    sender = ScriptedSender({f"correo {i}": NOT_ATTEMPTED for i in range(1, 5)})
+
+    report, session = drain(repository, sender, batch_size=3, max_batches=5)
+
+    assert report == {"sent": 1, "retried": 0, "failed": 0, "remaining": False}
+    # Se confirma el lote (el enviado no se vuelve a enviar) y no se sigue drenando
+    assert session.commits == 1
+    assert repository.claims == 1
+    assert set(repository.items) == {item.uid for item in items[1:]}
+    for item in items[1:]:
+        assert item.attempts == 0
+        assert item.status == OUTBOX_PENDING
+        assert item.last_error is None
+        assert item.available_at <= NOW
+
+
+def test_unexpected_send_error_rolls_back_without_spending_attempts():
+    item = outbox_item("correo")
+    repository = InMemoryOutboxRepository([item])
+
+    report, session = drain(repository, ScriptedSender(error=RuntimeError("pool closed")))
+
+    assert report == {"sent": 0, "retried": 0, "failed": 0, "remaining": False}
+    assert session.rollbacks == 1
+    assert session.commits == 0
+    assert item.attempts == 0
+
+
+def test_full_batches_up_to_max_batches_report_remaining():
+    repository = InMemoryOutboxRepository([outbox_item(f"correo {i}", 10 - i) for i in range(5)])
+
+    report, session = drain(repository, ScriptedSender(), batch_size=2, max_batches=2)
+
+    assert report == {"sent": 4, "retried": 0, "failed": 0, "remaining": True}
+    assert session.commits == 2
+    assert len(repository.items) == 1
@@ -0,0 +1,144 @@
+"""
+Tests de la paginación por cursor (keyset) sobre (created_at, uid).
+
+paginate_by_created_at se ejecuta contra una tabla propia en SQLite en
+memoria, que también soporta la comparación de tuplas `(a, b) < (x, y)`.
+"""
+from datetime import datetime, timedelta
+import asyncio
+import base64
+import uuid
+
+import pytest
+from sqlalchemy import create_engine
+from sqlmodel import Field, Session, SQLModel, select
+
+from bookly.book.BookRepository import BooksRepository
+from bookly.errors import ValidationError
+from bookly.pagination import (
+    decode_created_at_cursor,
+    decode_cursor,
+    encode_cursor,
+    paginate_by_created_at,
+)
+
+
+class PaginatedItem(SQLModel, table=True):
+    __tablename__ = "test_pagination_items"
+
+    uid: uuid.UUID = Field(primary_key=True)
+    created_at: datetime
+
+
+class AsyncSessionAdapter:
+    """Expone `await session.exec(...)` sobre una sesión síncrona."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    async def exec(self, statement):
+        return self.session.exec(statement)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    PaginatedItem.__table__.create(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def add_items(session, created_at_values):
+    items = [
+        PaginatedItem(uid=uuid.uuid4(), created_at=created_at)
+        for created_at in created_at_values
+    ]
+    session.add_all(items)
+    session.commit()
+    return sorted(items, key=lambda item: (item.created_at, item.uid), reverse=True)
+
+
+def read_all_pages(session, limit):
+    pages, cursor = [], None
+    while True:
+        rows, cursor = asyncio.run(
+            paginate_by_created_at(
+                select(PaginatedItem),
+                PaginatedItem,
+                AsyncSessionAdapter(session),
+                limit,
+                cursor,
+            )
+        )
+        pages.append([row.uid for row in rows])
+        if cursor is None:
+            return pages
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 3, 1, 12, 30, 15, 123456)
+    uid = uuid.uuid4()
+
+    cursor = encode_cursor({"created_at": created_at.isoformat(), "uid": str(uid)})
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == {"created_at": created_at.isoformat(), "uid": str(uid)}
+    assert decode_created_at_cursor(cursor) == (created_at, uid)
+    assert decode_cursor(None) is None
+    assert decode_created_at_cursor("") is None
+
+
+def test_pages_break_created_at_ties_by_uid(session):
+    now = datetime(2026, 3, 1, 12, 0, 0)
+    expected = add_items(
+        session, [now] * 5 + [now - timedelta(seconds=1), now + timedelta(seconds=1)]
+    )
+
+    pages = read_all_pages(session, limit=2)
+
+    assert [len(page) for page in pages] == [2, 2, 2, 1]
+    assert [uid for page in pages for uid in page] == [item.uid for item in expected]
+
+
+def test_last_page_has_no_cursor(session):
+    now = datetime(2026, 3, 1, 12, 0, 0)
+    expected = add_items(session, [now - timedelta(minutes=i) for i in range(4)])
+
+    # Una página exacta no deja un cursor hacia una página vacía
+    assert read_all_pages(session, limit=4) == [[item.uid for item in expected]]
+    assert read_all_pages(session, limit=10) == [[item.uid for item in expected]]
+
+
+def test_empty_result_has_no_cursor(session):
+    assert read_all_pages(session, limit=3) == [[]]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "%%%not-base64%%%",
+        base64.urlsafe_b64encode(b"not json").decode(),
+        encode_cursor([1, 2]),
+        encode_cursor({"uid": str(uuid.uuid4())}),
+        encode_cursor({"created_at": "yesterday", "uid": str(uuid.uuid4())}),
+        encode_cursor({"created_at": "2026-03-01T12:00:00", "uid": "not-a-uuid"}),
+        encode_cursor({"created_at": None, "uid": str(uuid.uuid4())}),
+    ],
+)
+def test_malformed_created_at_cursor_is_rejected(cursor):
+    with pytest.raises(ValidationError):
+        decode_created_at_cursor(cursor)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "%%%not-base64%%%",
+        encode_cursor({"rank": "high", "uid": str(uuid.uuid4())}),
+        encode_cursor({"rank": 0.5}),
+    ],
+)
+def test_malformed_search_cursor_is_rejected(cursor):
+    with pytest.raises(ValidationError):
+        BooksRepository._decode_search_cursor(cursor)
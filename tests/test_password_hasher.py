@@ -0,0 +1,80 @@
+"""
+Tests del límite de operaciones pendientes de PasswordHasher.
+
+El hashing real se reemplaza por funciones que se bloquean o registran la
+concurrencia, así no depende del costo de bcrypt.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI, status
+from starlette.requests import Request
+
+from bookly.auth import passwordHasher as password_hasher_module
+from bookly.auth.passwordHasher import PasswordHasher
+from bookly.errors import ServiceBusy, register_all_errors
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(max_workers=2, max_pending=2)
+    yield hasher
+    hasher.shutdown()
+
+
+def test_operations_over_max_pending_are_rejected(hasher):
+    release = threading.Event()
+
+    async def run():
+        blocked = [asyncio.create_task(hasher._run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        try:
+            with pytest.raises(ServiceBusy):
+                await hasher.hash("password")
+        finally:
+            release.set()
+        await asyncio.gather(*blocked)
+
+    asyncio.run(run())
+
+    assert hasher.rejected == 1
+    assert hasher.completed == 2
+    assert hasher._pending == 0
+
+
+def test_service_busy_is_answered_with_503():
+    app = FastAPI()
+    register_all_errors(app)
+    request = Request({"type": "http", "method": "POST", "path": "/", "headers": []})
+
+    response = asyncio.run(app.exception_handlers[ServiceBusy](request, ServiceBusy()))
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert b"service_busy" in response.body
+
+
+def test_hash_many_stays_within_the_pool(hasher, monkeypatch):
+    lock = threading.Lock()
+    running, peak = 0, 0
+
+    def fake_hash(password, rounds):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+        return f"hash:{password}"
+
+    monkeypatch.setattr(password_hasher_module, "generate_passwd_hash", fake_hash)
+    passwords = [f"password-{i}" for i in range(8)]
+
+    # max_pending == max_workers: sin el semáforo el lote se rechazaría
+    hashes = asyncio.run(hasher.hash_many(passwords))
+
+    assert hashes == [f"hash:{password}" for password in passwords]
+    assert peak <= hasher.max_workers
+    assert hasher.rejected == 0
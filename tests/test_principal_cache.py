@@ -0,0 +1,84 @@
+"""
+Tests de PrincipalCache: set condicionado a la versión e invalidación de la
+copia en memoria de los demás workers por pub/sub.
+"""
+import asyncio
+import uuid
+
+from bookly.auth.principal import Principal, PrincipalCache
+
+
+def principal(role: str = "user", is_verified: bool = True) -> Principal:
+    return Principal(
+        uid=uuid.UUID("6f1c7a52-51a4-4f3e-9d0e-6a9f1f0c2b11"),
+        email="reader@example.com",
+        role=role,
+        is_verified=is_verified,
+    )
+
+
+async def wait_until(condition, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timeout"
+        await asyncio.sleep(0.01)
+
+
+def test_miss_does_not_cache_a_principal_invalidated_meanwhile(fake_redis):
+    async def run():
+        cache = PrincipalCache()
+        uid = principal().uid
+
+        cached, version = await cache.get(uid)
+        assert cached is None
+        # update_user confirma e invalida mientras el request leía la BD
+        await cache.invalidate(uid)
+        await cache.set(principal(role="admin"), version)
+        assert (await cache.get(uid))[0] is None
+
+        cached, version = await cache.get(uid)
+        await cache.set(principal(), version)
+        return await cache.get(uid)
+
+    cached, version = asyncio.run(run())
+
+    assert cached == principal()
+    assert version is None
+
+
+def test_invalidate_clears_local_copies_of_other_workers(fake_redis):
+    async def run():
+        worker_a, worker_b = PrincipalCache(), PrincipalCache()
+        await worker_a.start()
+        await worker_b.start()
+        await wait_until(lambda: worker_a.listening and worker_b.listening)
+        uid = principal().uid
+
+        _, version = await worker_b.get(uid)
+        await worker_b.set(principal(role="admin"), version)
+        assert worker_b.stats()["local_size"] == 1
+
+        await worker_a.invalidate(uid)
+        await wait_until(lambda: worker_b.stats()["local_size"] == 0)
+        cached, _ = await worker_b.get(uid)
+
+        await worker_a.stop()
+        await worker_b.stop()
+        return cached
+
+    assert asyncio.run(run()) is None
+
+
+def test_local_level_is_skipped_while_not_subscribed(fake_redis):
+    async def run():
+        cache = PrincipalCache()
+        _, version = await cache.get(principal().uid)
+        await cache.set(principal(), version)
+        cached, _ = await cache.get(principal().uid)
+        return cache, cached
+
+    cache, cached = asyncio.run(run())
+
+    assert cached == principal()
+    assert cache.stats()["local_size"] == 0
+    assert cache.stats()["redis_hits"] == 1
@@ -0,0 +1,116 @@
+"""
+Verifica que las consultas de búsqueda de los repositorios usen índices.
+
+Corre EXPLAIN sobre las sentencias que emiten los repositorios con
+enable_seqscan=off, de modo que el planner sólo elige un Seq Scan cuando no
+hay índice utilizable. Requiere una base migrada en DATABASE_URL; si la
+variable no está definida en el entorno, el módulo se omite.
+"""
+import asyncio
+import uuid
+
+import pytest
+
+from tests.conftest import DATABASE_AVAILABLE
+
+if not DATABASE_AVAILABLE:
+    pytest.skip("DATABASE_URL no está definida", allow_module_level=True)
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from bookly.auth.userRepository import UserRepository
+from bookly.book.BookRepository import BooksRepository
+from bookly.config import settings
+from bookly.reviews.reviewModel import Review
+from bookly.reviews.reviewRepository import ReviewRepository
+from bookly.tags.model import Tag
+
+
+async def _explain(query):
+    """
+    Ejecuta `query(session)` y devuelve el plan de cada sentencia que emitió.
+
+    La sesión nunca se confirma, así que la consulta no deja cambios.
+    """
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    try:
+        async with AsyncSession(engine) as session:
+            await session.exec(text("SET LOCAL enable_seqscan = off"))
+            event.listen(engine.sync_engine, "before_cursor_execute", capture)
+            try:
+                await query(session)
+            finally:
+                event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+            conn = await session.connection()
+            plans = []
+            for statement, parameters in captured:
+                result = await conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+                plans.append("\n".join(row[0] for row in result))
+            await session.rollback()
+            return plans
+    finally:
+        await engine.dispose()
+
+
+def assert_index_scans(query):
+    plans = asyncio.run(_explain(query))
+    assert plans, "la consulta no emitió sentencias"
+    for plan in plans:
+        assert "Index" in plan, plan
+        assert "Seq Scan" not in plan, plan
+
+
+def test_user_by_email_uses_index():
+    assert_index_scans(
+        lambda session: UserRepository().get_user_by_email("nadie@example.com", session)
+    )
+
+
+def test_books_by_uids_uses_index():
+    assert_index_scans(
+        lambda session: BooksRepository().get_books_by_uids(
+            [uuid.uuid4(), uuid.uuid4()], session
+        )
+    )
+
+
+def test_books_by_user_page_uses_index():
+    assert_index_scans(
+        lambda session: BooksRepository().get_books_by_user(str(uuid.uuid4()), session)
+    )
+
+
+def test_book_validator_uses_indexes():
+    assert_index_scans(
+        lambda session: BooksRepository().get_book_validator(str(uuid.uuid4()), session)
+    )
+
+
+def test_reviews_by_user_page_uses_index():
+    assert_index_scans(
+        lambda session: ReviewRepository().get_reviews_by_user(uuid.uuid4(), session)
+    )
+
+
+def test_reviews_by_book_uses_index():
+    assert_index_scans(
+        lambda session: session.exec(
+            select(Review).where(Review.book_uid == uuid.uuid4())
+        )
+    )
+
+
+def test_tag_by_name_uses_index():
+    assert_index_scans(
+        lambda session: session.exec(select(Tag).where(Tag.name == "sin-tag"))
+    )
@@ -0,0 +1,126 @@
+"""
+Tests de la blocklist de JWT: sorted set de JTIs revocados, resincronización
+de la copia local y migración de las claves sueltas de versiones anteriores.
+"""
+import asyncio
+import time
+import uuid
+
+from bookly.db.redis import (
+    REVOKED_JTIS_KEY,
+    REVOKED_USERS_KEY,
+    USER_EPOCH_EXPIRY,
+    USER_EPOCH_PREFIX,
+    RevocationMirror,
+    add_jti_to_blocklist,
+    migrate_legacy_revocations,
+    revoke_user_tokens,
+    token_in_blocklist,
+    user_tokens_revoked,
+)
+
+
+def test_revocation_is_stored_only_in_the_sorted_set(fake_redis):
+    jti, expired = str(uuid.uuid4()), str(uuid.uuid4())
+
+    async def run():
+        await fake_redis.zadd(REVOKED_JTIS_KEY, {expired: time.time() - 1})
+        await add_jti_to_blocklist(jti, time.time() + 60)
+        return (
+            await fake_redis.exists(jti),
+            await fake_redis.zrange(REVOKED_JTIS_KEY, 0, -1),
+            await token_in_blocklist(jti),
+            await token_in_blocklist(str(uuid.uuid4())),
+        )
+
+    exists, members, revoked, unknown = asyncio.run(run())
+
+    assert exists == 0
+    # La escritura poda las entradas vencidas
+    assert members == [jti]
+    assert revoked is True
+    assert unknown is False
+
+
+def test_seed_reads_the_sorted_set_without_writing(fake_redis):
+    live, expired = str(uuid.uuid4()), str(uuid.uuid4())
+    mirror = RevocationMirror()
+
+    async def run():
+        now = time.time()
+        await fake_redis.zadd(REVOKED_JTIS_KEY, {live: now + 60, expired: now - 1})
+        # Una clave suelta de la versión anterior no se lee al resincronizar
+        await fake_redis.set(str(uuid.uuid4()), "revoked", ex=60)
+        await mirror.seed(fake_redis)
+        return await fake_redis.zcard(REVOKED_JTIS_KEY)
+
+    assert asyncio.run(run()) == 2
+    assert mirror.stats()["size"] == 1
+    assert mirror.contains(live)
+    assert not mirror.contains(expired)
+
+
+def test_legacy_keys_are_migrated_once_into_the_sorted_set(fake_redis):
+    legacy, current = str(uuid.uuid4()), str(uuid.uuid4())
+
+    async def run():
+        exp = time.time() + 600
+        await fake_redis.set(legacy, "revoked", ex=60)
+        await fake_redis.set("not-a-jti", "value", ex=60)
+        await fake_redis.zadd(REVOKED_JTIS_KEY, {current: exp})
+        await fake_redis.set(current, "revoked", ex=60)
+        migrated = await migrate_legacy_revocations(fake_redis)
+        return migrated, exp, dict(
+            await fake_redis.zrange(REVOKED_JTIS_KEY, 0, -1, withscores=True)
+        )
+
+    migrated, exp, scores = asyncio.run(run())
+
+    assert migrated == 1
+    assert set(scores) == {legacy, current}
+    assert 0 < scores[legacy] - time.time() <= 60
+    # nx: no se acorta la entrada que ya estaba en el sorted set
+    assert scores[current] == exp
+
+
+def test_user_epochs_live_in_a_sorted_set(fake_redis):
+    user_uid, stale_uid = str(uuid.uuid4()), str(uuid.uuid4())
+    mirror = RevocationMirror()
+
+    async def run():
+        await fake_redis.zadd(
+            REVOKED_USERS_KEY, {stale_uid: int(time.time()) - USER_EPOCH_EXPIRY - 1}
+        )
+        await revoke_user_tokens(user_uid)
+        epoch = await fake_redis.zscore(REVOKED_USERS_KEY, user_uid)
+        await mirror.seed(fake_redis)
+        return (
+            epoch,
+            await fake_redis.zrange(REVOKED_USERS_KEY, 0, -1),
+            await user_tokens_revoked(user_uid, int(epoch)),
+            await user_tokens_revoked(user_uid, int(epoch) + 1),
+        )
+
+    epoch, members, old_token_revoked, new_token_revoked = asyncio.run(run())
+
+    assert members == [user_uid]
+    assert old_token_revoked is True
+    assert new_token_revoked is False
+    assert mirror.user_revoked(user_uid, int(epoch))
+    assert mirror.stats()["user_epochs"] == 1
+
+
+def test_legacy_user_epochs_are_migrated(fake_redis):
+    user_uid = str(uuid.uuid4())
+
+    async def run():
+        await fake_redis.set(f"{USER_EPOCH_PREFIX}:{user_uid}", 1000, ex=60)
+        await fake_redis.zadd(REVOKED_USERS_KEY, {user_uid: 900})
+        migrated = await migrate_legacy_revocations(fake_redis)
+        return migrated, await fake_redis.zscore(REVOKED_USERS_KEY, user_uid)
+
+    migrated, epoch = asyncio.run(run())
+
+    # gt: se queda con la época más reciente
+    assert epoch == 1000
+    assert migrated == 1
@@ -0,0 +1,189 @@
+"""
+Tests de los pools SMTP contra un servidor aiosmtpd local.
+
+El handler del servidor rechaza los destinatarios que empiezan con "bad" y
+corta la conexión antes de responder al DATA de los mensajes cuyo asunto
+empieza con "drop" (una sola vez con "drop-once", siempre con "drop").
+"""
+import asyncio
+import smtplib
+import socket
+
+import pytest
+
+pytest.importorskip("aiosmtpd")
+
+from aiosmtpd.controller import Controller
+
+from bookly.smtp_pool import (
+    NOT_ATTEMPTED,
+    AsyncSMTPConnectionPool,
+    SMTPConnectionPool,
+    build_email,
+)
+
+
+class StandInHandler:
+    def __init__(self):
+        self.delivered = []
+        self.dropped = set()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("bad"):
+            return "550 no such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        subject = envelope.content.decode().split("Subject: ", 1)[1].split("\r\n", 1)[0]
+        if subject == "drop" or (subject == "drop-once" and subject not in self.dropped):
+            self.dropped.add(subject)
+            server.transport.close()
+            return "421 closing"
+        self.delivered.append(subject)
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = StandInHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+
+def pool_options(controller, **overrides) -> dict:
+    options = {
+        "host": controller.hostname,
+        "port": controller.port,
+        "starttls": False,
+        "ssl_tls": False,
+        "use_credentials": False,
+        "max_idle": 60,
+        "timeout": 5,
+    }
+    options.update(overrides)
+    return options
+
+
+def message(subject: str, recipient: str = "reader@example.com"):
+    return build_email([recipient], subject, body="<p>Hola</p>")
+
+
+def test_sends_reuse_one_connection(smtp_server):
+    controller, handler = smtp_server
+    pool = SMTPConnectionPool(**pool_options(controller))
+
+    pool.send(message("uno"))
+    pool.send(message("dos"))
+    assert pool.send_many([message("tres"), message("cuatro")]) == 2
+
+    assert handler.delivered == ["uno", "dos", "tres", "cuatro"]
+    assert pool.stats() == {"idle": 1, "connections_opened": 1, "messages_sent": 4}
+    pool.close_all()
+
+
+def test_reconnects_after_server_drops_connection(smtp_server):
+    controller, handler = smtp_server
+    pool = SMTPConnectionPool(**pool_options(controller))
+
+    results = pool.send_each([message("uno"), message("drop-once"), message("tres")])
+
+    assert results == [None, None, None]
+    assert handler.delivered == ["uno", "drop-once", "tres"]
+    assert pool.connections_opened == 2
+    pool.close_all()
+
+
+def test_rejected_message_keeps_the_session(smtp_server):
+    controller, handler = smtp_server
+    pool = SMTPConnectionPool(**pool_options(controller))
+
+    with pytest.raises(smtplib.SMTPRecipientsRefused):
+        pool.send(message("uno", recipient="bad@example.com"))
+    results = pool.send_each(
+        [message("dos", recipient="bad@example.com"), message("tres")]
+    )
+    pool.send(message("cuatro"))
+
+    assert results[0] is not None and "no such user" in results[0]
+    assert results[1] is None
+    assert handler.delivered == ["tres", "cuatro"]
+    assert pool.connections_opened == 1
+    pool.close_all()
+
+
+def test_send_each_reports_not_attempted_after_lost_connection(smtp_server):
+    controller, handler = smtp_server
+    pool = SMTPConnectionPool(**pool_options(controller))
+
+    results = pool.send_each([message("uno"), message("drop"), message("tres")])
+
+    assert results == [None, NOT_ATTEMPTED, NOT_ATTEMPTED]
+    assert handler.delivered == ["uno"]
+    assert pool.send_many([message("cuatro"), message("drop")]) == 1
+    pool.close_all()
+
+
+def test_send_each_reports_not_attempted_when_server_is_down():
+    pool = SMTPConnectionPool(host="127.0.0.1", port=free_port(), timeout=5,
+                              starttls=False, use_credentials=False)
+
+    assert pool.send_each([message("uno"), message("dos")]) == [NOT_ATTEMPTED] * 2
+
+
+def test_authentication_errors_fail_instead_of_reconnecting(smtp_server):
+    controller, handler = smtp_server
+    # El servidor de prueba no ofrece AUTH: login falla sin que sea una caída
+    pool = SMTPConnectionPool(**pool_options(controller, use_credentials=True))
+
+    with pytest.raises(smtplib.SMTPNotSupportedError):
+        pool.send(message("uno"))
+    results = pool.send_each([message("dos"), message("tres")])
+
+    assert all(result not in (None, NOT_ATTEMPTED) for result in results)
+    assert handler.delivered == []
+
+
+def test_async_pool_reuses_connections_and_keeps_session_on_rejection(smtp_server):
+    controller, handler = smtp_server
+
+    async def run():
+        pool = AsyncSMTPConnectionPool(**pool_options(controller, max_size=1))
+        await pool.send(message("uno"))
+        results = await pool.send_each(
+            [message("dos", recipient="bad@example.com"), message("tres")]
+        )
+        await pool.close_all()
+        return pool, results
+
+    pool, results = asyncio.run(run())
+
+    assert results[0] is not None and "no such user" in results[0]
+    assert results[1] is None
+    assert handler.delivered == ["uno", "tres"]
+    assert pool.connections_opened == 1
+
+
+def test_async_pool_reconnects_and_reports_not_attempted(smtp_server):
+    controller, handler = smtp_server
+
+    async def run():
+        pool = AsyncSMTPConnectionPool(**pool_options(controller, max_size=1))
+        reconnected = await pool.send_each([message("drop-once"), message("dos")])
+        lost = await pool.send_each([message("drop"), message("tres")])
+        await pool.close_all()
+        return reconnected, lost
+
+    reconnected, lost = asyncio.run(run())
+
+    assert reconnected == [None, None]
+    assert lost == [NOT_ATTEMPTED, None]
+    assert handler.delivered == ["drop-once", "dos", "tres"]
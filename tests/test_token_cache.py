@@ -0,0 +1,91 @@
+"""
+Tests de VerifiedTokenCache y de su uso en TokenBearer.
+"""
+import asyncio
+import hashlib
+import time
+import uuid
+
+import pytest
+from starlette.requests import Request
+
+from bookly.auth.dependencies import AccessTokenBearer, VerifiedTokenCache, verified_token_cache
+from bookly.auth.utils import create_access_token, decode_token
+from bookly.db.redis import add_jti_to_blocklist
+from bookly.errors import InvalidToken
+
+NOW = 1_800_000_000.0
+
+
+@pytest.fixture
+def frozen_time(monkeypatch):
+    monkeypatch.setattr(time, "time", lambda: NOW)
+
+
+def token_data(exp: float) -> dict:
+    return {"exp": exp, "jti": str(uuid.uuid4()), "user": {}}
+
+
+def request_with(token: str) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "headers": [(b"authorization", f"Bearer {token}".encode())],
+        }
+    )
+
+
+def test_entries_are_keyed_by_the_token_hash(frozen_time):
+    cache = VerifiedTokenCache()
+    data = token_data(NOW + 60)
+
+    cache.set("header.payload.signature", data)
+
+    assert list(cache._entries) == [hashlib.sha256(b"header.payload.signature").hexdigest()]
+    assert cache.get("header.payload.signature") is data
+    assert cache.get("header.payload.other") is None
+
+
+def test_entries_expire_at_the_token_exp(frozen_time, monkeypatch):
+    cache = VerifiedTokenCache()
+    cache.set("token", token_data(NOW + 60))
+    cache.set("no-exp", {"jti": "x"})
+
+    assert cache.get("token") is not None
+    assert cache.get("no-exp") is None
+
+    monkeypatch.setattr(time, "time", lambda: NOW + 60)
+    assert cache.get("token") is None
+    assert cache.stats()["size"] == 0
+    assert cache.stats()["hits"] == 1
+
+
+def test_least_recently_used_entry_is_evicted_at_capacity(frozen_time):
+    cache = VerifiedTokenCache(max_size=2)
+    cache.set("a", token_data(NOW + 60))
+    cache.set("b", token_data(NOW + 60))
+
+    cache.get("a")
+    cache.set("c", token_data(NOW + 60))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_revoked_token_is_rejected_on_a_cache_hit(fake_redis):
+    token = create_access_token({"email": "reader@example.com", "user_uid": str(uuid.uuid4())})
+    bearer = AccessTokenBearer()
+
+    async def run():
+        await bearer(request_with(token))
+        hits = verified_token_cache.hits
+        await add_jti_to_blocklist(decode_token(token)["jti"])
+        with pytest.raises(InvalidToken):
+            await bearer(request_with(token))
+        return verified_token_cache.hits - hits
+
+    assert asyncio.run(run()) == 1